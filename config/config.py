@@ -30,6 +30,8 @@ class BrowserConfig:
     使用系统 Edge 浏览器，自动检测路径
     """
     playwright_browsers_path: Optional[str] = None
+    max_pages_per_context: int = 8   # 浏览器池中每个共享上下文最多同时打开的页面数
+    idle_timeout: int = 300          # 浏览器空闲多少秒后关闭，下次使用时重新启动，0 表示不自动关闭
 
 
 @dataclass
@@ -84,8 +86,15 @@ class WebSearchConfig:
     """
     网页搜索配置
     web_search_ID: 1=博查搜索, 2=Tavily搜索
+    mode: single=只用 web_search_ID 指定的服务, fanout=并发查询 providers 中的服务并合并结果
     """
     web_search_ID: int = 2
+    mode: str = "single"
+    providers: list = field(default_factory=lambda: ["bocha", "tavily"])
+    deadline: float = 8.0       # fanout 模式的最长等待时间（秒），到时未返回的服务被放弃
+    grace: float = 0.5          # 结果已经足够后再等待其他服务的时间（秒）
+    batch_concurrency: int = 3  # search_web_batch 中每个搜索服务同时进行的请求数
+    batch_max_queries: int = 10 # search_web_batch 单次最多执行的查询数
 
 
 @dataclass
@@ -110,6 +119,154 @@ class MCPConfig:
     servers: list = field(default_factory=list)  # List[MCPServerConfigItem]
 
 
+@dataclass
+class CodeRunnerConfig:
+    """
+    代码执行配置
+    run_code / run_code_file 使用 code_venv 中的常驻 Python 工作进程池
+    """
+    use_worker_pool: bool = True   # 关闭后每次调用启动新的解释器
+    pool_size: int = 2             # 常驻工作进程数
+    timeout: int = 120             # 单次执行超时（秒），0 表示不限制
+    max_runs: int = 50             # 单个进程执行多少次后回收重建
+    max_rss_mb: int = 512          # 进程内存超过该值（MB）后回收重建，0 表示不检查
+    memory_limit_mb: int = 0       # 单个进程虚拟内存上限（MB，仅 Linux/Mac），0 表示不限制
+    max_sessions: int = 4          # 最多保留的 session_id 会话进程数
+    preload: list = field(default_factory=list)  # 工作进程启动时预先导入的模块
+
+
+@dataclass
+class WarmupConfig:
+    """
+    启动预热配置
+    交互模式出现输入提示后，在后台并行准备较慢的子系统，工具只等待自己依赖的组件
+    """
+    enabled: bool = True
+    mcp: bool = True           # 连接 MCP Server
+    imap: bool = True          # 登录 IMAP 邮箱（未配置邮箱时跳过）
+    venv: bool = True          # 检查/创建 code_venv 并启动工作进程池
+    browser: bool = True       # 启动 Chromium
+    index: bool = True         # 加载角色、技能、文档和记忆索引
+    wait_timeout: int = 60     # 工具等待组件就绪的最长时间（秒），超时后照常执行
+
+
+@dataclass
+class ToolTimeoutConfig:
+    """
+    工具超时配置
+    每次工具调用作为可取消的任务运行，超时或用户按 Esc 时取消并返回结构化结果
+    """
+    default: int = 300                          # 未单独配置的工具的超时（秒），0 表示不限制
+    tools: dict = field(default_factory=dict)   # 工具名 -> 超时秒数，覆盖工具自身的默认值
+
+
+@dataclass
+class HTTPClientConfig:
+    """
+    出站 HTTP 配置
+    搜索等工具共用长连接的 HTTP 客户端（连接池、keep-alive、可用时启用 HTTP/2），
+    连接失败、超时和 429/5xx 等临时错误按指数退避重试
+    """
+    timeout: float = 30.0          # 读写超时（秒）
+    connect_timeout: float = 10.0  # 建立连接超时（秒）
+    max_connections: int = 20      # 连接池最大连接数
+    max_keepalive: int = 10        # 保持的空闲连接数
+    keepalive_expiry: float = 60.0 # 空闲连接保持时间（秒）
+    http2: bool = True             # 启用 HTTP/2（依赖 h2，未安装时退回 HTTP/1.1）
+    retries: int = 2               # 临时错误的重试次数
+    backoff: float = 0.5           # 首次重试前的等待时间（秒），之后每次翻倍
+
+
+@dataclass
+class SearchCacheConfig:
+    """
+    搜索结果缓存配置
+    按 (搜索服务, 规范化后的查询, 结果数) 缓存 search_web 的结果，内存层之外还有跨进程共享的磁盘层
+    """
+    enabled: bool = True
+    ttl: int = 3600             # 内存层有效期（秒）
+    disk: bool = True           # 是否启用磁盘层（.shitbot/cache/search）
+    disk_ttl: int = 86400       # 磁盘层有效期（秒）
+    max_disk_mb: float = 50     # 磁盘层容量上限（MB），超出后按最近使用时间淘汰
+    memory_entries: int = 256   # 内存层最多保存的条目数
+
+
+@dataclass
+class HTMLExtractConfig:
+    """
+    网页结构提取配置
+    渲染后的 HTML 用 lxml 单遍解析，在独立的进程池中执行，不阻塞事件循环
+    """
+    processes: int = 2          # 解析进程数，0 表示在线程中解析
+
+
+@dataclass
+class PageFetchConfig:
+    """
+    网页读取配置
+    先不经过浏览器直接下载网页，只有下载失败或内容需要 JavaScript 渲染时才启动浏览器
+    """
+    static_first: bool = True       # 是否先尝试直接下载
+    static_timeout: float = 10.0    # 直接下载的超时（秒）
+    min_text_chars: int = 200       # 正文少于该字符数时改用浏览器渲染
+    max_bytes: int = 5242880        # 直接下载的网页最大字节数
+
+
+@dataclass
+class ExtractCacheConfig:
+    """
+    网页提取结果缓存配置
+    按规范化 URL 缓存解析结果，过期后用 ETag/Last-Modified 条件请求验证，网页未变化时不再下载和解析
+    """
+    enabled: bool = True
+    fresh_ttl: int = 300        # 抓取后多少秒内直接使用缓存，不发请求
+    disk: bool = True           # 是否启用磁盘层（.shitbot/cache/extract）
+    max_age: int = 604800       # 记录最长保存时间（秒）
+    max_disk_mb: float = 100    # 磁盘层容量上限（MB），超出后按最近使用时间淘汰
+    memory_entries: int = 64    # 内存层最多保存的条目数
+
+
+@dataclass
+class PageWaitConfig:
+    """
+    页面等待配置
+    打开网页、点击、提交和滚动后检测页面何时稳定（DOM 静止、网络空闲、滚动高度不变），代替固定的等待时间
+    """
+    quiet: float = 0.3          # DOM 和网络没有活动多长时间视为稳定（秒）
+    load_cap: float = 8.0       # 打开网页、提交表单后最多等待（秒）
+    action_cap: float = 3.0     # 点击后最多等待（秒）
+    scroll_quiet: float = 0.25  # 滚动高度没有变化多长时间视为加载完成（秒）
+    scroll_cap: float = 1.5     # 每次滚动后最多等待（秒）
+
+
+@dataclass
+class RequestBlockConfig:
+    """
+    浏览器请求拦截配置
+    按资源类型（request.resource_type）和跟踪/广告主机列表拦截请求，减少页面加载时间、流量和内存
+    """
+    enabled: bool = True
+    extract_types: list = field(default_factory=lambda: ["image", "media", "font", "stylesheet"])  # 读取网页正文时拦截的资源类型
+    browser_types: list = field(default_factory=lambda: ["media", "font"])  # WebBot 操作页面时拦截的资源类型
+    block_trackers: bool = True     # 是否拦截内置列表中的跟踪和广告主机
+    extra_hosts: list = field(default_factory=list)  # 额外拦截的主机（包括子域名）
+
+
+DEFAULT_CORE_TOOLS = ["read_file", "write_file", "get_dir_tree", "shell_command", "search_web", "run_code"]
+
+
+@dataclass
+class ToolRouterConfig:
+    """
+    工具路由配置
+    开启后每轮对话只发送与用户输入相关的工具定义，减少 prompt token
+    """
+    enabled: bool = False
+    top_k: int = 12               # 按相关度选择的工具数
+    recent: int = 5               # 额外提供最近用过的工具数
+    core: list = field(default_factory=lambda: list(DEFAULT_CORE_TOOLS))  # 始终提供的工具
+
+
 @dataclass
 class AppConfig:
     """应用配置"""
@@ -122,6 +279,17 @@ class AppConfig:
     tavily: TavilyConfig
     web_search: WebSearchConfig
     mcp: MCPConfig = field(default_factory=MCPConfig)
+    code_runner: CodeRunnerConfig = field(default_factory=CodeRunnerConfig)
+    warmup: WarmupConfig = field(default_factory=WarmupConfig)
+    tool_router: ToolRouterConfig = field(default_factory=ToolRouterConfig)
+    tool_timeouts: ToolTimeoutConfig = field(default_factory=ToolTimeoutConfig)
+    http: HTTPClientConfig = field(default_factory=HTTPClientConfig)
+    search_cache: SearchCacheConfig = field(default_factory=SearchCacheConfig)
+    html_extract: HTMLExtractConfig = field(default_factory=HTMLExtractConfig)
+    page_fetch: PageFetchConfig = field(default_factory=PageFetchConfig)
+    extract_cache: ExtractCacheConfig = field(default_factory=ExtractCacheConfig)
+    request_block: RequestBlockConfig = field(default_factory=RequestBlockConfig)
+    page_wait: PageWaitConfig = field(default_factory=PageWaitConfig)
     default_provider: str = "minimax"
 
 
@@ -169,7 +337,9 @@ def load_config(config_path: Optional[str] = None) -> AppConfig:
     # 浏览器配置
     browser_config_data = config_data.get('browser', {})
     browser_config = BrowserConfig(
-        playwright_browsers_path=browser_config_data.get('playwright_browsers_path')
+        playwright_browsers_path=browser_config_data.get('playwright_browsers_path'),
+        max_pages_per_context=browser_config_data.get('max_pages_per_context', 8),
+        idle_timeout=browser_config_data.get('idle_timeout', 300)
     )
     
     # SMTP邮件配置
@@ -207,7 +377,13 @@ def load_config(config_path: Optional[str] = None) -> AppConfig:
     # 网页搜索配置
     web_search_config_data = config_data.get('web_search', {})
     web_search_config = WebSearchConfig(
-        web_search_ID=web_search_config_data.get('web_search_ID', 1)
+        web_search_ID=web_search_config_data.get('web_search_ID', 1),
+        mode=web_search_config_data.get('mode', 'single'),
+        providers=web_search_config_data.get('providers') or ["bocha", "tavily"],
+        deadline=web_search_config_data.get('deadline', 8.0),
+        grace=web_search_config_data.get('grace', 0.5),
+        batch_concurrency=web_search_config_data.get('batch_concurrency', 3),
+        batch_max_queries=web_search_config_data.get('batch_max_queries', 10)
     )
     
     # MCP 配置
@@ -229,6 +405,117 @@ def load_config(config_path: Optional[str] = None) -> AppConfig:
         servers=mcp_servers
     )
     
+    # 代码执行配置
+    code_runner_data = config_data.get('code_runner') or {}
+    code_runner_config = CodeRunnerConfig(
+        use_worker_pool=code_runner_data.get('use_worker_pool', True),
+        pool_size=code_runner_data.get('pool_size', 2),
+        timeout=code_runner_data.get('timeout', 120),
+        max_runs=code_runner_data.get('max_runs', 50),
+        max_rss_mb=code_runner_data.get('max_rss_mb', 512),
+        memory_limit_mb=code_runner_data.get('memory_limit_mb', 0),
+        max_sessions=code_runner_data.get('max_sessions', 4),
+        preload=code_runner_data.get('preload') or []
+    )
+    
+    # 启动预热配置
+    warmup_data = config_data.get('warmup') or {}
+    warmup_config = WarmupConfig(
+        enabled=warmup_data.get('enabled', True),
+        mcp=warmup_data.get('mcp', True),
+        imap=warmup_data.get('imap', True),
+        venv=warmup_data.get('venv', True),
+        browser=warmup_data.get('browser', True),
+        index=warmup_data.get('index', True),
+        wait_timeout=warmup_data.get('wait_timeout', 60)
+    )
+    
+    # 工具路由配置
+    tool_router_data = config_data.get('tool_router') or {}
+    tool_router_config = ToolRouterConfig(
+        enabled=tool_router_data.get('enabled', False),
+        top_k=tool_router_data.get('top_k', 12),
+        recent=tool_router_data.get('recent', 5),
+        core=tool_router_data.get('core') or list(DEFAULT_CORE_TOOLS)
+    )
+    
+    # 工具超时配置
+    tool_timeouts_data = config_data.get('tool_timeouts') or {}
+    tool_timeouts_config = ToolTimeoutConfig(
+        default=tool_timeouts_data.get('default', 300),
+        tools=tool_timeouts_data.get('tools') or {}
+    )
+    
+    # 出站 HTTP 配置
+    http_data = config_data.get('http') or {}
+    http_config = HTTPClientConfig(
+        timeout=http_data.get('timeout', 30.0),
+        connect_timeout=http_data.get('connect_timeout', 10.0),
+        max_connections=http_data.get('max_connections', 20),
+        max_keepalive=http_data.get('max_keepalive', 10),
+        keepalive_expiry=http_data.get('keepalive_expiry', 60.0),
+        http2=http_data.get('http2', True),
+        retries=http_data.get('retries', 2),
+        backoff=http_data.get('backoff', 0.5)
+    )
+    
+    # 搜索结果缓存配置
+    search_cache_data = config_data.get('search_cache') or {}
+    search_cache_config = SearchCacheConfig(
+        enabled=search_cache_data.get('enabled', True),
+        ttl=search_cache_data.get('ttl', 3600),
+        disk=search_cache_data.get('disk', True),
+        disk_ttl=search_cache_data.get('disk_ttl', 86400),
+        max_disk_mb=search_cache_data.get('max_disk_mb', 50),
+        memory_entries=search_cache_data.get('memory_entries', 256)
+    )
+    
+    # 网页结构提取配置
+    html_extract_data = config_data.get('html_extract') or {}
+    html_extract_config = HTMLExtractConfig(
+        processes=html_extract_data.get('processes', 2)
+    )
+    
+    # 网页读取配置
+    page_fetch_data = config_data.get('page_fetch') or {}
+    page_fetch_config = PageFetchConfig(
+        static_first=page_fetch_data.get('static_first', True),
+        static_timeout=page_fetch_data.get('static_timeout', 10.0),
+        min_text_chars=page_fetch_data.get('min_text_chars', 200),
+        max_bytes=page_fetch_data.get('max_bytes', 5242880)
+    )
+    
+    # 网页提取结果缓存配置
+    extract_cache_data = config_data.get('extract_cache') or {}
+    extract_cache_config = ExtractCacheConfig(
+        enabled=extract_cache_data.get('enabled', True),
+        fresh_ttl=extract_cache_data.get('fresh_ttl', 300),
+        disk=extract_cache_data.get('disk', True),
+        max_age=extract_cache_data.get('max_age', 604800),
+        max_disk_mb=extract_cache_data.get('max_disk_mb', 100),
+        memory_entries=extract_cache_data.get('memory_entries', 64)
+    )
+    
+    # 浏览器请求拦截配置
+    request_block_data = config_data.get('request_block') or {}
+    request_block_config = RequestBlockConfig(
+        enabled=request_block_data.get('enabled', True),
+        extract_types=request_block_data.get('extract_types', ["image", "media", "font", "stylesheet"]),
+        browser_types=request_block_data.get('browser_types', ["media", "font"]),
+        block_trackers=request_block_data.get('block_trackers', True),
+        extra_hosts=request_block_data.get('extra_hosts') or []
+    )
+    
+    # 页面等待配置
+    page_wait_data = config_data.get('page_wait') or {}
+    page_wait_config = PageWaitConfig(
+        quiet=page_wait_data.get('quiet', 0.3),
+        load_cap=page_wait_data.get('load_cap', 8.0),
+        action_cap=page_wait_data.get('action_cap', 3.0),
+        scroll_quiet=page_wait_data.get('scroll_quiet', 0.25),
+        scroll_cap=page_wait_data.get('scroll_cap', 1.5)
+    )
+    
     default_provider = config_data.get('default_provider', 'ai')
     
     return AppConfig(
@@ -241,6 +528,17 @@ def load_config(config_path: Optional[str] = None) -> AppConfig:
         tavily=tavily_config,
         web_search=web_search_config,
         mcp=mcp_config,
+        code_runner=code_runner_config,
+        warmup=warmup_config,
+        tool_router=tool_router_config,
+        tool_timeouts=tool_timeouts_config,
+        http=http_config,
+        search_cache=search_cache_config,
+        html_extract=html_extract_config,
+        page_fetch=page_fetch_config,
+        extract_cache=extract_cache_config,
+        request_block=request_block_config,
+        page_wait=page_wait_config,
         default_provider=default_provider
     )
 
@@ -266,6 +564,8 @@ def create_default_config(config_path: str = "config.yaml"):
         },
         'browser': {
             'playwright_browsers_path': '',
+            'max_pages_per_context': 8,
+            'idle_timeout': 300,
         },
         'email': {
             'smtp_server': 'smtp.gmail.com',
@@ -288,12 +588,96 @@ def create_default_config(config_path: str = "config.yaml"):
             'key': ''
         },
         'web_search': {
-            'web_search_ID': 1
+            'web_search_ID': 1,
+            'mode': 'single',
+            'providers': ['bocha', 'tavily'],
+            'deadline': 8.0,
+            'grace': 0.5,
+            'batch_concurrency': 3,
+            'batch_max_queries': 10
         },
         'mcp': {
             'enabled': False,
             'servers': []
         },
+        'code_runner': {
+            'use_worker_pool': True,
+            'pool_size': 2,
+            'timeout': 120,
+            'max_runs': 50,
+            'max_rss_mb': 512,
+            'memory_limit_mb': 0,
+            'max_sessions': 4,
+            'preload': []
+        },
+        'warmup': {
+            'enabled': True,
+            'mcp': True,
+            'imap': True,
+            'venv': True,
+            'browser': True,
+            'index': True,
+            'wait_timeout': 60
+        },
+        'tool_router': {
+            'enabled': False,
+            'top_k': 12,
+            'recent': 5,
+            'core': list(DEFAULT_CORE_TOOLS)
+        },
+        'tool_timeouts': {
+            'default': 300,
+            'tools': {}
+        },
+        'http': {
+            'timeout': 30.0,
+            'connect_timeout': 10.0,
+            'max_connections': 20,
+            'max_keepalive': 10,
+            'keepalive_expiry': 60.0,
+            'http2': True,
+            'retries': 2,
+            'backoff': 0.5
+        },
+        'search_cache': {
+            'enabled': True,
+            'ttl': 3600,
+            'disk': True,
+            'disk_ttl': 86400,
+            'max_disk_mb': 50,
+            'memory_entries': 256
+        },
+        'html_extract': {
+            'processes': 2
+        },
+        'page_fetch': {
+            'static_first': True,
+            'static_timeout': 10.0,
+            'min_text_chars': 200,
+            'max_bytes': 5242880
+        },
+        'extract_cache': {
+            'enabled': True,
+            'fresh_ttl': 300,
+            'disk': True,
+            'max_age': 604800,
+            'max_disk_mb': 100,
+            'memory_entries': 64
+        },
+        'request_block': {
+            'enabled': True,
+            'extract_types': ['image', 'media', 'font', 'stylesheet'],
+            'browser_types': ['media', 'font'],
+            'block_trackers': True,
+            'extra_hosts': []
+        },
+        'page_wait': {
+            'quiet': 0.3,
+            'load_cap': 8.0,
+            'action_cap': 3.0,
+            'scroll_quiet': 0.25,
+            'scroll_cap': 1.5
+        },
         'default_provider': 'glm '
     }
     
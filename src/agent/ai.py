@@ -1,15 +1,46 @@
 import os
 import json
+import threading
 from re import I
 from typing import Optional, List, Dict, Any
 from dataclasses import dataclass
 from config.config import AIConfig, load_config
-from litellm import completion
 from src.prompt import BotPromt  
 from dataclasses import asdict
 from src.log import Log
 
 
+# litellm 导入需要数秒，推迟到第一次调用模型时再导入
+_completion = None
+_completion_lock = threading.Lock()
+
+
+def get_completion():
+    """
+    获取 litellm.completion，首次调用时导入 litellm
+    
+    Returns:
+        litellm.completion 函数
+    """
+    global _completion
+    if _completion is None:
+        with _completion_lock:
+            if _completion is None:
+                from litellm import completion
+                _completion = completion
+    return _completion
+
+
+def preload_litellm():
+    """在后台线程提前导入 litellm，用户输入第一条消息时通常已经导入完成"""
+    def _load():
+        try:
+            get_completion()
+        except Exception:
+            pass
+    threading.Thread(target=_load, daemon=True, name="litellm-preload").start()
+
+
 @dataclass
 class Message:
     role: str
@@ -78,6 +109,7 @@ class AIClient:
             if self.config.ai.base_url:
                 kwargs["base_url"] = self.config.ai.base_url
             
+            completion = get_completion()
             response = completion(**kwargs)
             self.log.add_log(response)
             return response
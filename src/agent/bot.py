@@ -6,16 +6,15 @@ from typing import Optional, List
 from src.agent.ai import AIClient,Message
 from src.prompt import BotPromt  
 from config.config import load_config,load_settings
-from src.tool_registry import registry
+from src.tool_registry import registry, freeze_schema
+from src.tool_router import ToolRouter
 from tools.definition.tools_definition import get_tools_definition
 from src.tool import Tool
 from src.memory import SharedMemory, get_shared_memory
 from src.workflows import Workflow
 import platform
 import os
-from tools.doc import Doc 
 from src.log import Log
-from rich.markdown import Markdown
 from src.ui_components import TerminalUI
 from src.token_tracker import TokenTracker
 class Bot:
@@ -32,21 +31,25 @@ class Bot:
         self.prompt = BotPromt()
         self.if_user_or_timer = if_user_or_timer
         self.if_user_or_subagent = if_user_or_subagent  
+        # 工具定义只生成一次（冻结），MCP 连接后再追加 MCP 工具
+        self.all_tools = list(registry.get_frozen_schemas(if_not_timer=self.if_user_or_timer,if_not_subagent=self.if_user_or_subagent))
         self.ai = AIClient(
-            tools=registry.get_tools_definition(if_not_timer=self.if_user_or_timer,if_not_subagent=self.if_user_or_subagent)
+            tools=[item.schema for item in self.all_tools]
         )
         self.tools = Tool(shared_memory)
         self.shared_memory = shared_memory
         if self.shared_memory:
             self.shared_memory.set_tools(self.tools)
         self.messages: List[Message] = []
-        self.doc = Doc()
         self.terminal_ui = TerminalUI()
         self.tools.set_terminal_ui(self.terminal_ui)
         self.should_stop = False
+        self.tools.set_stop_checker(self.check_stop)
         self.token_tracker = TokenTracker()
         self.settings = load_settings()
         self.workflow = Workflow()
+        router_config = self.config.tool_router
+        self.router = ToolRouter(router_config.top_k, router_config.core, router_config.recent) if router_config.enabled else None
     
     def set_stop_flag(self, stop: bool):
         """设置终止标志"""
@@ -125,19 +128,25 @@ class Bot:
             )
             self._add_message(msg)            
     
-    async def init_mcp(self):
+    async def init_mcp(self, verbose: bool = True):
         """
         初始化 MCP 连接并合并工具定义到 AI 客户端
         必须在 init_prompt 之后调用
+
+        Args:
+            verbose: 是否输出连接进度，后台预热时为 False
         """
-        await self.tools.init_mcp()
+        await self.tools.init_mcp(verbose=verbose)
         mcp_tools = self.tools.get_mcp_tools_definition()
         
-        self.ai.tools = registry.get_tools_definition(if_not_timer=self.if_user_or_timer,if_not_subagent=self.if_user_or_subagent)
+        # 合并内置工具和 MCP 工具
+        self.all_tools = list(registry.get_frozen_schemas(if_not_timer=self.if_user_or_timer,if_not_subagent=self.if_user_or_subagent))
+        self.all_tools.extend(freeze_schema(definition) for definition in mcp_tools)
+        # 开启工具路由时只更新候选列表，不覆盖本轮已按输入选出的工具，下一轮由 _route_tools 重新选择
+        if self.router is None:
+            self.ai.tools = [item.schema for item in self.all_tools]
         if mcp_tools:
-            # 合并内置工具和 MCP 工具
-            self.ai.tools.extend(mcp_tools)
-            if self.terminal_ui:
+            if self.terminal_ui and verbose:
                 self.terminal_ui.system(f"[MCP] 已加载 {len(mcp_tools)} 个 MCP 工具")
     def init_system_prompt(self):
         """初始化系统提示"""
@@ -148,7 +157,7 @@ class Bot:
             Os = "macOS"
         else:
             Os = "Linux"
-        doc_list = str(self.doc.value)
+        doc_list = str(self.tools.doc.value)
         skill_list = str(self.tools.skill.skill_dict)
         role_list = str(self.tools.role.role_dict)
         prompt=self.prompt.get_prompt("Sys.md").format(
@@ -166,11 +175,13 @@ class Bot:
         return msg
     async def chat(self, message: str, ui=None):
         """与智能体交互"""
+        from rich.markdown import Markdown  # markdown-it 较重，首次对话时再导入
         # 对话次数超过最大次数，且开启token保存模式
         # 清空记忆
         # 重置token使用记录 
         set_msg = self.init_system_prompt()
         self._set_memory(set_msg,1)
+        self.tools.set_stream_ui(ui)
         msg = Message(
             role="user",
             content=message
@@ -178,6 +189,7 @@ class Bot:
         self.ai.log.add_log(msg)
         
         self._add_message(msg)
+        self._route_tools(message)
         
         messages = self._get_messages()
         
@@ -219,6 +231,8 @@ class Bot:
             
             if ui and tool_name:
                 ui.start_thinking(tool_name)
+            if self.router:
+                self.router.record_use(tool_call.function.name.strip() for tool_call in message.tool_calls)
             tool_messages = await self.tools.execute(message,self.if_user_or_timer)
             if ui and tool_name:
                 ui.stop_thinking()
@@ -337,6 +351,27 @@ class Bot:
         """获取 token 使用摘要"""
         return self.token_tracker.get_summary()
     
+    def _route_tools(self, query: str):
+        """开启工具路由时，按用户输入选择本轮发送给模型的工具定义"""
+        if not self.router:
+            return
+        selected = self.router.select(query, self.all_tools)
+        self.ai.tools = [item.schema for item in selected]
+    
+    def get_tool_schema_summary(self) -> str:
+        """获取工具定义占用 token 的摘要"""
+        full_tokens = sum(item.tokens for item in self.all_tools)
+        summary = f"工具定义: {len(self.all_tools)} 个, 每次请求约 {full_tokens} tokens"
+        if self.router:
+            stats = self.router.stats()
+            if stats["turns"]:
+                saved = stats["full_tokens"] - stats["selected_tokens"]
+                summary += (f"\n工具路由: {stats['turns']} 轮, 平均每轮约 {stats['selected_tokens'] // stats['turns']} tokens, "
+                            f"共节省约 {saved} tokens（按每轮首次请求计）")
+        else:
+            summary += "（未开启工具路由，可在 config.yaml 的 tool_router 中开启）"
+        return summary
+    
     def get_message_count(self) -> int:
         """
         获取消息数量
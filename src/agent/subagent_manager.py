@@ -7,6 +7,7 @@ from datetime import datetime
 from typing import Dict, Optional, List
 from src.agent.ai import Message
 from src.agent.subagent import SubAgent
+from src.ttl_cache import get_tool_cache
 
 
 class SubAgentManager:
@@ -17,6 +18,11 @@ class SubAgentManager:
 
     def __init__(self):
         """初始化管理器"""
+        # 单例：再次调用 SubAgentManager() 时不重置已有的任务和状态
+        if getattr(self, '_initialized', False):
+            return
+        self._initialized = True
+
         # 互斥锁保护所有共享数据的并发访问
         self._lock = threading.Lock()
 
@@ -246,6 +252,13 @@ class SubAgentManager:
                 # 从任务列表删除
                 if task_id in self._tasks:
                     del self._tasks[task_id]
+            # 子智能体状态变化，get_subagent 的缓存结果失效
+            get_tool_cache().invalidate("get_subagent")
+            # 关闭本线程事件循环上的 HTTP 连接池和浏览器池
+            from tools.http_client import close_http_client
+            from tools.browser_pool import close_browser_pool
+            loop.run_until_complete(close_http_client())
+            loop.run_until_complete(close_browser_pool())
             loop.close()
 
     def wait_all_tasks(self) -> str:
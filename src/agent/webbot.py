@@ -16,6 +16,9 @@ from src.agent.ai import AIClient, Message
 from src.prompt import BotPromt
 
 
+# extract 工具返回给模型的网页内容默认 token 预算
+EXTRACT_MAX_TOKENS = 4000
+
 class WebBot:
     """
     WebBot智能体
@@ -33,6 +36,7 @@ class WebBot:
         self.prompt = BotPromt()
         self.ai = AIClient()
         self._task_history: List[Dict] = []
+        self._current_task = ""
     
     async def close(self):
         """关闭资源"""
@@ -46,10 +50,16 @@ class WebBot:
         执行Web任务（主入口）- 支持工具调用
         Args:
             task: 任务描述
-            context: 上下文信息
+            context: 上下文信息，load_resources 为本任务需要加载的资源类型（如截图时的 image、stylesheet）
         Returns:
             任务执行结果
         """
+        self._current_task = task
+        # 每个任务按需放行被默认拦截的资源，没有指定时恢复默认策略
+        load_resources = (context or {}).get("load_resources")
+        await self.browser.set_request_policy(
+            self.browser.default_policy.allowing(load_resources) if load_resources else None
+        )
         try:
             # 构建系统提示词，包含工具调用格式说明
             system_prompt = self._build_system_prompt()
@@ -130,7 +140,7 @@ class WebBot:
 - fill_form: 批量填写表单，参数: {"form_data": {"selector1": "value1", "selector2": "value2"}}
 - submit: 提交表单，参数: {"selector": "提交按钮选择器(可选)"}
 - get_content: 获取当前页面内容，参数: {}
-- extract: 提取网页结构化内容，参数: {"url": "https://example.com"}
+- extract: 提取网页结构化内容（Markdown 正文、标题结构、表格和相关链接），参数: {"url": "https://example.com", "query": "关注的问题(可选)", "max_tokens": 4000}
 - scroll: 滚动页面，参数: {"distance": 500, "steps": 1}
 - screenshot: 截图，参数: {"path": "screenshot.png", "full_page": false}
 - close: 关闭浏览器，参数: {}
@@ -298,14 +308,18 @@ class WebBot:
         """
         提取网页结构化内容
         Args:
-            args: 包含url的字典
+            args: 包含url的字典，可选 query（用于给链接排序，默认为当前任务）和 max_tokens
         Returns:
-            提取的内容
+            按 token 预算渲染的 Markdown
         """
         try:
             url = args.get("url", "")
             result = await self.extractor.extract(url)
-            return result.to_json()
+            return await asyncio.to_thread(
+                result.to_markdown,
+                max_tokens=int(args.get("max_tokens") or EXTRACT_MAX_TOKENS),
+                query=args.get("query") or self._current_task
+            )
         except Exception as e:
             return f"提取失败: {str(e)}"
     
@@ -321,12 +335,13 @@ class WebBot:
             url = args.get("url", "")
             question = args.get("question", "")
             result = await self.extractor.extract(url)
+            page = await asyncio.to_thread(result.to_markdown, max_tokens=EXTRACT_MAX_TOKENS, query=question)
             
             system_prompt = self.prompt.get_prompt("WebAgent.md")
             messages = [
                 Message(role="system", content=system_prompt),
                 Message(role="user", content=question),
-                Message(role="user", content=f"网页内容:\n{result.to_json()}")
+                Message(role="user", content=f"网页内容:\n{page}")
             ]
             
             response = self.ai.chat(messages)
@@ -11,24 +11,32 @@ from src import main
 from config.config import setup_wizard
 from src.terminal import check_and_run_setup_wizard
 from src.agent.bot import Bot
+from src.agent.ai import preload_litellm
 from src.memory import get_shared_memory
 
 
 @click.command()
 @click.option("-m", "--chat", help="单次对话内容")
-def main_cli(chat):
+@click.option("--profile-startup", is_flag=True, help="分析启动耗时：模块导入耗时和到出现输入提示的时间")
+def main_cli(chat, profile_startup):
     """
     ShitBot - 一个功能强大的 AI 智能助手终端应用
     
     不带参数运行时默认启动交互式对话
     使用 -m 参数执行单次对话
     """
+    if profile_startup:
+        from src.startup_profile import profile_startup as run_profile
+        sys.exit(run_profile())
     if chat:
         # 执行单次对话
         try:
             # 检查配置
             check_and_run_setup_wizard()
             
+            # litellm 导入较慢，与 Bot 创建和 MCP 连接并行进行
+            preload_litellm()
+            
             # 初始化 Bot
             bot = Bot(shared_memory=get_shared_memory())
             bot.init_prompt()
@@ -8,10 +8,9 @@ import platform
 import time
 from typing import List
 from src.agent.ai import Message
-from src.agent.memory_bot import MemoryBot
 from src.prompt import BotPromt
+from src.services import get_services
 from config.config import load_config
-from tools.doc import Doc  
 
 
 
@@ -24,12 +23,20 @@ class SharedMemory:
     
     def __init__(self):
         self.messages: List[Message] = []
-        self.memory_bot = MemoryBot()
         self.prompt = BotPromt()
         self.config = load_config()
-        self.doc = Doc()
         self.tools = None
     
+    @property
+    def memory_bot(self):
+        """记忆检索机器人（进程共享，首次使用时创建）"""
+        return get_services().get("memory_bot")
+    
+    @property
+    def doc(self):
+        """文档索引（进程共享，文档目录变化时重建）"""
+        return get_services().get("doc")
+    
     def add_message(self, message: Message):
         """
         添加消息到记忆
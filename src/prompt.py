@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 from config.config import load_config
+from tools.file_cache import get_file_cache
 
 
 class BotPromt:
@@ -24,10 +25,7 @@ class BotPromt:
         if not os.path.exists(prompt_path):
             raise FileNotFoundError(f"提示词文件不存在: {prompt_path}")
         
-        with open(prompt_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        return content
+        return get_file_cache().read_text(prompt_path)
 
     def get_all_prompts(self, prompt_dir: str = None) -> dict:
         """
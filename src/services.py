@@ -0,0 +1,328 @@
+"""
+服务注册表
+Tool 依赖的各项服务（搜索客户端、WebBot、记忆机器人、邮件读取器、虚拟环境等）
+统一在这里登记，第一次被工具用到时才创建，并在进程内共享：
+主智能体、子智能体和定时任务智能体不再各自重复构建一整套服务。
+
+作用域：
+- process: 进程内唯一实例
+- thread: 每个线程一个实例，用于绑定事件循环的服务（子智能体各自在独立线程和事件循环中运行）
+
+可以为服务提供 stamp 函数，stamp 变化时重新创建实例（角色、技能、文档目录内容变化后自动重新扫描）。
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class ServiceSpec:
+    """服务登记信息"""
+    name: str
+    factory: Callable[[], Any]
+    scope: str = "process"                       # "process" 或 "thread"
+    stamp: Optional[Callable[[], Any]] = None    # 返回值变化时重建实例
+    description: str = ""
+
+
+@dataclass
+class _Slot:
+    """已创建的服务实例"""
+    instance: Any
+    stamp: Any = None
+    build_seconds: float = 0.0
+    builds: int = field(default=1)
+
+
+class ServiceRegistry:
+    """
+    懒加载服务注册表（线程安全）
+    """
+
+    def __init__(self):
+        self._specs: Dict[str, ServiceSpec] = {}
+        self._slots: Dict[str, _Slot] = {}
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        self._build_locks: Dict[str, threading.Lock] = {}
+
+    def register(self,
+                 name: str,
+                 factory: Callable[[], Any],
+                 scope: str = "process",
+                 stamp: Optional[Callable[[], Any]] = None,
+                 description: str = ""):
+        """
+        登记服务
+
+        Args:
+            name: 服务名称
+            factory: 无参工厂函数，第一次获取服务时调用
+            scope: 作用域，"process" 进程共享，"thread" 每线程一个
+            stamp: 可选的版本函数，返回值变化时重新调用 factory
+            description: 服务说明
+        """
+        if scope not in ("process", "thread"):
+            raise ValueError(f"不支持的作用域: {scope}")
+        with self._lock:
+            self._specs[name] = ServiceSpec(name, factory, scope, stamp, description)
+            self._slots.pop(name, None)
+            self._build_locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str) -> Any:
+        """
+        获取服务实例，不存在时创建
+
+        Args:
+            name: 服务名称
+
+        Returns:
+            服务实例
+
+        Raises:
+            KeyError: 服务未登记
+        """
+        spec = self._specs.get(name)
+        if spec is None:
+            raise KeyError(f"服务未登记: {name}")
+        slots = self._thread_slots() if spec.scope == "thread" else self._slots
+        stamp = spec.stamp() if spec.stamp else None
+
+        slot = slots.get(name)
+        if slot is not None and slot.stamp == stamp:
+            return slot.instance
+
+        with self._build_locks[name]:
+            slot = slots.get(name)
+            if slot is not None and slot.stamp == stamp:
+                return slot.instance
+            start = time.perf_counter()
+            instance = spec.factory()
+            builds = slot.builds + 1 if slot else 1
+            slots[name] = _Slot(instance, stamp, time.perf_counter() - start, builds)
+            return instance
+
+    def peek(self, name: str) -> Any:
+        """
+        获取已创建的服务实例，不会触发创建
+
+        Returns:
+            服务实例，未创建时返回 None
+        """
+        spec = self._specs.get(name)
+        if spec is None:
+            return None
+        slots = self._thread_slots() if spec.scope == "thread" else self._slots
+        slot = slots.get(name)
+        return slot.instance if slot else None
+
+    def is_created(self, name: str) -> bool:
+        """服务在当前作用域内是否已创建"""
+        return self.peek(name) is not None
+
+    def warm(self, names: Optional[List[str]] = None) -> Dict[str, float]:
+        """
+        预先创建服务
+
+        Args:
+            names: 服务名称列表，None 表示全部
+
+        Returns:
+            dict: 服务名称 -> 创建耗时（秒），创建失败的服务值为 -1
+        """
+        result = {}
+        for name in names or list(self._specs):
+            start = time.perf_counter()
+            try:
+                self.get(name)
+                result[name] = time.perf_counter() - start
+            except Exception:
+                result[name] = -1
+        return result
+
+    def reset(self, name: Optional[str] = None):
+        """
+        丢弃已创建的实例，下次获取时重新创建
+
+        Args:
+            name: 服务名称，None 表示全部（仅当前线程的 thread 作用域实例）
+        """
+        thread_slots = self._thread_slots()
+        with self._lock:
+            if name is None:
+                self._slots.clear()
+                thread_slots.clear()
+            else:
+                self._slots.pop(name, None)
+                thread_slots.pop(name, None)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取服务创建情况
+
+        Returns:
+            dict: 服务名称 -> {scope, created, builds, build_seconds}
+        """
+        result = {}
+        thread_slots = self._thread_slots()
+        for name, spec in self._specs.items():
+            slot = (thread_slots if spec.scope == "thread" else self._slots).get(name)
+            result[name] = {
+                "scope": spec.scope,
+                "created": slot is not None,
+                "builds": slot.builds if slot else 0,
+                "build_seconds": slot.build_seconds if slot else 0.0
+            }
+        return result
+
+    def _thread_slots(self) -> Dict[str, _Slot]:
+        slots = getattr(self._local, "slots", None)
+        if slots is None:
+            slots = self._local.slots = {}
+        return slots
+
+
+def dir_stamp(path: str, marker: Optional[str] = None) -> tuple:
+    """
+    目录内容版本：目录本身和其中文件（或子目录中的 marker 文件）的 mtime
+
+    Args:
+        path: 目录路径
+        marker: 子目录中的标记文件名（如 ROLE.md），为 None 时检查目录下的文件
+
+    Returns:
+        tuple: 可比较的版本值，目录不存在时返回空元组
+    """
+    try:
+        entries = []
+        with os.scandir(path) as it:
+            for entry in it:
+                target = os.path.join(entry.path, marker) if marker else entry.path
+                try:
+                    entries.append((entry.name, os.stat(target).st_mtime_ns))
+                except OSError:
+                    entries.append((entry.name, 0))
+        return (os.stat(path).st_mtime_ns, tuple(sorted(entries)))
+    except OSError:
+        return ()
+
+
+# ==================== 默认服务 ====================
+
+_SHITBOT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".shitbot")
+
+
+def _load_config():
+    from config.config import load_config
+    return load_config()
+
+
+def _create_bocha():
+    from tools.bocha import BochaSearch
+    return BochaSearch(api_key=_load_config().bocha.api_key)
+
+
+def _create_tavily():
+    from tools.tavily_api import TavilySearch
+    return TavilySearch()
+
+
+def _create_web_bot():
+    from src.agent.webbot import WebBot
+    return WebBot()
+
+
+def _create_memory_bot():
+    from src.agent.memory_bot import MemoryBot
+    return MemoryBot()
+
+
+def _create_timer():
+    from tools.timer import get_timer
+    return get_timer()
+
+
+def _create_venv_manager():
+    from tools.venv_manager import get_venv_manager
+    return get_venv_manager(runner_config=_load_config().code_runner)
+
+
+def _create_role():
+    from tools.role import Role
+    return Role()
+
+
+def _create_skill():
+    from tools.skill import Skill
+    return Skill()
+
+
+def _create_doc():
+    from tools.doc import Doc
+    return Doc()
+
+
+def _create_subagent_manager():
+    from src.agent.subagent_manager import get_subagent_manager
+    return get_subagent_manager()
+
+
+def _create_email_reader():
+    """未配置 IMAP 账号时返回 None"""
+    from tools.email_reader import EmailReader
+    imap_config = _load_config().imap
+    if not (imap_config.email and imap_config.password):
+        return None
+    return EmailReader(
+        email_address=imap_config.email,
+        password=imap_config.password,
+        imap_server=imap_config.imap_server,
+        imap_port=imap_config.imap_port
+    )
+
+
+def _create_mcp_client():
+    from tools.mcp_client import MCPClient
+    return MCPClient()
+
+
+def _register_default_services(services: ServiceRegistry):
+    """登记 Tool 使用的默认服务"""
+    services.register("bocha", _create_bocha, description="博查搜索")
+    services.register("tavily", _create_tavily, description="Tavily 搜索")
+    # WebBot 持有 Playwright 浏览器，绑定创建它的事件循环，每个线程单独一份
+    services.register("web_bot", _create_web_bot, scope="thread", description="网页操作智能体")
+    services.register("memory_bot", _create_memory_bot, description="记忆检索")
+    services.register("timer", _create_timer, description="定时任务")
+    services.register("venv", _create_venv_manager, description="Python 虚拟环境")
+    services.register("role", _create_role, stamp=lambda: dir_stamp(os.path.join(_SHITBOT_DIR, "roles"), "ROLE.md"), description="角色列表")
+    services.register("skill", _create_skill, stamp=lambda: dir_stamp(os.path.join(_SHITBOT_DIR, "skills"), "SKILL.md"), description="技能列表")
+    services.register("doc", _create_doc, stamp=lambda: dir_stamp(os.path.join(_SHITBOT_DIR, "docs")), description="文档索引")
+    services.register("subagent", _create_subagent_manager, description="子智能体管理")
+    services.register("email_reader", _create_email_reader, description="IMAP 邮件读取")
+    services.register("mcp_client", _create_mcp_client, description="MCP 客户端")
+
+
+# 全局服务注册表（单例模式）
+_global_services: Optional[ServiceRegistry] = None
+_services_lock = threading.Lock()
+
+
+def get_services() -> ServiceRegistry:
+    """
+    获取全局服务注册表，首次调用时登记默认服务
+
+    Returns:
+        ServiceRegistry: 全局服务注册表
+    """
+    global _global_services
+    if _global_services is None:
+        with _services_lock:
+            if _global_services is None:
+                services = ServiceRegistry()
+                _register_default_services(services)
+                _global_services = services
+    return _global_services
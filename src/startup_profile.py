@@ -0,0 +1,195 @@
+"""
+启动耗时分析（shitbot --profile-startup）
+在子进程中以 python -X importtime 走一遍交互模式出现输入提示之前的流程，
+汇总模块导入的累计耗时，并给出各阶段到出现输入提示的时间
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Dict, List
+
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass
+class ImportRecord:
+    """-X importtime 输出中的一条记录"""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(text: str) -> List[ImportRecord]:
+    """
+    解析 -X importtime 的输出
+
+    Args:
+        text: 标准错误中的 importtime 输出（可以混有其他行）
+
+    Returns:
+        List[ImportRecord]: 导入记录，顺序与输出一致
+    """
+    records = []
+    for line in text.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0].strip())
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            continue  # 表头
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        records.append(ImportRecord(name.strip(), self_us, cumulative_us, depth))
+    return records
+
+
+def summarize_imports(records: List[ImportRecord], top: int = 15) -> Dict[str, list]:
+    """
+    汇总导入耗时
+
+    Args:
+        records: parse_importtime 的结果
+        top: 每项保留的条数
+
+    Returns:
+        dict:
+            total_us: 全部导入的总耗时
+            cumulative: 累计耗时最高的模块 [(模块, 累计微秒)]，已去掉被其父模块包含的重复项
+            packages: 按顶层包汇总的自身耗时 [(包名, 微秒)]
+    """
+    total_us = sum(r.self_us for r in records)
+
+    packages: Dict[str, int] = {}
+    for r in records:
+        root = r.module.split(".")[0]
+        packages[root] = packages.get(root, 0) + r.self_us
+
+    # 同一个包只保留最外层的那次导入，避免 litellm / litellm.main / ... 重复占满列表
+    cumulative = []
+    seen_roots = set()
+    for r in sorted(records, key=lambda r: -r.cumulative_us):
+        root = r.module.split(".")[0]
+        if root in seen_roots:
+            continue
+        seen_roots.add(root)
+        cumulative.append((r.module, r.cumulative_us))
+        if len(cumulative) >= top:
+            break
+
+    return {
+        "total_us": total_us,
+        "cumulative": cumulative,
+        "packages": sorted(packages.items(), key=lambda item: -item[1])[:top]
+    }
+
+
+def _child_main(result_path: str):
+    """
+    子进程：执行交互模式出现输入提示前的步骤并记录时间点
+    不启动定时器（避免在分析时触发已保存的定时任务），也不显示欢迎界面；
+    MCP 由后台预热连接时不在出现输入提示之前，单独计时
+    """
+    import asyncio
+    marks = {"start": time.time()}
+    from src.terminal import ShitBotTerminal
+    from src.warmup import mcp_in_background
+    marks["imports"] = time.time()
+    terminal = ShitBotTerminal()
+    marks["bot"] = time.time()
+    background = mcp_in_background(terminal.config)
+    if not background:
+        asyncio.run(terminal.bot.init_mcp())
+    marks["prompt"] = time.time()
+    if background:
+        asyncio.run(terminal.bot.init_mcp(verbose=False))
+    marks["mcp"] = time.time()
+    marks["mcp_background"] = background
+    with open(result_path, "w", encoding="utf-8") as f:
+        json.dump(marks, f)
+
+
+def profile_startup(top: int = 15) -> int:
+    """
+    分析启动耗时并打印报告
+
+    Args:
+        top: 显示的条数
+
+    Returns:
+        int: 子进程退出码
+    """
+    fd, result_path = tempfile.mkstemp(prefix="shitbot_profile_", suffix=".json")
+    os.close(fd)
+    env = dict(os.environ)
+    env["PYTHONPATH"] = PROJECT_ROOT + os.pathsep + env.get("PYTHONPATH", "")
+
+    spawn = time.time()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "src.startup_profile", result_path],
+        cwd=PROJECT_ROOT,
+        env=env,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        errors="replace"
+    )
+    end = time.time()
+
+    try:
+        with open(result_path, "r", encoding="utf-8") as f:
+            marks = json.load(f)
+    except (OSError, ValueError):
+        marks = {}
+    finally:
+        try:
+            os.remove(result_path)
+        except OSError:
+            pass
+
+    records = parse_importtime(proc.stderr)
+    other_lines = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+    if proc.returncode != 0 or not marks:
+        print("启动分析失败：")
+        print("\n".join(other_lines[-20:]))
+        return proc.returncode or 1
+
+    summary = summarize_imports(records, top)
+
+    def ms(seconds: float) -> str:
+        return f"{seconds * 1000:9.1f} ms"
+
+    print("启动耗时分析（到出现输入提示）")
+    print(f"  解释器启动   {ms(marks['start'] - spawn)}")
+    print(f"  模块导入     {ms(marks['imports'] - marks['start'])}")
+    print(f"  创建 Bot     {ms(marks['bot'] - marks['imports'])}")
+    if not marks["mcp_background"]:
+        print(f"  MCP 初始化   {ms(marks['prompt'] - marks['bot'])}")
+    print(f"  合计         {ms(marks['prompt'] - spawn)}")
+    print(f"  （子进程总耗时 {ms(end - spawn).strip()}，importtime 统计本身会带来少量额外开销）")
+    if marks["mcp_background"]:
+        print("\n后台预热（出现输入提示后进行，不计入合计）：")
+        print(f"  MCP 初始化   {ms(marks['mcp'] - marks['prompt'])}")
+
+    print(f"\n模块导入总耗时 {summary['total_us'] / 1000:.1f} ms，累计耗时最高的导入：")
+    for module, us in summary["cumulative"]:
+        print(f"  {us / 1000:9.1f} ms  {module}")
+
+    print("\n按顶层包汇总（各模块自身耗时之和）：")
+    for package, us in summary["packages"]:
+        print(f"  {us / 1000:9.1f} ms  {package}")
+    return 0
+
+
+if __name__ == "__main__":
+    _child_main(sys.argv[1])
@@ -9,6 +9,8 @@ from prompt_toolkit.formatted_text import FormattedText
 from prompt_toolkit.key_binding import KeyBindings
 from prompt_toolkit.keys import Keys
 from src.agent.bot import Bot
+from src.agent.ai import preload_litellm
+from src.warmup import start_warmup_and_mcp
 from config.config import load_config, setup_wizard
 from src.ui_components import TerminalUI
 from src.memory import SharedMemory, get_shared_memory
@@ -130,6 +132,7 @@ class ShitBotTerminal:
         self.bot = Bot(shared_memory=get_shared_memory())
         self.bot.init_prompt()
         self.should_stop = False
+        self.warmup = None
         escape_listener.set_callbacks(self.bot, self.ui)
     
     def get_status_bar_text(self):
@@ -149,6 +152,12 @@ class ShitBotTerminal:
         completion_tokens = token_usage.completion_tokens
         
         return f"[dim cyan]模型: {full_model} | 工作流: {workflow} | Token: {total_tokens} ({prompt_tokens}+{completion_tokens})[/dim cyan]"
+
+    def get_warmup_toolbar(self):
+        """输入提示底部的状态栏，实时显示后台预热组件的就绪情况"""
+        if not self.warmup:
+            return ""
+        return self.warmup.status_text()
     
     async def handle_command(self, command: str) -> bool:
         command = command.strip() # 移除首尾空格        
@@ -171,6 +180,7 @@ class ShitBotTerminal:
                     {"name": "/clear", "description": "清除屏幕"},
                     {"name": "/new", "description": "开始新会话"},
                     {"name": "/token", "description": "查看 Token 使用统计"},
+                    {"name": "/cache", "description": "查看工具缓存命中统计"},
                     {"name": "/workflow", "description": "查看/切换工作流 (例: /workflow coder)"},
                     {"name": "/add", "description": "添加文件到禁止列表 (例: /add /path/to/file)"},
                     {"name": "/remove", "description": "从禁止列表删除文件 (例: /remove /path/to/file)"},
@@ -220,6 +230,11 @@ class ShitBotTerminal:
             elif cmd == '/token':
                 token_summary = self.bot.get_token_summary()
                 self.ui.system(f"\n{token_summary}")
+                self.ui.info(self.bot.get_tool_schema_summary())
+                return True
+            
+            elif cmd == '/cache':
+                self.ui.system(f"\n{self._get_cache_summary()}")
                 return True
             
             elif cmd == '/workflow':
@@ -244,9 +259,45 @@ class ShitBotTerminal:
         
         return False
     
+    def _get_cache_summary(self) -> str:
+        """获取各类工具缓存的命中统计"""
+        from tools.file_cache import get_file_cache
+        from tools.dir_tree import get_dir_tree
+        from src.ttl_cache import get_tool_cache
+        from tools.search_cache import get_search_cache
+        from tools.extract_cache import get_extract_cache
+        from tools.request_policy import get_block_stats
+        file_stats = get_file_cache().stats()
+        dir_stats = get_dir_tree().stats()
+        tool_stats = get_tool_cache().stats()
+        search_stats = get_search_cache().stats()
+        extract_stats = get_extract_cache().stats()
+        block_stats = get_block_stats().stats()
+        return (
+            f"文件内容缓存: 命中 {file_stats['hits']} / 未命中 {file_stats['misses']}, "
+            f"{file_stats['files']} 个文件, {file_stats['bytes'] // 1024}K / {file_stats['max_bytes'] // 1024}K, "
+            f"淘汰 {file_stats['evictions']} 次\n"
+            f"目录树缓存: 命中 {dir_stats['hits']} / 未命中 {dir_stats['misses']}, {dir_stats['dirs']} 个目录\n"
+            f"工具结果缓存: 命中 {tool_stats['hits']} / 未命中 {tool_stats['misses']}, {tool_stats['entries']} 条, "
+            f"淘汰 {tool_stats['evictions']} 次, 失效 {tool_stats['invalidations']} 次\n"
+            f"搜索结果缓存: 内存命中 {search_stats['memory_hits']} / 磁盘命中 {search_stats['disk_hits']} / "
+            f"未命中 {search_stats['misses']}, {search_stats['memory_entries']} 条, "
+            f"磁盘 {search_stats['disk_bytes'] // 1024}K, 淘汰 {search_stats['disk_evictions']} 次\n"
+            f"网页提取缓存: 内存命中 {extract_stats['memory_hits']} / 磁盘命中 {extract_stats['disk_hits']} / "
+            f"未命中 {extract_stats['misses']}, 验证未变化 {extract_stats['revalidated']} 次, "
+            f"磁盘 {extract_stats['disk_bytes'] // 1024}K, 淘汰 {extract_stats['disk_evictions']} 次\n"
+            f"浏览器请求拦截: {block_stats['blocked_requests']} 个请求, 约 {block_stats['blocked_bytes'] // 1024}K"
+        )
+    
     async def cleanup(self):
         if self.browser_manager:
             self.browser_manager.close()
+        from tools.http_client import close_http_client
+        from tools.browser_pool import close_browser_pool
+        await close_http_client()
+        await close_browser_pool()
+        from tools.html_extract import shutdown_pool
+        shutdown_pool()
     
     def _add_stop_file(self, file_path: str):
         """添加文件到停止列表"""
@@ -295,7 +346,9 @@ class ShitBotTerminal:
                     'index_name': self.config.bocha.index_name
                 },
                 'browser': {
-                    'playwright_browsers_path': self.config.browser.playwright_browsers_path or ''
+                    'playwright_browsers_path': self.config.browser.playwright_browsers_path or '',
+                    'max_pages_per_context': self.config.browser.max_pages_per_context,
+                    'idle_timeout': self.config.browser.idle_timeout
                 },
                 'email': {
                     'smtp_server': self.config.email.smtp_server,
@@ -311,7 +364,13 @@ class ShitBotTerminal:
                     'key': self.config.tavily.key
                 },
                 'web_search': {
-                    'web_search_ID': self.config.web_search.web_search_ID
+                    'web_search_ID': self.config.web_search.web_search_ID,
+                    'mode': self.config.web_search.mode,
+                    'providers': self.config.web_search.providers,
+                    'deadline': self.config.web_search.deadline,
+                    'grace': self.config.web_search.grace,
+                    'batch_concurrency': self.config.web_search.batch_concurrency,
+                    'batch_max_queries': self.config.web_search.batch_max_queries
                 },
                 'default_provider': self.config.default_provider
             }, f, default_flow_style=False, allow_unicode=True)
@@ -340,8 +399,14 @@ class ShitBotTerminal:
     async def run(self):
         check_and_run_setup_wizard()
         
-        # 初始化 MCP 连接
-        await self.bot.init_mcp()
+        # litellm 在后台导入，不阻塞出现输入提示
+        preload_litellm()
+        
+        # MCP、IMAP、虚拟环境、浏览器和索引在后台并行预热，不阻塞出现输入提示
+        self.warmup = await start_warmup_and_mcp(self.bot, self.config)
+        
+        # 工具服务改为懒加载后，定时器需要在交互模式启动时显式创建，已保存的定时任务才能按时触发
+        self.bot.tools.timer
         
         self.ui.show_welcome()
         
@@ -355,7 +420,9 @@ class ShitBotTerminal:
                    FormattedText([("class:user", "> ")]),
                     style=PromptStyle.from_dict({
                         "user": "ansigreen bold",
-                    })
+                    }),
+                    bottom_toolbar=self.get_warmup_toolbar if self.warmup else None,
+                    refresh_interval=0.5
                 ) 
                 if not user_input.strip():
                     continue
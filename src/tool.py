@@ -2,25 +2,23 @@
 # 重构：使用装饰器自动注册工具，消除重复定义
 import asyncio
 import json
-import inspect
 import os
 import re
-from typing import Optional, Dict, Any
-from src.tool_registry import registry
-from tools.doc import Doc
-from src.agent.memory_bot import MemoryBot
-from src.agent.webbot import WebBot
-from tools.bocha import BochaSearch
-from tools.timer import get_timer
-from tools.venv_manager import VenvManager
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, List, Tuple
+from src.tool_registry import registry, compile_handler, ToolArgumentError, ToolFailure, ToolHandler
+from src.services import get_services
+from src.ttl_cache import get_tool_cache, normalize_args, MISSING
+from src.warmup import get_warmup
 from tools.safe import safe_format
-from tools.role import Role
-from tools.skill import Skill
-from tools.tavily_api import TavilySearch
-from tools.email_reader import EmailReader
-from tools.mcp_client import MCPClient, MCPServerConfig
+from tools.dir_tree import get_dir_tree
+from tools.file_cache import get_file_cache
+from tools.search_cache import get_search_cache, normalize_query
+from tools.web_search import fan_out_search, format_fanout_results, format_batch_results, limit_concurrency
+from tools.shell import run_shell_command, ShellSession, wait_with_stop
 from src.agent.ai import Message
-from src.agent.subagent_manager import SubAgentManager
 from src.ui_components import TerminalUI
 
 
@@ -30,48 +28,86 @@ class Tool:
         self.config = self._load_config()
         self.bocha_config = self.config.bocha
         self.stop_file = self.config.stop.file
-        self.bocha_client = BochaSearch(api_key=self.bocha_config.api_key)
-        self.web_bot = WebBot()
-        self.timer = get_timer()
         self.terminal_ui = None  # 暂时设为 None，稍后从外部设置
         self.shared_memory = shared_memory
-        self.memory_bot = MemoryBot()
-        self.venv_manager = VenvManager()
-        self.role = Role()
-        self.skill = Skill()
         self.project_root = os.path.dirname(os.path.abspath(__file__))
-        self.tavily_client = TavilySearch()
-        self.doc = Doc()
-        self.subagent = SubAgentManager()
+        self.dir_tree = get_dir_tree()
+        self.file_cache = get_file_cache()
+        self.tool_cache = get_tool_cache()
 
-        # 初始化邮件读取器
-        self.email_reader = None
-        self._init_email_reader()
+        # 搜索、WebBot、记忆、邮件等服务在第一次使用时才创建，并在进程内共享
+        self.services = get_services()
+
+        # shell_command 的实时输出界面、终止标志检查和常驻会话
+        self.stream_ui = None
+        self.stop_checker = None
+        self.shell_session = None
 
-        # 初始化 MCP 客户端
-        self.mcp_client = MCPClient()
         self._mcp_initialized = False
 
-    def _init_email_reader(self):
-        """初始化邮件读取器"""
-        try:
-            imap_config = self.config.imap
-            if imap_config.email and imap_config.password:
-                self.email_reader = EmailReader(
-                    email_address=imap_config.email,
-                    password=imap_config.password,
-                    imap_server=imap_config.imap_server,
-                    imap_port=imap_config.imap_port
-                )
-        except Exception as e:
-            pass
+        # 预编译的分发表（进程内共享），MCP 工具连接后另行编译
+        self.dispatch = registry.compile()
+        self._mcp_handlers: Dict[str, ToolHandler] = {}
+
+    # ==================== 懒加载服务 ====================
+
+    @property
+    def bocha_client(self):
+        return self.services.get("bocha")
+
+    @property
+    def tavily_client(self):
+        return self.services.get("tavily")
+
+    @property
+    def web_bot(self):
+        return self.services.get("web_bot")
+
+    @property
+    def memory_bot(self):
+        return self.services.get("memory_bot")
+
+    @property
+    def timer(self):
+        return self.services.get("timer")
+
+    @property
+    def venv_manager(self):
+        return self.services.get("venv")
+
+    @property
+    def role(self):
+        return self.services.get("role")
+
+    @property
+    def skill(self):
+        return self.services.get("skill")
+
+    @property
+    def doc(self):
+        return self.services.get("doc")
+
+    @property
+    def subagent(self):
+        return self.services.get("subagent")
+
+    @property
+    def email_reader(self):
+        return self.services.get("email_reader")
+
+    @property
+    def mcp_client(self):
+        return self.services.get("mcp_client")
 
     # ==================== MCP 集成 ====================
 
-    async def init_mcp(self):
+    async def init_mcp(self, verbose: bool = True):
         """
         初始化 MCP 连接
         从配置文件读取 MCP Server 列表并连接
+
+        Args:
+            verbose: 是否打印连接进度
         """
         if self._mcp_initialized:
             return
@@ -84,6 +120,7 @@ class Tool:
             return
 
         # 将配置中的 server 项转换为 MCPServerConfig
+        from tools.mcp_client import MCPServerConfig
         server_configs = []
         for srv in mcp_config.servers:
             server_configs.append(MCPServerConfig(
@@ -96,9 +133,21 @@ class Tool:
                 description=srv.description
             ))
 
-        await self.mcp_client.connect_all(server_configs)
+        await self.mcp_client.connect_all(server_configs, verbose=verbose)
         self._mcp_initialized = True
 
+        # MCP 工具与内置工具走同一套分发逻辑，参数按其 inputSchema 校验
+        self._mcp_handlers = {
+            definition["function"]["name"]: compile_handler(
+                definition,
+                _mcp_caller(definition["function"]["name"]),
+                is_async=True,
+                requires="mcp",
+                allow_extra=True
+            )
+            for definition in self.mcp_client.get_tools_definition()
+        }
+
     def get_mcp_tools_definition(self) -> list:
         """
         获取 MCP 工具的 OpenAI function calling 格式定义
@@ -117,6 +166,34 @@ class Tool:
         """
         self.terminal_ui = terminal_ui
 
+    def set_stream_ui(self, ui):
+        """
+        设置实时输出界面，shell_command 执行时逐行显示输出
+
+        Args:
+            ui: TerminalUI 实例，None 表示不显示（定时任务、子智能体）
+        """
+        self.stream_ui = ui
+
+    def set_stop_checker(self, stop_checker):
+        """
+        设置终止标志检查函数，长时间运行的工具会轮询它以便及时停止
+
+        Args:
+            stop_checker: 无参函数，返回 True 表示用户请求终止
+        """
+        self.stop_checker = stop_checker
+
+    def _should_stop(self) -> bool:
+        """
+        当前工具调用是否应当结束：用户按下 Esc，或本次调用已超时/被取消
+        可以在同步工具的工作线程中调用
+        """
+        event = _cancel_event.get()
+        if event is not None and event.is_set():
+            return True
+        return bool(self.stop_checker and self.stop_checker())
+
     def _load_config(self):
         """加载配置"""
         from config.config import load_config
@@ -124,35 +201,183 @@ class Tool:
 
     # ==================== 工具方法 - 使用装饰器自动注册 ====================
 
-    @registry.tool("在网络上搜索信息")
+    @registry.tool("在网络上搜索信息", timeout=60)
     async def search_web(self, query: str, count: int = 5) -> str:
         """
         在网络上搜索信息
+        结果按 (搜索服务, 规范化后的查询, 结果数) 缓存，只缓存成功且完整的结果（并发检索时所有服务都按时返回）
 
         Args:
             query: 搜索查询词
             count: 返回结果数量，默认5
         """
-        if self.config.web_search.web_search_ID == "1":
+        web_search = self.config.web_search
+        if web_search.mode == "fanout":
+            provider = "fanout:" + "+".join(web_search.providers)
+        else:
+            provider = "bocha" if str(web_search.web_search_ID) == "1" else "tavily"
+        search_cache = get_search_cache()
+        cached = search_cache.get(provider, query, count)
+        if cached is not None:
+            return cached
+
+        if web_search.mode == "fanout":
+            providers = self._search_providers(web_search.providers)
+            outcome = await fan_out_search(query, count, providers, deadline=web_search.deadline, grace=web_search.grace)
+            if not outcome.results:
+                return f"✗ 搜索失败: {outcome.failed or '没有服务在时限内返回结果'}"
+            result = format_fanout_results(outcome)
+            # 有服务失败或超时的结果不完整，不缓存，下次重新查询
+            if outcome.failed or outcome.timed_out:
+                return result
+        elif provider == "bocha":
             response = await self.bocha_client.search(query, count=count)
-            if response.success:
-                return self.bocha_client.format_results(response)
-            else:
+            if not response.success:
                 return f"✗ 搜索失败: {response.error}"
+            result = self.bocha_client.format_results(response)
         else:
-            return self.tavily_client.search(query, max_results=count)
+            result = await self.tavily_client.asearch(query, max_results=count)
+        search_cache.set(provider, query, count, result)
+        return result
+
+    @registry.tool("批量网络搜索：一次提交多个查询词并发搜索，结果按查询分组，重复的网页只列出一次", timeout=120)
+    async def search_web_batch(self, queries: List[str], count: int = 5) -> str:
+        """
+        批量网络搜索，需要搜索多个相关问题时代替多次调用 search_web
+
+        Args:
+            queries: 搜索查询词列表
+            count: 每个查询返回的结果数量，默认5
+        """
+        web_search = self.config.web_search
+        unique, seen = [], set()
+        for query in queries:
+            query = str(query).strip()
+            key = normalize_query(query)
+            if key and key not in seen:
+                seen.add(key)
+                unique.append(query)
+        if not unique:
+            return "✗ 没有有效的查询词"
+        unique = unique[:web_search.batch_max_queries]
+
+        if web_search.mode == "fanout":
+            names = web_search.providers
+        else:
+            names = ["bocha" if str(web_search.web_search_ID) == "1" else "tavily"]
+        providers = self._search_providers(names)
+        if not providers:
+            return "✗ 搜索失败: 没有配置可用的搜索服务"
+        # 每个搜索服务各自限制并发数，避免触发限流
+        providers = {
+            name: limit_concurrency(search, asyncio.Semaphore(web_search.batch_concurrency))
+            for name, search in providers.items()
+        }
+
+        start = time.perf_counter()
+        outcomes = await asyncio.gather(
+            *(self._search_results(query, count, providers) for query in unique),
+            return_exceptions=True
+        )
+        return format_batch_results(unique, outcomes, time.perf_counter() - start)
+
+    async def _search_results(self, query: str, count: int, providers: Dict[str, Any]) -> list:
+        """
+        搜索并返回结构化结果，多个服务时并发查询并融合排序，结果写入搜索缓存
+
+        Raises:
+            RuntimeError: 所有服务都失败或超时
+        """
+        web_search = self.config.web_search
+        provider = "results:" + "+".join(providers)
+        search_cache = get_search_cache()
+        cached = search_cache.get(provider, query, count)
+        if cached is not None:
+            return json.loads(cached)
+
+        if len(providers) == 1:
+            search = next(iter(providers.values()))
+            results = (await search(query, count))[:count]
+        else:
+            outcome = await fan_out_search(query, count, providers, deadline=web_search.deadline, grace=web_search.grace)
+            if not outcome.results and (outcome.failed or outcome.timed_out):
+                raise RuntimeError(str(outcome.failed or "没有服务在时限内返回结果"))
+            results = outcome.results
+            if outcome.failed or outcome.timed_out:
+                return results
+        search_cache.set(provider, query, count, json.dumps(results, ensure_ascii=False))
+        return results
+
+    def _search_providers(self, names) -> Dict[str, Any]:
+        """
+        构建并发检索使用的搜索服务
+
+        Args:
+            names: 服务名列表（bocha、tavily），未知或未配置密钥的服务被跳过
+
+        Returns:
+            dict: 服务名 -> 异步搜索函数
+        """
+        async def bocha(query: str, count: int) -> list:
+            response = await self.bocha_client.search(query, count=count)
+            if not response.success:
+                raise RuntimeError(response.error)
+            return response.results
+
+        async def tavily(query: str, count: int) -> list:
+            return await self.tavily_client.asearch_results(query, max_results=count)
 
-    @registry.tool("让WebBot执行任务,WebBot是一个浏览器操作助手,它可以查看网页信息,点击网页,填写表单等浏览器修改功能")
-    async def webbot_task(self, query: str) -> str:
+        available = {}
+        if self.config.bocha.api_key:
+            available["bocha"] = bocha
+        if self.config.tavily.key:
+            available["tavily"] = tavily
+        return {name: available[name] for name in names if name in available}
+
+    @registry.tool("让WebBot执行任务,WebBot是一个浏览器操作助手,它可以查看网页信息,点击网页,填写表单等浏览器修改功能", requires="browser", timeout=600)
+    async def webbot_task(self, query: str, load_resources: Optional[List[str]] = None) -> str:
         """
         让WebBot执行任务
 
         Args:
             query: 告诉WebBot要执行的任务
+            load_resources: 本任务需要加载的资源类型（默认不加载视频音频和字体），可选 image、stylesheet、media、font
         """
-        response = await self.web_bot.execute_task(query)
+        context = {"load_resources": load_resources} if load_resources else None
+        response = await self.web_bot.execute_task(query, context)
         return response
 
+    @registry.tool("并发读取多个网页的正文内容（静态网页直接下载，需要执行 JavaScript 的网页用浏览器渲染）", requires="browser", timeout=300)
+    async def extract_web_pages(self, urls: List[str], concurrency: int = 4, max_tokens: int = 1500, query: str = "") -> str:
+        """
+        并发读取多个网页的正文内容，每个网页渲染为不超过 token 预算的 Markdown
+
+        Args:
+            urls: 网址列表
+            concurrency: 同时打开的页面数，默认4
+            max_tokens: 每个网页最多返回的 token 数，默认1500
+            query: 关注的问题（可选），用于挑选相关链接
+        """
+        from tools.playwiright import SmartWebExtractor
+        urls = [str(url).strip() for url in urls if str(url).strip()]
+        if not urls:
+            return "✗ 没有有效的网址"
+        extractor = SmartWebExtractor(wait_for_network_idle=False, scroll_to_load=False)
+        results = {}
+        async for url, content in extractor.extract_many(urls, concurrency=concurrency):
+            results[url] = content
+
+        sections = []
+        for url in dict.fromkeys(urls):
+            content = results.get(url)
+            if isinstance(content, Exception) or content is None:
+                sections.append(f"== {url} ==\n✗ 读取失败: {content}")
+                continue
+            # 与 WebBot 的 extract 工具使用同一种按 token 预算渲染的格式
+            markdown = await asyncio.to_thread(content.to_markdown, max_tokens=max_tokens, query=query)
+            sections.append(f"== {url} ==\n{markdown}")
+        return "\n\n".join(sections)
+
     @registry.tool("读取指定文件内容")
     def read_file(self, file_path: str) -> str:
         """
@@ -164,9 +389,7 @@ class Tool:
         if file_path in self.stop_file:
             return "操作包含在禁止列表中，已拒绝"
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            return content
+            return self.file_cache.read_text(file_path)
         except Exception as e:
             return f"读取文件时出错: {str(e)}"
 
@@ -184,6 +407,7 @@ class Tool:
         try:
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.write(content)
+            self._invalidate_path(file_path)
             return f"成功写入文件: {file_path}"
         except Exception as e:
             return f"写入文件时出错: {str(e)}"
@@ -202,6 +426,7 @@ class Tool:
         try:
             import shutil
             shutil.copy(source_path, dest_path)
+            self._invalidate_path(dest_path)
             return f"成功复制文件: {source_path} -> {dest_path}"
         except Exception as e:
             return f"复制文件时出错: {str(e)}"
@@ -225,6 +450,8 @@ class Tool:
         try:
             import shutil
             shutil.move(source_path, dest_path)
+            self._invalidate_path(source_path)
+            self._invalidate_path(dest_path)
             return f"成功移动文件: {source_path} -> {dest_path}"
         except Exception as e:
             return f"移动文件时出错: {str(e)}"
@@ -244,6 +471,7 @@ class Tool:
             if os.path.exists(dir_path):
                 return f"目录已存在: {dir_path}，请不要重复创建相同的文件夹"
             os.makedirs(dir_path, exist_ok=True)
+            self._invalidate_path(dir_path)
             return f"成功创建目录: {dir_path}"
         except Exception as e:
             return f"创建目录时出错: {str(e)}"
@@ -265,25 +493,69 @@ class Tool:
         except Exception as e:
             return f"获取目录内容时出错: {str(e)}"
 
-    @registry.tool("执行 shell 命令")
-    def shell_command(self, command: str, use_timeout: bool = True) -> str:
+    @registry.tool("递归获取目录树（含文件大小和修改时间），一次调用即可了解整个项目结构")
+    def get_dir_tree(self, dir_path: str, max_depth: int = 3, max_entries: int = 200, ignore: str = "") -> str:
+        """
+        递归获取目录树
+
+        Args:
+            dir_path: 要查看的目录路径
+            max_depth: 最大递归深度，默认3，1表示只列出当前目录
+            max_entries: 最多列出的条目数，默认200
+            ignore: 额外忽略的文件或目录匹配规则，多个用逗号分隔，如 "*.log,dist"
+        """
+        if dir_path in self.stop_file:
+            return "操作包含在禁止列表中，已拒绝"
+        if not os.path.isdir(dir_path):
+            return f"目录不存在: {dir_path}"
+        try:
+            patterns = [p.strip() for p in ignore.split(",")] if ignore else []
+            return self.dir_tree.render(
+                dir_path,
+                max_depth=max(1, max_depth),
+                max_entries=max(1, max_entries),
+                ignore=patterns,
+                exclude_paths=self.stop_file
+            )
+        except Exception as e:
+            return f"获取目录树时出错: {str(e)}"
+
+    @registry.tool("执行 shell 命令", timeout=0)
+    async def shell_command(self, command: str, use_timeout: bool = True, persistent: bool = False) -> str:
         """
         执行 shell 命令
 
         Args:
             command: 要执行的 shell 命令
             use_timeout: 是否启用超时限制，默认为true。启用后命令执行超过60秒将自动终止并返回当前输出，防止命令长时间等待用户输入
+            persistent: 是否在常驻 shell 会话中执行，默认为false。开启后 cd、环境变量等状态会保留到下一次 persistent 调用
         """
+        timeout_seconds = 60 if use_timeout else None
+        on_output = self.stream_ui.stream if self.stream_ui else None
         try:
-            import subprocess
-            timeout_seconds = 60 if use_timeout else None
-            result = subprocess.run(command, shell=True, check=True, text=True, capture_output=True, encoding='utf-8', errors='replace', timeout=timeout_seconds)
-            return result.stdout
-        except subprocess.TimeoutExpired as e:
-            output = (e.stdout or "") + (e.stderr or "")
-            return f"命令执行超时（超过60秒），已终止命令。\n当前输出:\n{output}"
-        except subprocess.CalledProcessError as e:
-            return f"命令执行失败: {e.stderr}"
+            if persistent:
+                if self.shell_session is None:
+                    self.shell_session = ShellSession()
+                result = await self.shell_session.run(
+                    command, timeout=timeout_seconds,
+                    on_output=on_output, should_stop=self._should_stop
+                )
+            else:
+                result = await run_shell_command(
+                    command, timeout=timeout_seconds,
+                    on_output=on_output, should_stop=self._should_stop
+                )
+        except Exception as e:
+            return f"命令执行失败: {str(e)}"
+
+        reset_note = "\n常驻会话已重置，之前的 cd 和环境变量需要重新设置。" if persistent else ""
+        if result.timed_out:
+            return f"命令执行超时（超过60秒），已终止命令。{reset_note}\n当前输出:\n{result.output}"
+        if result.cancelled:
+            return f"命令已被用户终止。{reset_note}\n当前输出:\n{result.output}"
+        if result.returncode != 0:
+            return f"命令执行失败（返回码 {result.returncode}）:\n{result.output}"
+        return result.output
 
     @registry.tool("发送邮件到指定邮箱")
     def send_email(self, to_email: str, subject: str, body: str) -> str:
@@ -368,14 +640,14 @@ class Tool:
         tasks = self.timer.get_tasks()
         return f"当前定时任务列表：{tasks}"
 
-    @registry.tool("删除文件")
+    @registry.tool("删除文件", context=("if_user",))
     async def delete_file(self, file_path: str, if_user: bool = True) -> str:
         """
         删除文件
 
         Args:
             file_path: 要删除的文件路径
-            if_user: 是否为用户操作，定时器操作默认拒绝
+            if_user: 是否为用户操作，定时器操作默认拒绝（由执行方注入，不暴露给模型）
         """
         if file_path in self.stop_file:
             return "操作包含在禁止列表中，已拒绝"
@@ -394,11 +666,12 @@ class Tool:
                 return f"{file_path} 不是一个文件"
 
             os.remove(file_path)
+            self._invalidate_path(file_path)
             return f"成功删除文件: {file_path}"
         except Exception as e:
             return f"删除文件时出错: {str(e)}"
 
-    @registry.tool("让memory_bot在以前的对话记录总结信息")
+    @registry.tool("让memory_bot在以前的对话记录总结信息", requires="index")
     def get_memory(self, memory_description: str) -> str:
         """
         让memory_bot在以前的对话记录总结信息
@@ -409,14 +682,14 @@ class Tool:
         r = self.memory_bot.get_memory(memory_description)
         return r
 
-    @registry.tool("列出所有可以阅读的doc文档")
+    @registry.tool("列出所有可以阅读的doc文档", requires="index")
     def get_doc_list(self) -> str:
         """
         列出所有可以阅读的doc文档
         """
         return str(self.doc.value)
 
-    @registry.tool("获取doc文档内容,建议先调用get_doc_list获取文档列表")
+    @registry.tool("获取doc文档内容,建议先调用get_doc_list获取文档列表", requires="index")
     def get_doc(self, file_name: str, key: str) -> str:
         """
         获取doc文档内容
@@ -427,21 +700,22 @@ class Tool:
         """
         return self.doc.get_data(file_name, key)
 
-    @registry.tool("运行python代码")
-    def run_code(self, code: str) -> str:
+    @registry.tool("运行python代码", requires="venv")
+    def run_code(self, code: str, session_id: str = "") -> str:
         """
         运行python代码
 
         Args:
             code: python代码
+            session_id: 会话ID，可选。传入相同的ID时变量和已导入的模块会保留到下次调用，适合分步处理数据；留空则每次使用全新的环境
         """
         try:
-            returncode, stdout, stderr = self.venv_manager.run_python(code)
+            returncode, stdout, stderr = self.venv_manager.run_python(code, session_id=session_id, should_stop=self._should_stop)
             return f"代码执行结果: 返回码{returncode}, 输出: {stdout}, 错误: {stderr}"
         except Exception as e:
             return f"代码执行失败：{e}"
 
-    @registry.tool("运行python代码文件")
+    @registry.tool("运行python代码文件", requires="venv")
     def run_code_file(self, code_file: str) -> str:
         """
         运行python代码文件
@@ -453,19 +727,18 @@ class Tool:
             return "代码文件必须是 .py 格式"
         if not os.path.exists(code_file):
             return "代码文件不存在"
-        with open(code_file, "r", encoding="utf-8") as f:
-            code = f.read()
-        returncode, stdout, stderr = self.venv_manager.run_python(code)
+        code = self.file_cache.read_text(code_file)
+        returncode, stdout, stderr = self.venv_manager.run_python(code, should_stop=self._should_stop)
         return f"代码执行结果: 返回码{returncode}, 输出: {stdout}, 错误: {stderr}"
 
-    @registry.tool("列出所有可以阅读的角色")
+    @registry.tool("列出所有可以阅读的角色", requires="index")
     def get_role(self) -> str:
         """
         列出所有可以阅读的角色
         """
         return str(self.role.role_dict)
 
-    @registry.tool("列出所有可以阅读的技能文档")
+    @registry.tool("列出所有可以阅读的技能文档", requires="index")
     def get_skill(self) -> str:
         """
         列出所有可以阅读的技能文档
@@ -473,14 +746,14 @@ class Tool:
         return str(self.skill.skill_dict)
 
 
-    @registry.tool("列出邮箱中的所有文件夹")
+    @registry.tool("列出邮箱中的所有文件夹", requires="imap", cache_ttl=600)
     def list_email_folders(self) -> str:
         """
         列出邮箱中的所有文件夹
         """
         error = self._ensure_email_connection()
         if error:
-            return error
+            return ToolFailure(error)
 
         try:
             result = self.email_reader.list_folders()
@@ -488,11 +761,11 @@ class Tool:
                 folders = result.get("folders", [])
                 return f"邮箱文件夹列表：\n" + "\n".join([f"  - {f}" for f in folders])
             else:
-                return f"获取文件夹列表失败: {result.get('error')}"
+                return ToolFailure(f"获取文件夹列表失败: {result.get('error')}")
         except Exception as e:
-            return f"操作失败: {str(e)}"
+            return ToolFailure(f"操作失败: {str(e)}")
 
-    @registry.tool("获取邮箱中的邮件列表")
+    @registry.tool("获取邮箱中的邮件列表", requires="imap")
     def get_email_list(self, folder: str = "INBOX", limit: int = 10, unread_only: bool = False) -> str:
         """
         获取邮箱中的邮件列表
@@ -534,7 +807,7 @@ class Tool:
         except Exception as e:
             return f"操作失败: {str(e)}"
 
-    @registry.tool("获取指定邮件的详细内容")
+    @registry.tool("获取指定邮件的详细内容", requires="imap")
     def get_email_content(self, email_id: str, folder: str = "INBOX") -> str:
         """
         获取指定邮件的详细内容
@@ -585,7 +858,7 @@ class Tool:
         except Exception as e:
             return f"操作失败: {str(e)}"
 
-    @registry.tool("搜索邮件（按主题、发件人、正文搜索）")
+    @registry.tool("搜索邮件（按主题、发件人、正文搜索）", requires="imap")
     def search_emails(self, criteria: str, folder: str = "INBOX", limit: int = 10) -> str:
         """
         搜索邮件
@@ -628,7 +901,7 @@ class Tool:
         except Exception as e:
             return f"操作失败: {str(e)}"
 
-    @registry.tool("标记邮件为已读")
+    @registry.tool("标记邮件为已读", requires="imap")
     def mark_email_read(self, email_id: str, folder: str = "INBOX") -> str:
         """
         标记邮件为已读
@@ -668,6 +941,7 @@ class Tool:
         try:
             with open(file_path, 'a', encoding='utf-8') as f:
                 f.write(content)
+            self._invalidate_path(file_path)
             return f"成功追加内容到文件: {file_path}"
         except Exception as e:
             return f"追加内容时出错: {str(e)}"
@@ -685,13 +959,13 @@ class Tool:
         if file_path in self.stop_file:
             return "操作包含在禁止列表中，已拒绝"
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
+            lines = self.file_cache.read_lines(file_path)
             if line_number < 1 or line_number > len(lines) + 1:
                 return f"行号超出范围，文件共有{len(lines)}行，有效行号为1-{len(lines)+1}"
             lines.insert(line_number - 1, content + '\n')
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.writelines(lines)
+            self._invalidate_path(file_path)
             return f"成功在第{line_number}行插入内容: {file_path}"
         except Exception as e:
             return f"插入内容时出错: {str(e)}"
@@ -709,8 +983,7 @@ class Tool:
         if file_path in self.stop_file:
             return "操作包含在禁止列表中，已拒绝"
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
+            lines = self.file_cache.read_lines(file_path)
             if line_number < 1 or line_number > len(lines):
                 return f"行号超出范围，文件共有{len(lines)}行，有效行号为1-{len(lines)}"
 
@@ -740,8 +1013,7 @@ class Tool:
         if file_path in self.stop_file:
             return "操作包含在禁止列表中，已拒绝"
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
+            lines = self.file_cache.read_lines(file_path)
             if line_number < 1 or line_number > len(lines):
                 return f"行号超出范围，文件共有{len(lines)}行，有效行号为1-{len(lines)}"
 
@@ -760,6 +1032,7 @@ class Tool:
 
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.writelines(lines)
+            self._invalidate_path(file_path)
             return message
         except Exception as e:
             return f"删除行内容时出错: {str(e)}"
@@ -776,8 +1049,7 @@ class Tool:
         if file_path in self.stop_file:
             return "操作包含在禁止列表中，已拒绝"
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
+            lines = self.file_cache.read_lines(file_path)
             total_lines = len(lines)
             result = [f"文件: {file_path}"]
             result.append(f"总行数: {total_lines}")
@@ -836,7 +1108,7 @@ class Tool:
         self.timer.daily_at(description=task, hour=hour, minute=minute)
         return f"定时任务已添加：每天 {hour}:{minute} 执行 {task}"
 
-    @registry.tool("发布给子智能体的任务，该工具会给指定的子智能体分配一个任务，任务会在后台并行执行，请在分配完所有任务后调用 wait_all_subagent_tasks 等待全部完成")
+    @registry.tool("发布给子智能体的任务，该工具会给指定的子智能体分配一个任务，任务会在后台并行执行，请在分配完所有任务后调用 wait_all_subagent_tasks 等待全部完成", invalidates=("get_subagent",))
     def subagent_task(self, task: str, role_id: str) -> str:
         """
         发布给子智能体的任务并行执行
@@ -851,7 +1123,7 @@ class Tool:
             return "请提供角色ID"
         result = self.subagent.run_background_task(role_id, task, self.shared_memory)
         return result
-    @registry.tool("创建子智能体，子智能体可以重复使用，不限制创建数量")
+    @registry.tool("创建子智能体，子智能体可以重复使用，不限制创建数量", invalidates=("get_subagent",))
     def create_subagent(self,role: str, description: str)  -> str:
         """创建子智能体
 
@@ -864,7 +1136,7 @@ class Tool:
         result = self.subagent.create_subagent(role, description)
         return result
 
-    @registry.tool("等待所有子智能体任务完成，所有任务完成后才会返回，之后才能继续使用其他工具")
+    @registry.tool("等待所有子智能体任务完成，所有任务完成后才会返回，之后才能继续使用其他工具", invalidates=("get_subagent",), timeout=0)
     def wait_all_subagent_tasks(self) -> str:
         """等待所有子智能体任务完成
 
@@ -873,7 +1145,7 @@ class Tool:
         """
         return self.subagent.wait_all_tasks()
 
-    @registry.tool("获取所有子智能体的详细信息")
+    @registry.tool("获取所有子智能体的详细信息", cache_ttl=60)
     def get_subagent(self) -> str:
         """获取所有子智能体的详细信息
 
@@ -887,106 +1159,214 @@ class Tool:
 
     # ==================== 私有辅助方法 ====================
 
+    def _invalidate_path(self, path: str):
+        """文件被写入、移动或删除后，使文件内容缓存和目录树缓存失效"""
+        self.file_cache.invalidate(path)
+        self.dir_tree.invalidate(path)
+
     def _ensure_email_connection(self) -> str:
         """确保邮件读取器已连接到服务器，返回错误信息或None"""
-        if not self.email_reader:
+        email_reader = self.email_reader
+        if not email_reader:
             return "邮件读取器未初始化，请检查IMAP配置"
 
-        if not self.email_reader.connection:
-            result = self.email_reader.connect()
-            if not result.get("success"):
-                return f"连接邮件服务器失败: {result.get('error')}"
+        with email_reader.lock:
+            if not email_reader.connection:
+                result = email_reader.connect()
+                if not result.get("success"):
+                    return f"连接邮件服务器失败: {result.get('error')}"
 
         return None  # 连接成功，返回None表示无错误
 
-    # ==================== 核心执行逻辑 - 动态分发 ====================
+    # ==================== 核心执行逻辑 - 分发表 ====================
+
+    def _get_handler(self, tool_name: str) -> Optional[ToolHandler]:
+        """在分发表中查找工具，内置工具优先，其次是 MCP 工具"""
+        handler = self.dispatch.get(tool_name)
+        if handler is None:
+            handler = self._mcp_handlers.get(tool_name)
+        return handler
+
+    async def _dispatch(self, tool_name: str, arguments, context: Dict[str, Any]) -> str:
+        """
+        执行一次工具调用
+
+        Args:
+            tool_name: 工具名
+            arguments: 模型给出的参数（JSON 字符串或字典）
+            context: 注入参数的取值，如 {"if_user": True}
+
+        Returns:
+            str: 返回给模型的内容
+        """
+        try:
+            args = _parse_arguments(arguments)
+        except json.JSONDecodeError as e:
+            return f"参数解析失败: {str(e)}, 原始参数: {arguments}"
+
+        # 只等待该工具依赖的后台预热组件（如邮箱工具只等 IMAP 登录）
+        warmup = get_warmup()
+        if warmup:
+            await warmup.wait_for_tool(tool_name)
+
+        handler = self._get_handler(tool_name)
+        if handler is None:
+            return f"工具不存在: {tool_name}"
+
+        try:
+            kwargs = handler.validate(args)
+        except ToolArgumentError as e:
+            return f"调用工具 {tool_name} 失败，{e}"
+        for name in handler.context_params:
+            kwargs[name] = context.get(name)
+
+        # 幂等的查询类工具：相同参数在有效期内直接返回缓存结果
+        cache_key = None
+        if handler.cache_ttl:
+            cache_key = normalize_args(kwargs)
+            cached = self.tool_cache.lookup(tool_name, cache_key)
+            if cached is not MISSING:
+                return cached
+
+        timeout = self._get_timeout(handler)
+        try:
+            state, result = await self._run_handler(handler, kwargs, timeout)
+        except Exception as e:
+            return f"执行工具 {tool_name} 时出错: {str(e)}"
+        finally:
+            for name in handler.invalidates:
+                self.tool_cache.invalidate(name)
+        if state != "done":
+            return _interrupted_result(tool_name, state, timeout)
+
+        content = str(result)
+        # 失败的结果不缓存，服务恢复后下次调用重新执行
+        if cache_key is not None and not isinstance(result, ToolFailure):
+            self.tool_cache.set(tool_name, cache_key, content, handler.cache_ttl)
+        return content
+
+    def _get_timeout(self, handler: ToolHandler) -> Optional[float]:
+        """工具超时：config.yaml 中按工具的配置 > 工具注册时的默认值 > 配置中的默认值，0 表示不限制"""
+        timeouts = self.config.tool_timeouts
+        timeout = timeouts.tools.get(handler.name)
+        if timeout is None:
+            timeout = handler.timeout
+        if timeout is None:
+            timeout = timeouts.default
+        return timeout or None
+
+    async def _run_handler(self, handler: ToolHandler, kwargs: Dict[str, Any], timeout: Optional[float]) -> Tuple[str, Any]:
+        """
+        把一次工具调用作为可取消的任务运行，同步工具放到线程中执行，不阻塞事件循环
+
+        超时或用户终止时先设置本次调用的取消标志，shell_command、run_code 等会响应标志、
+        结束子进程并返回已有输出；宽限时间过后仍未结束的任务直接取消
+        （线程中的同步工具无法强制中断，会在后台运行结束，结果被丢弃）
+
+        Returns:
+            tuple: (状态 "done" / "timeout" / "stopped", 工具返回值)
+        """
+        cancel_event = threading.Event()
+        token = _cancel_event.set(cancel_event)
+        try:
+            if handler.is_async:
+                task = asyncio.ensure_future(handler.func(self, **kwargs))
+            else:
+                # to_thread 会复制当前上下文，线程中的工具也能读到取消标志
+                task = asyncio.ensure_future(asyncio.to_thread(handler.func, self, **kwargs))
+        finally:
+            _cancel_event.reset(token)
+
+        try:
+            state = await wait_with_stop(task, timeout, self.stop_checker)
+        except asyncio.CancelledError:
+            cancel_event.set()
+            task.cancel()
+            raise
+
+        if state != "done":
+            cancel_event.set()
+            done, _ = await asyncio.wait({task}, timeout=_CANCEL_GRACE_SECONDS)
+            if not done:
+                task.cancel()
+                await asyncio.wait({task}, timeout=_CANCEL_GRACE_SECONDS)
+                return state, None
+            if task.cancelled():
+                return state, None
+        return "done", task.result()
 
     async def execute(self, message, if_user: bool = True):
-        """执行工具，动态分发到已注册的方法"""
+        """执行工具，按预编译的分发表分发到内置工具或 MCP 工具"""
         msg_list = []
         if message.tool_calls:
+            context = {"if_user": if_user}
             for tool_call in message.tool_calls:
                 tool_name = tool_call.function.name.strip()
-                arguments = tool_call.function.arguments
-
-                # 尝试清理可能包含 XML 标签的 arguments
- 
-                try:
-                    # 解析 JSON
-                    if isinstance(arguments, str):
-                        # 清理可能的XML标签
-                        import re
-                        arguments = re.sub(r'<[^>]*>', '', arguments).strip()
-                        args = json.loads(arguments)
-                    else:
-                        args = arguments
-                except json.JSONDecodeError as e:
-                    error_msg = f"参数解析失败: {str(e)}, 原始参数: {arguments}"
-                    msg_list.append(Message(
-                        role="tool",
-                        content=error_msg,
-                        tool_call_id=tool_call.id
-                    ))
-                    continue
-
-                # 动态调用已注册的方法
-                try:
-                    # 获取方法
-                    if not hasattr(self, tool_name):
-                        error_msg = f"工具不存在: {tool_name}"
-                        msg_list.append(Message(
-                            role="tool",
-                            content=error_msg,
-                            tool_call_id=tool_call.id
-                        ))
-                        continue
-
-                    func = getattr(self, tool_name)
-                    
-                    # 执行：支持异步和同步方法
-                    # 检查是否是协程函数（处理绑定方法的情况）
-                    import inspect
-                    
-                    # 检查绑定方法的 __func__ 属性
-                    is_coroutine = False
-                    if inspect.iscoroutinefunction(func):
-                        is_coroutine = True
-                    elif hasattr(func, '__func__') and inspect.iscoroutinefunction(func.__func__):
-                        is_coroutine = True
-                    
-                    # 直接检查函数名是否为异步函数
-                    async_functions = ['search_web', 'webbot_task', 'extract_and_analyze', 'search_and_extract']
-                    if tool_name in async_functions:
-                        is_coroutine = True
-                    
-                    if is_coroutine:
-                        # delete_file 需要特殊处理 if_user 参数
-                        if tool_name == "delete_file":
-                            args["if_user"] = if_user
-                            result = await func(**args)
-                        else:
-                            result = await func(**args)
-                    else:
-                        # delete_file 需要特殊处理 if_user 参数
-                        if tool_name == "delete_file":
-                            args["if_user"] = if_user
-                            result = func(**args)
-                        else:
-                            result = func(**args)
-
-                    # 包装结果返回给AI
-                    msg_list.append(Message(
-                        role="tool",
-                        content=str(result),
-                        tool_call_id=tool_call.id
-                    ))
-
-                except Exception as e:
-                    error_msg = f"执行工具 {tool_name} 时出错: {str(e)}"
-                    msg_list.append(Message(
-                        role="tool",
-                        content=error_msg,
-                        tool_call_id=tool_call.id
-                    ))
+                if self.stop_checker and self.stop_checker():
+                    # 用户已终止，剩余的工具调用不再执行
+                    content = _interrupted_result(tool_name, "stopped", None)
+                else:
+                    content = await self._dispatch(tool_name, tool_call.function.arguments, context)
+                msg_list.append(Message(
+                    role="tool",
+                    content=content,
+                    tool_call_id=tool_call.id
+                ))
 
         return msg_list
+
+
+# 当前工具调用的取消标志（超时或用户终止时设置）
+_cancel_event: ContextVar[Optional[threading.Event]] = ContextVar("tool_cancel_event", default=None)
+# 设置取消标志后等待工具自行结束的时间（秒）
+_CANCEL_GRACE_SECONDS = 2
+
+
+def _interrupted_result(tool_name: str, state: str, timeout: Optional[float]) -> str:
+    """工具超时或被终止时返回给模型的结构化结果"""
+    if state == "timeout":
+        payload = {
+            "status": "timeout",
+            "tool": tool_name,
+            "timeout_seconds": timeout,
+            "message": f"工具 {tool_name} 超过 {timeout:g} 秒未完成，已取消。可以缩小任务范围后重试，或换一种方式完成"
+        }
+    else:
+        payload = {
+            "status": "cancelled",
+            "tool": tool_name,
+            "message": "用户终止了当前任务，工具调用已取消"
+        }
+    return json.dumps(payload, ensure_ascii=False)
+
+
+# 部分模型会在参数外面包一层 XML 标签
+_XML_TAG = re.compile(r'<[^>]*>')
+
+
+def _parse_arguments(arguments) -> Dict[str, Any]:
+    """
+    解析模型给出的工具参数，JSON 解析失败时才尝试去掉 XML 标签再解析
+
+    Raises:
+        json.JSONDecodeError: 参数无法解析
+    """
+    if not isinstance(arguments, str):
+        return arguments if arguments is not None else {}
+    if not arguments.strip():
+        return {}
+    try:
+        return json.loads(arguments)
+    except json.JSONDecodeError:
+        stripped = _XML_TAG.sub('', arguments).strip()
+        if stripped == arguments.strip():
+            raise
+        return json.loads(stripped)
+
+
+def _mcp_caller(tool_name: str):
+    """MCP 工具在分发表中的处理函数"""
+    # tool 只能按位置传入，MCP 工具自己也可能有名为 tool 的参数
+    async def call(tool: Tool, /, **arguments):
+        return await tool.mcp_client.call_tool(tool_name, arguments)
+    return call
@@ -3,11 +3,18 @@
 
 原理：通过装饰器收集工具函数，自动从函数签名、类型注解、docstring生成JSON schema
 这样就不用手动维护两份定义了，实现和定义保持一致
+
+执行时使用 compile() 生成的分发表：每个工具预先确定处理函数、是否异步、
+由 JSON schema 编译出的参数校验函数（带类型转换）以及由执行方注入的上下文参数
+
+发送给模型的工具定义只生成一次（FrozenSchema），同时缓存序列化结果和 token 数
 """
 
 import inspect
+import json
 import functools
-from typing import get_type_hints, Callable, Dict, List, Any, Optional
+from dataclasses import dataclass
+from typing import get_args, get_origin, get_type_hints, Callable, Dict, List, Any, Optional, Tuple, Union
 
 
 # Python类型到JSON Schema类型的映射
@@ -23,19 +30,306 @@ TYPE_MAP = {
 }
 
 
+def type_to_schema(param_type: Any) -> Dict[str, Any]:
+    """
+    Python 类型注解转换为 JSON Schema
+    支持 TYPE_MAP 中的类型、List[X]（生成 items）和 Optional[X]
+
+    Args:
+        param_type: 类型注解
+
+    Returns:
+        dict: JSON Schema
+    """
+    origin = get_origin(param_type)
+    if origin is Union:
+        args = [arg for arg in get_args(param_type) if arg is not type(None)]
+        if len(args) == 1:
+            return type_to_schema(args[0])
+    if origin is list:
+        args = get_args(param_type)
+        return {"type": "array", "items": type_to_schema(args[0]) if args else {}}
+    return {"type": TYPE_MAP.get(param_type, "string")}
+
+
+# 定时器相关工具名，定时任务智能体中不提供
+TIMER_TOOLS = frozenset({"once_after", "interval", "daily_at", "cancel_timer", "pause_timer", "resume_timer", "list"})
+# 子智能体中不提供的工具（防止递归创建）
+SUBAGENT_EXCLUDED_TOOLS = frozenset({"create_subagent"})
+
+
+@dataclass(frozen=True)
+class FrozenSchema:
+    """
+    冻结的工具定义，生成后不再修改
+    serialized 是紧凑的 JSON 文本，用于计算 token 数和建立检索索引
+    """
+    name: str
+    schema: Dict[str, Any]
+    serialized: str
+
+    @functools.cached_property
+    def tokens(self) -> int:
+        """工具定义占用的 token 数，首次访问时计算"""
+        from tools.token_count import count_tokens
+        return count_tokens(self.serialized)
+
+
+def freeze_schema(schema: Dict[str, Any]) -> FrozenSchema:
+    """
+    冻结工具定义
+
+    Args:
+        schema: OpenAI function calling 格式的工具定义，之后不应再修改
+
+    Returns:
+        FrozenSchema: 冻结的工具定义
+    """
+    return FrozenSchema(
+        name=schema["function"]["name"],
+        schema=schema,
+        serialized=json.dumps(schema, ensure_ascii=False, separators=(",", ":"))
+    )
+
+
+class ToolArgumentError(ValueError):
+    """工具参数校验失败，错误信息中附带期望的参数列表，便于模型一次改正"""
+
+
+# ==================== 参数校验 ====================
+
+_TRUE_STRINGS = {"true", "1", "yes", "y", "on"}
+_FALSE_STRINGS = {"false", "0", "no", "n", "off", ""}
+
+
+def _coerce_string(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def _coerce_integer(value):
+    if isinstance(value, bool):
+        raise TypeError
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        return int(value.strip())
+    raise TypeError
+
+
+def _coerce_number(value):
+    if isinstance(value, bool):
+        raise TypeError
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        return float(value.strip())
+    raise TypeError
+
+
+def _coerce_boolean(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in _TRUE_STRINGS:
+            return True
+        if text in _FALSE_STRINGS:
+            return False
+    raise ValueError
+
+
+def _coerce_json(expected: type):
+    def coerce(value):
+        if isinstance(value, expected):
+            return value
+        if expected is list and isinstance(value, tuple):
+            return list(value)
+        if isinstance(value, str):
+            parsed = json.loads(value)
+            if isinstance(parsed, expected):
+                return parsed
+        raise TypeError
+    return coerce
+
+
+_COERCERS = {
+    "string": _coerce_string,
+    "integer": _coerce_integer,
+    "number": _coerce_number,
+    "boolean": _coerce_boolean,
+    "array": _coerce_json(list),
+    "object": _coerce_json(dict),
+}
+
+
+def _describe_params(properties: Dict[str, Any], required: Tuple[str, ...]) -> str:
+    """生成参数列表说明，如 file_path (string, 必填), max_depth (integer, 默认 3)"""
+    if not properties:
+        return "无参数"
+    parts = []
+    for name, prop in properties.items():
+        type_name = prop.get("type", "any") if isinstance(prop, dict) else "any"
+        if name in required:
+            parts.append(f"{name} ({type_name}, 必填)")
+        elif isinstance(prop, dict) and "default" in prop:
+            parts.append(f"{name} ({type_name}, 默认 {json.dumps(prop['default'], ensure_ascii=False)})")
+        else:
+            parts.append(f"{name} ({type_name}, 可选)")
+    return ", ".join(parts)
+
+
+def compile_validator(parameters: Dict[str, Any], allow_extra: bool = False) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """
+    由 JSON schema 的 parameters 编译参数校验函数
+
+    只处理顶层参数：按声明的类型做宽松转换（如 "5" -> 5、"true" -> True），
+    检查必填参数；未声明类型的参数原样保留
+
+    Args:
+        parameters: schema 中的 parameters 对象
+        allow_extra: 是否保留 schema 中未声明的参数（MCP 工具交给服务端校验），否则丢弃
+
+    Returns:
+        校验函数：接收参数字典，返回转换后的新字典，失败时抛出 ToolArgumentError
+    """
+    properties = parameters.get("properties") or {}
+    required = tuple(parameters.get("required") or ())
+    coercers = {}
+    for name, prop in properties.items():
+        type_name = prop.get("type") if isinstance(prop, dict) else None
+        coercers[name] = (_COERCERS.get(type_name) if isinstance(type_name, str) else None, type_name)
+    params_text = _describe_params(properties, required)
+
+    def validate(args: Dict[str, Any]) -> Dict[str, Any]:
+        if not isinstance(args, dict):
+            raise ToolArgumentError(f"参数错误: 参数必须是 JSON 对象。参数列表: {params_text}")
+        result = {}
+        errors = []
+        for key, value in args.items():
+            entry = coercers.get(key)
+            if entry is None:
+                if allow_extra:
+                    result[key] = value
+                continue
+            if value is None:
+                # 可选参数传 null 时使用默认值
+                if key in required:
+                    errors.append(f"必填参数 {key} 不能为 null")
+                continue
+            coerce, type_name = entry
+            if coerce is None:
+                result[key] = value
+                continue
+            try:
+                result[key] = coerce(value)
+            except (TypeError, ValueError):
+                errors.append(f"参数 {key} 应为 {type_name}，收到 {json.dumps(value, ensure_ascii=False)[:100]}")
+        missing = [key for key in required if key not in result and key not in args]
+        if missing:
+            errors.insert(0, f"缺少必填参数 {', '.join(missing)}")
+        if errors:
+            raise ToolArgumentError(f"参数错误: {'；'.join(errors)}。参数列表: {params_text}")
+        return result
+
+    return validate
+
+
+class ToolFailure(str):
+    """工具执行失败时返回的错误信息：和普通结果一样返回给模型，但不写入结果缓存"""
+
+
+@dataclass
+class ToolHandler:
+    """分发表中的一项"""
+    name: str
+    func: Callable                        # 未绑定的实现函数，调用时第一个参数传入 Tool 实例
+    is_async: bool
+    validate: Callable[[Dict[str, Any]], Dict[str, Any]]
+    context_params: Tuple[str, ...] = ()  # 由执行方注入、不暴露给模型的参数
+    requires: Optional[str] = None        # 依赖的预热组件
+    cache_ttl: float = 0                  # 结果缓存时间（秒），0 表示不缓存
+    invalidates: Tuple[str, ...] = ()     # 执行后要使其缓存失效的工具
+    timeout: Optional[float] = None       # 默认超时（秒），None 使用配置中的默认值，0 表示不限制
+
+
+def compile_handler(schema: Dict[str, Any],
+                    func: Callable,
+                    is_async: bool,
+                    context_params: Tuple[str, ...] = (),
+                    requires: Optional[str] = None,
+                    allow_extra: bool = False,
+                    cache_ttl: float = 0,
+                    invalidates: Tuple[str, ...] = (),
+                    timeout: Optional[float] = None) -> ToolHandler:
+    """
+    由 OpenAI function calling schema 编译分发项
+
+    Args:
+        schema: 工具定义
+        func: 实现函数
+        is_async: 实现函数是否返回协程
+        context_params: 注入参数
+        requires: 依赖的预热组件
+        allow_extra: 是否保留未声明的参数
+        cache_ttl: 结果缓存时间（秒）
+        invalidates: 执行后要使其缓存失效的工具
+        timeout: 默认超时（秒）
+
+    Returns:
+        ToolHandler: 分发项
+    """
+    function = schema["function"]
+    return ToolHandler(
+        name=function["name"],
+        func=func,
+        is_async=is_async,
+        validate=compile_validator(function.get("parameters") or {}, allow_extra=allow_extra),
+        context_params=tuple(context_params),
+        requires=requires,
+        cache_ttl=cache_ttl,
+        invalidates=tuple(invalidates),
+        timeout=timeout
+    )
+
+
 class ToolRegistry:
     """工具注册表，自动收集并生成工具定义"""
     
     def __init__(self):
         self._tools: Dict[str, Dict[str, Any]] = {}
         self._implementations: Dict[str, Callable] = {}
+        self._requires: Dict[str, str] = {}
+        self._context_params: Dict[str, Tuple[str, ...]] = {}
+        self._cache_options: Dict[str, Tuple[float, Tuple[str, ...]]] = {}
+        self._timeouts: Dict[str, float] = {}
+        self._compiled: Optional[Dict[str, ToolHandler]] = None
+        self._frozen: Dict[Tuple[bool, bool], Tuple[FrozenSchema, ...]] = {}
     
-    def tool(self, description: Optional[str] = None) -> Callable:
+    def tool(self,
+             description: Optional[str] = None,
+             requires: Optional[str] = None,
+             context: Tuple[str, ...] = (),
+             cache_ttl: float = 0,
+             invalidates: Tuple[str, ...] = (),
+             timeout: Optional[float] = None) -> Callable:
         """
         工具装饰器，将函数标记为工具并自动注册
         
         Args:
             description: 工具描述，如果不提供则使用函数docstring
+            requires: 工具依赖的预热组件（如 "imap"、"browser"），执行前会等待该组件就绪
+            context: 由执行方注入的参数名（如 "if_user"），不出现在 schema 中，模型无法传入
+            cache_ttl: 结果缓存时间（秒），只用于幂等的查询类工具，相同参数在有效期内直接返回缓存
+            invalidates: 执行后要使其缓存失效的工具名（如 create_subagent 使 get_subagent 失效）
+            timeout: 默认超时（秒），超时后取消并返回超时结果；None 使用 config.yaml 中的默认值，0 表示不限制
             
         Usage:
             @registry.tool("读取指定文件内容")
@@ -48,22 +342,38 @@ class ToolRegistry:
             doc = description or func.__doc__ or "No description available"
             
             # 解析函数签名生成schema
-            schema = self._function_to_schema(func, name, doc)
+            schema = self._function_to_schema(func, name, doc, exclude=tuple(context))
             
             # 注册
             self._tools[name] = schema
             self._implementations[name] = func
+            if requires:
+                self._requires[name] = requires
+            if context:
+                self._context_params[name] = tuple(context)
+            if cache_ttl or invalidates:
+                self._cache_options[name] = (cache_ttl, tuple(invalidates))
+            if timeout is not None:
+                self._timeouts[name] = timeout
+            self._compiled = None
+            self._frozen = {}
             
-            @functools.wraps(func)
-            def wrapper(*args, **kwargs):
-                return func(*args, **kwargs)
+            # 保留协程函数的特征，inspect.iscoroutinefunction 才能正确识别异步工具
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def wrapper(*args, **kwargs):
+                    return await func(*args, **kwargs)
+            else:
+                @functools.wraps(func)
+                def wrapper(*args, **kwargs):
+                    return func(*args, **kwargs)
             
             return wrapper
         
         return decorator
     
-    def _function_to_schema(self, func: Callable, name: str, description: str) -> Dict[str, Any]:
-        """从函数自动生成OpenAI function calling schema"""
+    def _function_to_schema(self, func: Callable, name: str, description: str, exclude: Tuple[str, ...] = ()) -> Dict[str, Any]:
+        """从函数自动生成OpenAI function calling schema，exclude 中的参数不写入 schema"""
         signature = inspect.signature(func)
         type_hints = get_type_hints(func)
         
@@ -72,18 +382,17 @@ class ToolRegistry:
 
         for param_name, param in signature.parameters.items():
             # 跳过 self 参数（类实例方法的第一个参数）
-            if param_name == 'self':
+            if param_name == 'self' or param_name in exclude:
                 continue
 
             # 获取参数类型
             param_type = type_hints.get(param_name, Any)
-            json_type = TYPE_MAP.get(param_type, "string")
 
             # 获取参数默认值注释（从docstring中提取，或者使用参数名）
             param_doc = self._extract_param_doc(func.__doc__ or "", param_name)
 
             properties[param_name] = {
-                "type": json_type,
+                **type_to_schema(param_type),
                 "description": param_doc or param_name
             }
 
@@ -129,39 +438,73 @@ class ToolRegistry:
         
         return ""
     
-    def get_tools_definition(self, if_not_timer: bool = True, if_not_subagent: bool = True) -> List[Dict[str, Any]]:
-        """获取所有工具定义，用于AI调用
+    def get_frozen_schemas(self, if_not_timer: bool = True, if_not_subagent: bool = True) -> Tuple[FrozenSchema, ...]:
+        """获取冻结的工具定义，每种过滤条件只生成一次
         
         支持过滤：某些工具只在特定条件下可用
         - if_not_timer: 是否包含定时器相关工具（当调用方是用户而非定时器时为True）
         - if_not_subagent: 是否包含子智能体相关工具（当调用方是主智能体而非子智能体时为True）
         """
-        tools = list(self._tools.values())
-        
-        # 需要过滤掉的工具
-        filtered_tools = []
-        
-        # 定时器相关工具名
-        timer_tools = {"once_after", "interval", "daily_at", "cancel_timer", "pause_timer", "resume_timer", "list"}
-        # delete_file也只对用户可见
-        if not if_not_timer:
-            # 定时器上下文，不包含定时器工具
-            tools = [t for t in tools if t["function"]["name"] not in timer_tools]
-        else:
-            # 用户上下文，包含delete_file（只有用户能删文件）
-            pass  # delete_file已经注册，包含
-        
-        # 子智能体相关工具
-        if not if_not_subagent:
-            # 子智能体上下文，不包含create_subagent工具
-            tools = [t for t in tools if t["function"]["name"] != "create_subagent"]
+        key = (if_not_timer, if_not_subagent)
+        frozen = self._frozen.get(key)
+        if frozen is None:
+            excluded = set()
+            if not if_not_timer:
+                # 定时器上下文，不包含定时器工具
+                excluded |= TIMER_TOOLS
+            if not if_not_subagent:
+                # 子智能体上下文，不包含create_subagent工具
+                excluded |= SUBAGENT_EXCLUDED_TOOLS
+            # 同一工具在不同过滤条件下共用一个 FrozenSchema，token 数只计算一次
+            by_name = {item.name: item for cached in self._frozen.values() for item in cached}
+            frozen = tuple(
+                by_name.get(name) or freeze_schema(schema)
+                for name, schema in self._tools.items()
+                if name not in excluded
+            )
+            self._frozen[key] = frozen
+        return frozen
+    
+    def get_tools_definition(self, if_not_timer: bool = True, if_not_subagent: bool = True) -> List[Dict[str, Any]]:
+        """获取所有工具定义，用于AI调用
         
-        return tools
+        返回新的列表，其中的工具定义是共享的冻结对象，不要修改；过滤条件同 get_frozen_schemas
+        """
+        return [item.schema for item in self.get_frozen_schemas(if_not_timer, if_not_subagent)]
+    
+    def compile(self) -> Dict[str, ToolHandler]:
+        """
+        生成分发表，结果会缓存，注册新工具后重新生成
+
+        Returns:
+            dict: 工具名 -> ToolHandler
+        """
+        compiled = self._compiled
+        if compiled is None:
+            compiled = {
+                name: compile_handler(
+                    schema,
+                    self._implementations[name],
+                    is_async=inspect.iscoroutinefunction(self._implementations[name]),
+                    context_params=self._context_params.get(name, ()),
+                    requires=self._requires.get(name),
+                    cache_ttl=self._cache_options.get(name, (0, ()))[0],
+                    invalidates=self._cache_options.get(name, (0, ()))[1],
+                    timeout=self._timeouts.get(name)
+                )
+                for name, schema in self._tools.items()
+            }
+            self._compiled = compiled
+        return compiled
     
     def get_implementation(self, tool_name: str) -> Optional[Callable]:
         """根据工具名获取实现函数"""
         return self._implementations.get(tool_name)
     
+    def get_requirement(self, tool_name: str) -> Optional[str]:
+        """根据工具名获取其依赖的预热组件，没有依赖时返回 None"""
+        return self._requires.get(tool_name)
+    
     def list_tools(self) -> List[str]:
         """列出所有已注册工具名"""
         return list(self._tools.keys())
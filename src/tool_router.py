@@ -0,0 +1,158 @@
+"""
+工具路由：每轮对话只把相关的工具定义发给模型
+完整的工具列表（约 40 个内置工具加上全部 MCP 工具）每次请求要占用数千个 prompt token。
+路由器对工具名、描述和参数说明建立本地 BM25 索引（英文按单词、中文按二元组切分），
+按用户输入选出最相关的 top_k 个工具，再加上始终提供的核心工具和最近用过的工具。
+"""
+
+import math
+import re
+from collections import Counter, deque
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.tool_registry import FrozenSchema
+
+
+_WORD = re.compile(r"[a-z0-9]+|[㐀-鿿]+")
+_CJK = re.compile(r"[㐀-鿿]")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    切分检索词：英文和数字按单词（下划线视为分隔符），连续的中文切成二元组
+
+    Args:
+        text: 文本
+
+    Returns:
+        List[str]: 检索词列表
+    """
+    terms = []
+    for word in _WORD.findall(text.lower()):
+        if _CJK.match(word):
+            if len(word) == 1:
+                terms.append(word)
+            else:
+                terms.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            terms.append(word)
+    return terms
+
+
+def _schema_text(item: FrozenSchema) -> str:
+    """工具的检索文本：名称（加权两次）、描述、参数名和参数说明"""
+    function = item.schema.get("function", {})
+    parts = [item.name, item.name, function.get("description", "")]
+    properties = (function.get("parameters") or {}).get("properties") or {}
+    for name, prop in properties.items():
+        parts.append(name)
+        if isinstance(prop, dict):
+            parts.append(str(prop.get("description", "")))
+    return " ".join(parts)
+
+
+class _BM25Index:
+    """一组工具定义上的 BM25 索引"""
+
+    def __init__(self, items: Sequence[FrozenSchema], k1: float = 1.2, b: float = 0.75):
+        self.items = list(items)
+        self.k1 = k1
+        self.b = b
+        self.term_freqs: List[Counter] = [Counter(tokenize(_schema_text(item))) for item in self.items]
+        self.lengths = [sum(tf.values()) for tf in self.term_freqs]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        doc_freq: Counter = Counter()
+        for tf in self.term_freqs:
+            doc_freq.update(tf.keys())
+        count = len(self.items)
+        self.idf = {term: math.log(1 + (count - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()}
+
+    def scores(self, query: str) -> List[float]:
+        terms = [term for term in set(tokenize(query)) if term in self.idf]
+        result = []
+        for tf, length in zip(self.term_freqs, self.lengths):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / (self.avg_length or 1))
+            for term in terms:
+                freq = tf.get(term)
+                if freq:
+                    score += self.idf[term] * freq * (self.k1 + 1) / (freq + norm)
+            result.append(score)
+        return result
+
+
+class ToolRouter:
+    """
+    每轮对话的工具子集选择
+    """
+
+    def __init__(self, top_k: int = 12, core: Iterable[str] = (), recent_size: int = 5):
+        """
+        Args:
+            top_k: 按相关度选择的工具数
+            core: 始终提供的工具名
+            recent_size: 额外提供最近用过的工具数
+        """
+        self.top_k = top_k
+        self.core = tuple(core)
+        self.recent: deque = deque(maxlen=recent_size)
+        self._index: Optional[_BM25Index] = None
+        self._index_key: Tuple[str, ...] = ()
+        self._last_selected: List[str] = []
+        self._turns = 0
+        self._selected_tokens = 0
+        self._full_tokens = 0
+
+    def _get_index(self, schemas: Sequence[FrozenSchema]) -> _BM25Index:
+        # 工具集合变化（如 MCP 连接完成）时重建索引
+        key = tuple(item.name for item in schemas)
+        if self._index is None or key != self._index_key:
+            self._index = _BM25Index(schemas)
+            self._index_key = key
+        return self._index
+
+    def select(self, query: str, schemas: Sequence[FrozenSchema]) -> List[FrozenSchema]:
+        """
+        为本轮对话选择工具
+
+        Args:
+            query: 用户输入
+            schemas: 全部可用的工具定义
+
+        Returns:
+            List[FrozenSchema]: 选中的工具定义，保持原有顺序
+        """
+        index = self._get_index(schemas)
+        scores = index.scores(query)
+        ranked = sorted((i for i, score in enumerate(scores) if score > 0), key=lambda i: -scores[i])
+        wanted = {schemas[i].name for i in ranked[:self.top_k]}
+        if not wanted:
+            # 没有匹配的检索词（如“继续”“好的”），沿用上一轮的选择
+            wanted = set(self._last_selected)
+        wanted.update(self.core)
+        wanted.update(self.recent)
+
+        selected = [item for item in schemas if item.name in wanted]
+        self._last_selected = [item.name for item in selected]
+        self._turns += 1
+        self._selected_tokens += sum(item.tokens for item in selected)
+        self._full_tokens += sum(item.tokens for item in schemas)
+        return selected
+
+    def record_use(self, names: Iterable[str]):
+        """记录本轮实际调用的工具，之后几轮继续提供"""
+        for name in names:
+            if name in self.recent:
+                self.recent.remove(name)
+            self.recent.append(name)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns:
+            dict: turns 路由次数，selected_tokens / full_tokens 选中的与完整工具定义的累计 token 数
+        """
+        return {
+            "turns": self._turns,
+            "selected_tokens": self._selected_tokens,
+            "full_tokens": self._full_tokens
+        }
@@ -0,0 +1,167 @@
+"""
+工具结果缓存
+幂等的查询类工具（文档列表、角色、技能、邮箱文件夹、子智能体信息、网络搜索等）
+经常在同一会话或不同会话中以相同参数被重复调用。
+通过 @registry.tool(..., cache_ttl=秒数) 声明后，结果保存在进程内共享的 TTL + LRU 缓存中，
+参数先做规范化（类型转换后的值、去掉字符串首尾空白、键排序），
+会改变结果的工具通过 invalidates 声明要失效的工具（如 create_subagent 使 get_subagent 失效）。
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+
+MISSING = object()
+
+
+def normalize_args(args: Dict[str, Any]) -> str:
+    """
+    把工具参数规范化为缓存键
+
+    Args:
+        args: 校验、类型转换后的参数
+
+    Returns:
+        str: 与参数顺序和字符串首尾空白无关的 JSON 文本
+    """
+    normalized = {key: value.strip() if isinstance(value, str) else value for key, value in args.items()}
+    return json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class TTLCache:
+    """
+    线程安全的 TTL + LRU 缓存
+    键为 (命名空间, 子键)，可按命名空间整体失效
+    """
+
+    def __init__(self, max_entries: int = 1024, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_entries: 最多保存的条目数，超出后淘汰最久未使用的
+            clock: 时钟函数，测试时可替换
+        """
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = OrderedDict()
+        self._namespaces: Dict[str, Set[Hashable]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, namespace: str, key: Hashable, default: Any = None) -> Any:
+        """
+        读取缓存
+
+        Returns:
+            缓存的值，不存在或已过期时返回 default
+        """
+        value = self.lookup(namespace, key)
+        return default if value is MISSING else value
+
+    def lookup(self, namespace: str, key: Hashable) -> Any:
+        """读取缓存，不存在或已过期时返回 MISSING（缓存值本身可以是 None）"""
+        full_key = (namespace, key)
+        with self._lock:
+            entry = self._entries.get(full_key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > self._clock():
+                    self._entries.move_to_end(full_key)
+                    self.hits += 1
+                    return value
+                self._remove(full_key)
+            self.misses += 1
+            return MISSING
+
+    def set(self, namespace: str, key: Hashable, value: Any, ttl: float):
+        """
+        写入缓存
+
+        Args:
+            namespace: 命名空间（工具名）
+            key: 子键（规范化后的参数）
+            value: 值
+            ttl: 有效期（秒）
+        """
+        if ttl <= 0:
+            return
+        full_key = (namespace, key)
+        with self._lock:
+            self._entries[full_key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(full_key)
+            self._namespaces.setdefault(namespace, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, namespace: Optional[str] = None) -> int:
+        """
+        使缓存失效
+
+        Args:
+            namespace: 命名空间，None 表示全部
+
+        Returns:
+            int: 删除的条目数
+        """
+        with self._lock:
+            if namespace is None:
+                count = len(self._entries)
+                self._entries.clear()
+                self._namespaces.clear()
+            else:
+                keys = self._namespaces.pop(namespace, set())
+                for key in keys:
+                    self._entries.pop((namespace, key), None)
+                count = len(keys)
+            if count:
+                self.invalidations += 1
+            return count
+
+    def _remove(self, full_key: Tuple[str, Hashable]):
+        self._entries.pop(full_key, None)
+        keys = self._namespaces.get(full_key[0])
+        if keys is not None:
+            keys.discard(full_key[1])
+            if not keys:
+                del self._namespaces[full_key[0]]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns:
+            dict: hits, misses, entries, evictions, invalidations
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+
+# 全局工具结果缓存（单例模式）
+_global_tool_cache: Optional[TTLCache] = None
+_tool_cache_lock = threading.Lock()
+
+
+def get_tool_cache() -> TTLCache:
+    """
+    获取进程内共享的工具结果缓存
+
+    Returns:
+        TTLCache: 全局工具结果缓存
+    """
+    global _global_tool_cache
+    if _global_tool_cache is None:
+        with _tool_cache_lock:
+            if _global_tool_cache is None:
+                _global_tool_cache = TTLCache()
+    return _global_tool_cache
@@ -6,7 +6,6 @@ ShitBot UI 组件库
 from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
-from rich.markdown import Markdown  
 from rich import box
 from rich.live import Live
 from rich.spinner import Spinner
@@ -90,6 +89,7 @@ class MessagePanel:
     
     def info(self, message: str):
         """显示信息消息"""
+        from rich.markdown import Markdown  # markdown-it 较重，首次渲染时再导入
         self.console.print("[blue]ShitBot >[/blue]\n", Markdown(message))
     
     def success(self, message: str):
@@ -99,6 +99,10 @@ class MessagePanel:
     def tool(self, message: str):
         """显示工具消息"""
         self.console.print("[blue]tool >[/blue] "+message)
+
+    def stream(self, line: str):
+        """显示工具的实时输出行（原样输出，不解析标记）"""
+        self.console.print(line, style="dim", markup=False, highlight=False)
     
     def start_thinking(self, tool_name: str = None):
         """开始思考动画 - 使用Rich Spinner"""
@@ -131,6 +135,7 @@ class MessagePanel:
         self.stop_thinking()
         # 先打印加粗的·和空格，然后打印markdown，使用同一个console实例
         self.console.print("[white]●[/white] ", end="")
+        from rich.markdown import Markdown
         self.console.print(Markdown(message))
 
 
@@ -212,6 +217,10 @@ class TerminalUI:
     def tool(self, message: str):
         """显示工具消息"""
         self.messages.tool(message)
+
+    def stream(self, line: str):
+        """显示工具的实时输出行"""
+        self.messages.stream(line)
     
     def start_thinking(self, tool_name: str = None):
         """开始思考动画"""
@@ -0,0 +1,295 @@
+"""
+启动预热
+交互模式出现输入提示后，在用户输入的同时并行准备较慢的子系统：
+MCP Server 连接、IMAP 登录、code_venv 与工作进程池、Chromium 浏览器、角色/技能/文档/记忆索引。
+
+每个组件有自己的就绪 Future（concurrent.futures.Future，可在任意线程和事件循环中等待），
+工具执行前只等待它依赖的那个组件（见 registry.tool 的 requires 参数），状态栏显示各组件的就绪情况。
+预热失败不影响使用：工具会在第一次用到时按原来的方式自行初始化并报告错误。
+"""
+
+import asyncio
+import concurrent.futures
+import importlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from src.tool_registry import registry
+
+
+@dataclass
+class _Job:
+    """一个预热组件"""
+    name: str
+    label: str
+    job: Callable[[], Any]
+    in_thread: bool = True   # False 表示 job 返回协程，在当前事件循环中运行
+
+
+class Warmup:
+    """
+    后台预热管理器
+    线程中的任务使用守护线程执行，退出程序时不会被卡住的 IMAP 登录等阻塞
+    """
+
+    def __init__(self, wait_timeout: float = 60):
+        """
+        Args:
+            wait_timeout: 工具等待组件就绪的最长时间（秒），超时后照常执行工具
+        """
+        self.wait_timeout = wait_timeout
+        self._jobs: List[_Job] = []
+        self._futures: Dict[str, concurrent.futures.Future] = {}
+        self._elapsed: Dict[str, float] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def add(self, name: str, job: Callable[[], Any], label: str = "", in_thread: bool = True):
+        """
+        登记预热组件，需要在 start 之前调用
+
+        Args:
+            name: 组件名称，与 registry.tool 的 requires 对应
+            job: 无参函数；in_thread 为 False 时应返回协程
+            label: 状态栏中显示的名称
+            in_thread: 是否在后台线程中执行
+        """
+        self._jobs.append(_Job(name, label or name, job, in_thread))
+        self._futures[name] = concurrent.futures.Future()
+
+    def start(self):
+        """启动全部预热任务，必须在事件循环中调用，立即返回"""
+        for job in self._jobs:
+            future = self._futures[job.name]
+            if not future.set_running_or_notify_cancel():
+                continue
+            if job.in_thread:
+                threading.Thread(
+                    target=self._run_in_thread, args=(job, future),
+                    name=f"warmup-{job.name}", daemon=True
+                ).start()
+            else:
+                self._tasks.append(asyncio.ensure_future(self._run_async(job, future)))
+
+    def _run_in_thread(self, job: _Job, future: concurrent.futures.Future):
+        start = time.perf_counter()
+        try:
+            result = job.job()
+        except BaseException as e:
+            self._elapsed[job.name] = time.perf_counter() - start
+            future.set_exception(e)
+        else:
+            self._elapsed[job.name] = time.perf_counter() - start
+            future.set_result(result)
+
+    async def _run_async(self, job: _Job, future: concurrent.futures.Future):
+        start = time.perf_counter()
+        try:
+            result = await job.job()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            self._elapsed[job.name] = time.perf_counter() - start
+            future.set_exception(e)
+        else:
+            self._elapsed[job.name] = time.perf_counter() - start
+            future.set_result(result)
+
+    def state(self, name: str) -> Optional[str]:
+        """
+        获取组件状态
+
+        Returns:
+            str: "pending"、"ready" 或 "failed"，组件未登记时返回 None
+        """
+        future = self._futures.get(name)
+        if future is None:
+            return None
+        if not future.done():
+            return "pending"
+        if future.cancelled() or future.exception() is not None:
+            return "failed"
+        return "ready"
+
+    def error(self, name: str) -> Optional[str]:
+        """获取组件预热失败的原因，未失败时返回 None"""
+        if self.state(name) != "failed":
+            return None
+        future = self._futures[name]
+        return "已取消" if future.cancelled() else str(future.exception())
+
+    async def wait_for(self, name: str, timeout: Optional[float] = None) -> bool:
+        """
+        等待组件就绪，可在任意线程的事件循环中调用
+
+        Args:
+            name: 组件名称
+            timeout: 最长等待时间（秒），None 使用 wait_timeout
+
+        Returns:
+            bool: 组件已就绪（或未登记）返回 True，失败或超时返回 False
+        """
+        future = self._futures.get(name)
+        if future is None:
+            return True
+        if not future.done():
+            # asyncio.wait 超时不会取消被等待的 Future，其他工具仍可继续等待
+            waiter = asyncio.wrap_future(future)
+            await asyncio.wait({waiter}, timeout=self.wait_timeout if timeout is None else timeout)
+            if not future.done():
+                return False
+        return self.state(name) == "ready"
+
+    async def wait_for_tool(self, tool_name: str) -> bool:
+        """
+        等待工具依赖的组件就绪，未注册的工具视为 MCP 工具
+
+        Returns:
+            bool: 同 wait_for
+        """
+        if registry.has_tool(tool_name):
+            component = registry.get_requirement(tool_name)
+        else:
+            component = "mcp"
+        if not component:
+            return True
+        return await self.wait_for(component)
+
+    def status_text(self) -> str:
+        """
+        状态栏文本，如 "预热: MCP ✓ 0.8s | 邮箱 … | 浏览器 ✗"
+        """
+        parts = []
+        for job in self._jobs:
+            state = self.state(job.name)
+            if state == "pending":
+                parts.append(f"{job.label} …")
+            elif state == "ready":
+                parts.append(f"{job.label} ✓ {self._elapsed.get(job.name, 0):.1f}s")
+            else:
+                parts.append(f"{job.label} ✗")
+        return "预热: " + " | ".join(parts) if parts else ""
+
+    def all_done(self) -> bool:
+        """所有组件是否都已结束（成功或失败）"""
+        return all(future.done() for future in self._futures.values())
+
+
+# ==================== 默认预热组件 ====================
+
+def _warm_imap(tools):
+    error = tools._ensure_email_connection()
+    if error:
+        raise RuntimeError(error)
+    return True
+
+
+def _warm_venv(tools):
+    venv_manager = tools.venv_manager
+    if not venv_manager.init_or_create():
+        raise RuntimeError("创建虚拟环境失败")
+    # 进程池创建时会启动工作进程，第一次 run_code 不再等待解释器启动
+    venv_manager.get_worker_pool()
+    return True
+
+
+async def _warm_browser(tools):
+    # playwright 的导入放到线程中，避免阻塞输入提示
+    await asyncio.to_thread(importlib.import_module, "src.agent.webbot")
+    # WebBot 按线程创建，浏览器绑定当前（主线程）事件循环
+    await tools.web_bot.browser.start()
+    return True
+
+
+def _warm_index(tools):
+    for name in ("role", "skill", "doc", "memory_bot"):
+        tools.services.get(name)
+    return True
+
+
+def mcp_in_background(config) -> bool:
+    """
+    MCP 是否由后台预热连接（不在出现输入提示之前）
+
+    Args:
+        config: 应用配置 AppConfig
+    """
+    return bool(config.warmup.enabled and config.warmup.mcp and config.mcp.enabled and config.mcp.servers)
+
+
+def _register_default_jobs(warmup: Warmup, bot, config):
+    """
+    根据配置登记默认预热组件
+
+    Args:
+        warmup: 预热管理器
+        bot: 主智能体 Bot 实例
+        config: 应用配置 AppConfig
+    """
+    warmup_config = config.warmup
+    tools = bot.tools
+    if mcp_in_background(config):
+        warmup.add("mcp", lambda: bot.init_mcp(verbose=False), label="MCP", in_thread=False)
+    if warmup_config.imap and config.imap.email and config.imap.password:
+        warmup.add("imap", lambda: _warm_imap(tools), label="邮箱")
+    if warmup_config.venv:
+        warmup.add("venv", lambda: _warm_venv(tools), label="虚拟环境")
+    if warmup_config.browser:
+        warmup.add("browser", lambda: _warm_browser(tools), label="浏览器", in_thread=False)
+    if warmup_config.index:
+        warmup.add("index", lambda: _warm_index(tools), label="索引")
+
+
+# 全局预热管理器（单例模式）
+_global_warmup: Optional[Warmup] = None
+
+
+def start_warmup(bot, config) -> Optional[Warmup]:
+    """
+    创建全局预热管理器并启动，必须在事件循环中调用
+
+    Args:
+        bot: 主智能体 Bot 实例
+        config: 应用配置 AppConfig
+
+    Returns:
+        Warmup: 预热管理器，配置中关闭预热时返回 None
+    """
+    global _global_warmup
+    if not config.warmup.enabled:
+        return None
+    warmup = Warmup(wait_timeout=config.warmup.wait_timeout)
+    _register_default_jobs(warmup, bot, config)
+    warmup.start()
+    _global_warmup = warmup
+    return warmup
+
+
+async def start_warmup_and_mcp(bot, config) -> Optional[Warmup]:
+    """
+    启动预热；预热中没有 MCP 组件时（关闭了预热或 warmup.mcp）直接连接 MCP Server，
+    否则 MCP 工具不会被加载
+
+    Args:
+        bot: 主智能体 Bot 实例
+        config: 应用配置 AppConfig
+
+    Returns:
+        Warmup: 同 start_warmup
+    """
+    warmup = start_warmup(bot, config)
+    if warmup is None or warmup.state("mcp") is None:
+        await bot.init_mcp()
+    return warmup
+
+
+def get_warmup() -> Optional[Warmup]:
+    """
+    获取全局预热管理器
+
+    Returns:
+        Warmup: 未启动预热（如单次对话模式）时返回 None
+    """
+    return _global_warmup
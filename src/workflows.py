@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
 from config.config import load_settings
+from tools.file_cache import get_file_cache
 
 WORKFLOW_PATHS = {
     "coder": "CODER.md",
@@ -23,8 +24,7 @@ class Workflow:
         if not os.path.exists(full_path):
             raise FileNotFoundError(f"工作流文件不存在: {full_path}")
         
-        with open(full_path, 'r', encoding='utf-8') as f:
-            return f.read()     
+        return get_file_cache().read_text(full_path)     
     
     def set_workflow(self, workflow: str):
         if workflow not in WORKFLOW_PATHS:
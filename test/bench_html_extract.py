@@ -0,0 +1,183 @@
+"""
+网页结构提取基准：在保存的 HTML 样本上比较
+
+1. 解析耗时：旧版 BeautifulSoup 多次全树遍历 vs lxml 单遍提取（extract_content）
+2. 正文定位：旧版逐个 <p> 读取父元素全部文本（平方复杂度）vs 自底向上一次统计（线性），
+   页面为一个容器中的大量段落（256K 和 1M），旧版在 1M 页面上需要数分钟
+3. 事件循环卡顿：并发提取多个网页时，在事件循环中直接解析、线程中解析、进程池中解析，
+   事件循环上一个 10ms 定时器的最大延迟
+
+用法：
+    python test/bench_html_extract.py [重复次数]
+"""
+import asyncio
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bs4 import BeautifulSoup, Comment
+
+from tools import html_extract
+from tools.html_extract import extract_content, extract_html, _best_text_block, _parse
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "html")
+URL = "https://www.example.com/page"
+
+
+def load_fixtures() -> dict:
+    fixtures = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            fixtures[os.path.basename(path)] = f.read()
+    return fixtures
+
+
+def bs4_multi_pass(html: str):
+    """旧版 SmartWebExtractor._parse_html 的遍历方式：清理一次，每个字段各遍历一次全树"""
+    soup = BeautifulSoup(html, "lxml")
+    for element in soup(["script", "style", "noscript", "iframe", "canvas", "svg"]):
+        element.decompose()
+    for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
+        comment.extract()
+    soup.find("meta", attrs={"name": "description"})
+    for selector in ["article", "main", '[role="main"]', ".content", "#content"]:
+        if soup.select_one(selector):
+            break
+    soup.find_all("p")
+    soup.find_all(attrs={"itemscope": True})
+    for i in range(1, 7):
+        [h.get_text() for h in soup.find_all(f"h{i}")]
+    [a.get_text() for a in soup.find_all("a", href=True)]
+    soup.find_all("img")
+    for table in soup.find_all("table"):
+        [td.get_text(strip=True) for tr in table.find_all("tr") for td in tr.find_all(["td", "th"])]
+    for lst in soup.find_all(["ul", "ol"]):
+        [li.get_text() for li in lst.find_all("li", recursive=False)]
+    soup.find_all("form")
+    soup.find_all(["button", "a"], class_=lambda c: c and "btn" in c)
+    for tag in ["article", "section", "aside", "nav", "header", "footer"]:
+        [el.get_text() for el in soup.find_all(tag)]
+    soup.find_all("pre")
+    soup.find_all("code")
+
+
+def bench_parse(fixtures: dict, repeat: int):
+    print(f"{'样本':<24}{'大小':>10}{'BeautifulSoup':>16}{'lxml 单遍':>12}{'加速':>8}")
+    for name, html in fixtures.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            bs4_multi_pass(html)
+        old = (time.perf_counter() - start) / repeat
+        start = time.perf_counter()
+        for _ in range(repeat):
+            extract_content(html, URL)
+        new = (time.perf_counter() - start) / repeat
+        print(f"{name:<24}{len(html) // 1024:>8}K{old * 1000:>14.1f}ms{new * 1000:>10.1f}ms{old / new:>7.1f}x")
+
+
+def bs4_main_text(html: str) -> str:
+    """旧版 _extract_main_text 的兜底逻辑：每个 <p> 都重新读取父元素的文本和链接"""
+    soup = BeautifulSoup(html, "lxml")
+    best_text = ""
+    max_density = 0
+    for p in soup.find_all("p"):
+        parent = p.parent
+        text = parent.get_text()
+        text_len = len(text.strip())
+        link_len = sum(len(a.get_text()) for a in parent.find_all("a"))
+        if text_len > 0:
+            density = (text_len - link_len) / text_len
+            if text_len > 200 and density > max_density:
+                max_density = density
+                best_text = text
+    return best_text
+
+
+def linear_main_text(html: str):
+    """自底向上统计一次文本长度，再给段落容器打分"""
+    root = _parse(html)
+    blocks = {}
+    for p in root.iter("p"):
+        parent = p.getparent()
+        blocks[parent] = 1.0
+        blocks.setdefault(parent.getparent(), 0.5)
+    return _best_text_block(root, blocks)
+
+
+def long_page(size: int) -> str:
+    paragraph = "<p>" + "长网页的正文段落，包含一个<a href='/x'>链接</a>。" * 8 + "</p>\n"
+    count = size // len(paragraph.encode())
+    return "<html><body><div class='nav'><p>导航</p></div><div class='body'>" + paragraph * count + "</div></body></html>"
+
+
+def bench_main_text(sizes=(256 * 1024, 1024 * 1024)):
+    print(f"\n{'页面大小':<12}{'段落数':>8}{'逐段读取':>14}{'线性打分':>12}{'加速':>10}")
+    for size in sizes:
+        html = long_page(size)
+        paragraphs = html.count("<p>")
+        start = time.perf_counter()
+        bs4_main_text(html)
+        old = time.perf_counter() - start
+        start = time.perf_counter()
+        linear_main_text(html)
+        new = time.perf_counter() - start
+        print(f"{size // 1024:>8}K{paragraphs:>10}{old * 1000:>12.0f}ms{new * 1000:>10.1f}ms{old / new:>9.0f}x")
+
+
+async def max_loop_lag(run) -> tuple:
+    """执行 run() 期间事件循环上 10ms 定时器的最大延迟，返回 (总耗时, 最大延迟)"""
+    lag = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal lag
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lag = max(lag, time.perf_counter() - start - 0.01)
+
+    task = asyncio.ensure_future(ticker())
+    await asyncio.sleep(0.02)
+    start = time.perf_counter()
+    await run()
+    elapsed = time.perf_counter() - start
+    done = True
+    await task
+    return elapsed, lag
+
+
+async def bench_loop(fixtures: dict, copies: int = 8):
+    pages = list(fixtures.values()) * copies
+
+    async def inline():
+        for html in pages:
+            extract_content(html, URL)
+            await asyncio.sleep(0)
+
+    async def threaded():
+        await asyncio.gather(*(asyncio.to_thread(extract_content, html, URL) for html in pages))
+
+    async def process_pool():
+        await asyncio.gather(*(extract_html(html, URL) for html in pages))
+
+    # 先启动工作进程，不把进程启动时间算进去
+    await extract_html("<p>warmup</p>", URL)
+    print(f"\n并发提取 {len(pages)} 个网页时的事件循环卡顿：")
+    for name, run in (("事件循环中解析", inline), ("线程中解析", threaded), ("进程池中解析", process_pool)):
+        elapsed, lag = await max_loop_lag(run)
+        print(f"  {name:<10} 总耗时 {elapsed * 1000:>7.1f}ms  最大延迟 {lag * 1000:>6.1f}ms")
+
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    fixtures = load_fixtures()
+    bench_parse(fixtures, repeat)
+    bench_main_text()
+    html_extract.configure_pool(2)
+    try:
+        asyncio.run(bench_loop(fixtures))
+    finally:
+        html_extract.shutdown_pool()
@@ -0,0 +1,59 @@
+"""
+启动耗时基准：比较 Tool 懒加载服务与旧版逐个实例预先构建全部服务的耗时
+
+用法：
+    python test/bench_startup.py [实例数]
+
+实例数模拟主智能体、定时任务智能体和若干子智能体各自创建 Tool 的场景，默认 4。
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.services import ServiceRegistry, _register_default_services, get_services
+from src.tool import Tool
+
+
+def bench_lazy(count: int) -> float:
+    """懒加载：创建 Tool 时不构建任何服务"""
+    start = time.perf_counter()
+    for _ in range(count):
+        Tool({})
+    return time.perf_counter() - start
+
+
+def bench_eager(count: int) -> tuple:
+    """旧行为：每个 Tool 都各自构建一整套服务"""
+    costs = {}
+    start = time.perf_counter()
+    for _ in range(count):
+        Tool({})
+        services = ServiceRegistry()
+        _register_default_services(services)
+        for name, seconds in services.warm().items():
+            costs[name] = costs.get(name, 0.0) + max(seconds, 0.0)
+    return time.perf_counter() - start, costs
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+
+    # 先导入一次全部模块，避免把模块导入耗时算进任一方
+    get_services().warm()
+
+    lazy = bench_lazy(count)
+    eager, costs = bench_eager(count)
+
+    print(f"创建 {count} 个 Tool 实例")
+    print(f"  懒加载:       {lazy * 1000:8.1f} ms")
+    print(f"  预先构建服务: {eager * 1000:8.1f} ms")
+    print(f"  提升:         {eager / max(lazy, 1e-9):8.1f} 倍")
+    print("\n各服务累计构建耗时：")
+    for name, seconds in sorted(costs.items(), key=lambda item: -item[1]):
+        print(f"  {name:<14}{seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+测试浏览器池：页面复用、每个上下文的页面数上限、隔离上下文、空闲关闭和崩溃恢复
+使用模拟的浏览器对象，不需要安装 Chromium
+"""
+
+import asyncio
+
+from tools.browser_pool import BrowserPool
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+        self.url = "about:blank"
+
+    def is_closed(self):
+        return self.closed
+
+    async def goto(self, url, **kwargs):
+        self.url = url
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self, browser, options):
+        self.browser = browser
+        self.options = options
+        self.pages = []
+        self.closed = False
+        self.handlers = []
+
+    def on(self, event, handler):
+        self.handlers.append(handler)
+
+    async def new_page(self):
+        if not self.browser.connected:
+            raise RuntimeError("Target closed")
+        page = FakePage()
+        self.pages.append(page)
+        return page
+
+    async def close(self):
+        self.closed = True
+        for page in self.pages:
+            page.closed = True
+        for handler in self.handlers:
+            handler(self)
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.contexts = []
+        self.handlers = []
+
+    def is_connected(self):
+        return self.connected
+
+    def on(self, event, handler):
+        self.handlers.append(handler)
+
+    async def new_context(self, **options):
+        context = FakeContext(self, options)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.crash()
+
+    def crash(self):
+        if self.connected:
+            self.connected = False
+            for handler in self.handlers:
+                handler(self)
+
+
+class FakePlaywright:
+    async def stop(self):
+        pass
+
+
+def _make_pool(**kwargs):
+    browsers = []
+
+    async def launcher(headless):
+        browsers.append(FakeBrowser())
+        return FakePlaywright(), browsers[-1]
+
+    return BrowserPool(launcher=launcher, **kwargs), browsers
+
+
+def test_page_reuse_and_limit():
+    pool, browsers = _make_pool(max_pages_per_context=2, idle_timeout=0)
+    setups = []
+
+    async def setup(context):
+        setups.append(context)
+
+    async def main():
+        async with pool.page("extract", setup=setup) as page:
+            await page.goto("https://example.com")
+        async with pool.page("extract", setup=setup) as again:
+            assert again is page and again.url == "about:blank"
+
+        # 同时借用 3 个页面，超过上限时创建第二个上下文
+        async with pool.page("extract", setup=setup), pool.page("extract", setup=setup), pool.page("extract", setup=setup):
+            assert pool.stats()["pages_in_use"] == 3
+        assert len(setups) == 2
+
+        # 隔离上下文与页面池分开，关闭后浏览器继续运行
+        context = await pool.new_context(user_agent="test")
+        assert context.options == {"user_agent": "test"}
+        assert pool.stats()["contexts"] == 3
+        await context.close()
+        assert pool.stats()["contexts"] == 2
+        assert pool.is_running and len(browsers) == 1
+        await pool.close()
+
+    asyncio.run(main())
+    stats = pool.stats()
+    print(stats)
+    assert stats["launches"] == 1 and stats["pages_reused"] >= 1
+
+
+def test_crash_recovery():
+    pool, browsers = _make_pool(idle_timeout=0)
+
+    async def main():
+        async with pool.page() as page:
+            pass
+        browsers[0].crash()
+        async with pool.page() as page:
+            assert page.url == "about:blank"
+        assert len(browsers) == 2 and pool.stats()["crashes"] == 1
+
+        # 借用页面时浏览器才发现断开（未收到 disconnected 事件），重启一次
+        browsers[1].connected = False
+        async with pool.page("other"):
+            pass
+        assert len(browsers) == 3
+        await pool.close()
+
+    asyncio.run(main())
+
+
+def test_setup_failure_closes_context():
+    pool, browsers = _make_pool(idle_timeout=0)
+
+    async def failing_setup(context):
+        raise RuntimeError("route failed")
+
+    async def main():
+        try:
+            async with pool.page("broken", setup=failing_setup):
+                pass
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("setup 失败时应抛出异常")
+        # 初始化失败的上下文已关闭，没有留在页面池中
+        assert [context.closed for context in browsers[0].contexts] == [True]
+        assert pool.stats()["contexts"] == 0
+        await pool.close()
+
+    asyncio.run(main())
+
+
+def test_idle_shutdown():
+    pool, browsers = _make_pool(idle_timeout=0.2)
+
+    async def main():
+        async with pool.page():
+            await asyncio.sleep(0.4)  # 使用中的页面不会被关闭
+            assert pool.is_running
+        await asyncio.sleep(0.6)
+        assert not pool.is_running and not browsers[0].connected
+        async with pool.page():
+            assert pool.is_running
+        await pool.close()
+
+    asyncio.run(main())
+    assert pool.stats()["launches"] == 2
+
+
+if __name__ == "__main__":
+    test_page_reuse_and_limit()
+    test_crash_recovery()
+    test_setup_failure_closes_context()
+    test_idle_shutdown()
+    print("测试完成！")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+测试目录树工具：递归输出、忽略规则、条目限制和按 mtime 缓存
+"""
+
+import os
+import tempfile
+from tools.dir_tree import DirTree
+
+
+def _make_tree(root: str):
+    os.makedirs(os.path.join(root, "src", "pkg"))
+    os.makedirs(os.path.join(root, "__pycache__"))
+    with open(os.path.join(root, "README.md"), "w", encoding="utf-8") as f:
+        f.write("hello")
+    with open(os.path.join(root, "src", "main.py"), "w", encoding="utf-8") as f:
+        f.write("print('hi')\n" * 100)
+    with open(os.path.join(root, "src", "pkg", "util.py"), "w", encoding="utf-8") as f:
+        f.write("")
+
+
+def test_render_and_ignore():
+    with tempfile.TemporaryDirectory() as root:
+        _make_tree(root)
+        tree = DirTree()
+        output = tree.render(root, max_depth=3)
+        print(output)
+        assert "src/" in output
+        assert "main.py  1.2K" in output
+        assert "util.py  0B" in output
+        assert "__pycache__" not in output
+
+        output = tree.render(root, max_depth=1, ignore=["*.md"])
+        assert "README.md" not in output
+        assert "src/ …" in output
+
+
+def test_max_entries_and_excluded():
+    with tempfile.TemporaryDirectory() as root:
+        _make_tree(root)
+        tree = DirTree()
+        output = tree.render(root, max_depth=3, max_entries=2)
+        assert "共列出 2 项" in output
+
+        output = tree.render(root, exclude_paths=[os.path.join(root, "src")])
+        assert "main.py" not in output
+
+
+def test_cache_and_invalidate():
+    with tempfile.TemporaryDirectory() as root:
+        _make_tree(root)
+        tree = DirTree()
+        tree.render(root)
+        misses = tree.stats()["misses"]
+        tree.render(root)
+        assert tree.stats()["misses"] == misses, "第二次查看应该全部命中缓存"
+        assert tree.stats()["hits"] >= misses
+
+        new_file = os.path.join(root, "src", "new.py")
+        with open(new_file, "w", encoding="utf-8") as f:
+            f.write("x = 1\n")
+        tree.invalidate(new_file)
+        assert "new.py" in tree.render(root)
+
+
+if __name__ == "__main__":
+    test_render_and_ignore()
+    test_max_entries_and_excluded()
+    test_cache_and_invalidate()
+    print("测试完成！")
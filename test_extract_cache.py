@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+测试网页提取结果缓存：新鲜记录不发请求、ETag/Last-Modified 条件请求、内容未变化时不再解析、跨实例共享
+在本地启动 HTTP 服务，替换浏览器渲染部分，不需要安装 Chromium
+"""
+
+import asyncio
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tools import playwiright
+from tools.extract_cache import ExtractCache
+from tools.playwiright import SmartWebExtractor
+
+ARTICLE = "<html><head><title>{title}</title></head><body><article>" + "缓存测试的正文内容。" * 40 + "</article></body></html>"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    pages = {}          # path -> (html, etag, last_modified)
+    requests = []       # (path, 状态码)
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        html, etag, last_modified = SiteHandler.pages[self.path]
+        if (etag and self.headers.get("If-None-Match") == etag) or \
+                (last_modified and self.headers.get("If-Modified-Since") == last_modified):
+            SiteHandler.requests.append((self.path, 304))
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        data = html.encode("utf-8")
+        SiteHandler.requests.append((self.path, 200))
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        if etag:
+            self.send_header("ETag", etag)
+        if last_modified:
+            self.send_header("Last-Modified", last_modified)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SiteHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class CountingExtractor(SmartWebExtractor):
+    """记录解析和浏览器渲染的次数"""
+
+    def __init__(self, cache, rendered_html=None):
+        super().__init__(static_first=True, use_cache=False)
+        self.cache = cache
+        self.rendered_html = rendered_html
+        self.renders = 0
+
+    async def _fetch(self, url):
+        self.renders += 1
+        return self.rendered_html, "渲染"
+
+
+def _count_parses():
+    calls = []
+    original = playwiright.extract_html
+
+    async def counting(html, url, title=""):
+        calls.append(url)
+        return await original(html, url, title)
+
+    playwiright.extract_html = counting
+    return calls, original
+
+
+def test_conditional_revalidation():
+    SiteHandler.pages = {
+        "/etag": (ARTICLE.format(title="ETag"), '"v1"', ""),
+        "/modified": (ARTICLE.format(title="Last-Modified"), "", "Mon, 03 Jun 2024 08:00:00 GMT"),
+        "/plain": (ARTICLE.format(title="无校验头"), "", ""),
+    }
+    SiteHandler.requests = []
+    server, base_url = _start_server()
+    calls, original = _count_parses()
+    clock = FakeClock()
+
+    async def main():
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ExtractCache(directory, fresh_ttl=60, max_age=3600, clock=clock)
+            extractor = CountingExtractor(cache)
+            urls = [f"{base_url}{path}" for path in ("/etag", "/modified", "/plain")]
+            first = [await extractor.extract(url) for url in urls]
+            assert [c.fetch_method for c in first] == ["static"] * 3 and len(calls) == 3
+
+            # 新鲜期内：不发请求，URL 规范化后相同（末尾斜杠、片段）
+            SiteHandler.requests.clear()
+            again = await extractor.extract(f"{base_url}/etag/#section")
+            assert again.fetch_method == "cache" and again.title == "ETag"
+            assert again.url == f"{base_url}/etag/#section" and again.raw_html == ""
+            assert SiteHandler.requests == []
+
+            # 过期后：条件请求得到 304，或内容摘要相同，都不再解析
+            clock.now += 120
+            results = [await extractor.extract(url) for url in urls]
+            assert [c.fetch_method for c in results] == ["cache"] * 3
+            assert SiteHandler.requests == [("/etag", 304), ("/modified", 304), ("/plain", 200)]
+            assert results[2].raw_html == SiteHandler.pages["/plain"][0]
+            assert len(calls) == 3 and cache.stats()["revalidated"] == 3
+
+            # 验证后重新进入新鲜期
+            SiteHandler.requests.clear()
+            await extractor.extract(urls[0])
+            assert SiteHandler.requests == []
+
+            # 内容变化：重新下载和解析
+            clock.now += 120
+            SiteHandler.pages["/etag"] = (ARTICLE.format(title="ETag 新版"), '"v2"', "")
+            changed = await extractor.extract(urls[0])
+            assert changed.fetch_method == "static" and changed.title == "ETag 新版" and len(calls) == 4
+
+            # 另一个实例（如子智能体）从磁盘层读取
+            other = CountingExtractor(ExtractCache(directory, fresh_ttl=60, max_age=3600, clock=clock))
+            shared = await other.extract(urls[0])
+            assert shared.fetch_method == "cache" and shared.title == "ETag 新版"
+            assert shared.links == changed.links
+
+            # 超过最长保存时间后重新抓取
+            clock.now += 7200
+            SiteHandler.requests.clear()
+            expired = await other.extract(urls[0])
+            assert expired.fetch_method == "static" and SiteHandler.requests == [("/etag", 200)]
+
+    try:
+        asyncio.run(main())
+    finally:
+        playwiright.extract_html = original
+        server.shutdown()
+    print("✓ 条件请求验证")
+
+
+def test_browser_result_cached():
+    SiteHandler.pages = {"/app": ("<html><body><div id='app'></div></body></html>", "", "")}
+    server, base_url = _start_server()
+    calls, original = _count_parses()
+    clock = FakeClock()
+    rendered = "<html><body><main>" + "浏览器渲染后的内容" * 30 + "</main></body></html>"
+
+    async def main():
+        cache = ExtractCache(None, fresh_ttl=60, clock=clock)
+        extractor = CountingExtractor(cache, rendered)
+        url = f"{base_url}/app"
+        first = await extractor.extract(url)
+        assert first.fetch_method == "browser" and extractor.renders == 1
+        assert (await extractor.extract(url)).fetch_method == "cache" and extractor.renders == 1
+
+        # 过期后重新渲染，但渲染结果没有变化时不再解析
+        clock.now += 120
+        parses = len(calls)
+        again = await extractor.extract(url)
+        assert again.fetch_method == "cache" and extractor.renders == 2
+        # 只解析了直接下载的空壳页面
+        assert len(calls) == parses + 1
+        assert again.main_text == first.main_text
+
+    try:
+        asyncio.run(main())
+    finally:
+        playwiright.extract_html = original
+        server.shutdown()
+    print("✓ 浏览器渲染结果缓存")
+
+
+if __name__ == "__main__":
+    test_conditional_revalidation()
+    test_browser_result_cached()
+    print("测试完成！")
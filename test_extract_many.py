@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+测试并发网页提取：并发上限、按完成顺序返回、单个网页超时和失败、extract_web_pages 的输出格式
+替换页面渲染部分，不需要安装 Chromium
+"""
+
+import asyncio
+import time
+
+from src.tool import Tool
+from tools import playwiright
+from tools.playwiright import SmartWebExtractor
+from tools.token_count import count_tokens
+
+
+class FakeExtractor(SmartWebExtractor):
+    def __init__(self, delays):
+        super().__init__(static_first=False, use_cache=False)
+        self.delays = delays
+        self.active = 0
+        self.max_active = 0
+
+    async def _fetch(self, url):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delays[url])
+            if url.endswith("/broken"):
+                raise RuntimeError("net::ERR_NAME_NOT_RESOLVED")
+            html = f"<html><head><meta name='description' content='d'></head><body><article>{url} 正文</article></body></html>"
+            return html, url
+        finally:
+            self.active -= 1
+
+
+def test_extract_many():
+    delays = {"https://a.com/slow": 0.3, "https://b.com/": 0.05, "https://c.com/": 0.1,
+              "https://d.com/broken": 0.01, "https://e.com/hang": 10}
+    extractor = FakeExtractor(delays)
+
+    async def main():
+        start = time.perf_counter()
+        order = []
+        async for url, content in extractor.extract_many(list(delays) + ["https://b.com/"], concurrency=2, timeout=0.5):
+            order.append(url)
+            if url.endswith("/hang"):
+                assert isinstance(content, TimeoutError)
+            elif url.endswith("/broken"):
+                assert isinstance(content, RuntimeError)
+            else:
+                assert content.title == url and content.main_text == f"{url} 正文"
+        return order, time.perf_counter() - start
+
+    order, elapsed = asyncio.run(main())
+    print(order, f"{elapsed:.2f}s")
+    assert len(order) == 5 and order[-1] == "https://e.com/hang"
+    assert order.index("https://b.com/") < order.index("https://a.com/slow")
+    assert extractor.max_active == 2
+    assert elapsed < 2
+
+
+def test_extract_web_pages_tool():
+    delays = {"https://a.com/": 0.01, "https://d.com/broken": 0.01}
+    original = playwiright.SmartWebExtractor
+    playwiright.SmartWebExtractor = lambda **kwargs: FakeExtractor(delays)
+    try:
+        text = asyncio.run(Tool.__new__(Tool).extract_web_pages(list(delays), max_tokens=200))
+    finally:
+        playwiright.SmartWebExtractor = original
+    print(text)
+    page, broken = text.split("\n\n== ")
+    # 与 WebBot 的 extract 工具相同的 Markdown 格式，每页不超过 token 预算
+    assert page.startswith("== https://a.com/ ==\n# https://a.com/") and "## 正文\nhttps://a.com/ 正文" in page
+    assert count_tokens(page.split("\n", 1)[1]) <= 200
+    assert broken.startswith("https://d.com/broken ==\n✗ 读取失败")
+
+
+if __name__ == "__main__":
+    test_extract_many()
+    test_extract_web_pages_tool()
+    print("测试完成！")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+测试文件内容缓存：命中统计、文件变化自动失效、主动失效和按字节数 LRU 淘汰
+"""
+
+import os
+import tempfile
+from tools.file_cache import FileCache
+
+
+def test_hit_and_change():
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "a.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("第一行\n第二行\n")
+
+        cache = FileCache()
+        assert cache.read_text(path) == "第一行\n第二行\n"
+        assert cache.read_lines(path) == ["第一行\n", "第二行\n"]
+        stats = cache.stats()
+        assert stats["misses"] == 1 and stats["hits"] == 1
+
+        # 内容长度变化后即使不主动失效也会重新读取
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("第三行")
+        assert cache.read_lines(path)[-1] == "第三行"
+        assert cache.stats()["misses"] == 2
+
+
+def test_invalidate():
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "b.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("abc")
+        cache = FileCache()
+        cache.read_text(path)
+        cache.invalidate(path)
+        assert cache.stats()["files"] == 0
+        cache.read_text(path)
+        assert cache.stats()["misses"] == 2
+
+
+def test_lru_eviction():
+    with tempfile.TemporaryDirectory() as root:
+        cache = FileCache(max_bytes=400)
+        paths = []
+        for i in range(5):
+            path = os.path.join(root, f"{i}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("x" * 100)
+            paths.append(path)
+            cache.read_text(path)
+        stats = cache.stats()
+        print(stats)
+        assert stats["bytes"] <= 400
+        assert stats["evictions"] == 1
+
+        # 最早读取的文件已被淘汰，再次读取为未命中
+        misses = stats["misses"]
+        cache.read_text(paths[0])
+        assert cache.stats()["misses"] == misses + 1
+
+
+if __name__ == "__main__":
+    test_hit_and_change()
+    test_invalidate()
+    test_lru_eviction()
+    print("测试完成！")
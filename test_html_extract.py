@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+测试单遍 HTML 结构提取：各字段的提取结果、JSON-LD、外链判断、进程池执行
+"""
+
+import asyncio
+import os
+import time
+
+from tools import html_extract
+from tools.html_extract import extract_content, extract_html, text_stats, _parse
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test", "fixtures", "html")
+URL = "https://www.example.com/news/2024/06/line12"
+
+
+def load(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_news_article():
+    result = extract_content(load("news_article.html"), URL)
+    assert result["title"] == "城市轨道交通新线路今日开通运营 - 示例新闻网"
+    assert result["meta_description"].startswith("全长 32.5 公里")
+    # 有 <article> 时正文取 article，不含导航和页脚
+    assert result["main_text"].startswith("城市轨道交通新线路今日开通运营")
+    assert "news@example.com" not in result["main_text"]
+    assert [h["level"] for h in result["headings_outline"]] == [1, 2, 2, 2, 3]
+    assert result["headings_outline"][0] == {"level": 1, "text": "城市轨道交通新线路今日开通运营", "id": "title"}
+
+    # script 已剪掉，但 JSON-LD 在剪掉之前读取
+    json_ld = [item for item in result["structured_data"] if item["type"] == "json-ld"]
+    assert json_ld[0]["data"]["@type"] == "NewsArticle"
+    assert {"type": "microdata", "properties": {"name": "李明", "jobTitle": "城市新闻记者"}} in result["structured_data"]
+
+    links = {link["url"]: link for link in result["links"]}
+    assert links["https://www.example.com/category/city/"]["type"] == "taxonomy"
+    assert links["https://www.example.com/docs/fare-policy.pdf"]["title"] == "票价政策"
+    assert links["mailto:news@example.com"]["type"] == "email"
+    # 同一主机的链接不是外链，其他主机是
+    assert not links["https://www.example.com/category/city/"]["is_external"]
+    assert links["https://maps.example.org/line12"]["is_external"]
+
+    images = result["images"]
+    assert [img["alt"] for img in images] == ["12 号线列车", "线路图", "站台"]
+    assert images[1]["url"] == "https://www.example.com/images/map.png"
+    assert images[2]["is_lazy"] and not images[0]["is_lazy"]
+
+    table = result["tables"][0]
+    assert table["headers"] == ["车站", "换乘线路", "首班车"]
+    assert table["rows"][-1] == ["会展中心站", "8 号线", "06:12"] and table["row_count"] == 4
+    assert [lst["type"] for lst in result["lists"]] == ["ul", "ol", "ul"]
+
+    form, button = result["interactive_elements"]
+    assert form["inputs"] == [{"type": "text", "name": "q", "placeholder": "搜索新闻", "required": True}]
+    assert button == {"tag": "button", "text": "搜索", "classes": ["btn", "btn-primary"]}
+    assert set(result["semantic_html5_tags"]) == {"article", "aside", "nav", "header", "footer"}
+    print("✓ 新闻页")
+
+
+def test_docs_and_product():
+    docs = extract_content(load("docs_page.html"), "https://docs.example.com/config.html", title="文档")
+    assert docs["title"] == "文档"
+    assert docs["main_text"].startswith("Configuration")
+    assert docs["code_blocks"][0].startswith("[server]")
+    assert any("exampledb.connect" in block for block in docs["code_blocks"])
+    assert docs["tables"][0]["rows"][1] == ["cache_size", "128MB", "Size of the shared page cache"]
+
+    product = extract_content(load("product_listing.html"), "https://shop.example.com/keyboards")
+    # 无效的 JSON-LD 被忽略
+    assert [item["type"] for item in product["structured_data"]] == ["json-ld"] + ["microdata"] * 3
+    assert product["meta_description"] == "Shop 48 mechanical keyboards with free shipping."
+    assert product["main_text"].startswith("Mechanical keyboards")
+    inputs = product["interactive_elements"][0]["inputs"]
+    assert [field["type"] for field in inputs] == ["select", "number", "checkbox", "textarea"]
+    assert [el.get("text") for el in product["interactive_elements"][1:]] == ["Add to cart"] * 3 + ["Load more"]
+    print("✓ 文档页和商品页")
+
+
+def test_limits_and_fallbacks():
+    forum = extract_content(load("forum_thread.html"), "https://bbs.example.com/thread/12345")
+    assert len(forum["links"]) == html_extract.MAX_LINKS
+    assert len(forum["lists"]) == html_extract.MAX_LISTS
+    assert len(forum["interactive_elements"]) == html_extract.MAX_INTERACTIVE
+    assert all("post" not in block for block in forum["code_blocks"])
+    assert len(forum["code_blocks"]) == html_extract.MAX_CODE_BLOCKS
+
+    # 没有语义化容器时选链接占比最低的段落容器，注释不出现在正文中
+    html = ("<html><body><div><p>" + "导航 " * 10 + "</p></div><div id='x'><p>" + "正文内容" * 80
+            + "</p><!-- 隐藏 --></div></body></html>")
+    result = extract_content(html, URL)
+    assert result["main_text"] == "正文内容" * 80
+
+    empty = extract_content("", URL)
+    assert empty["main_text"] == "" and empty["links"] == []
+    declared = extract_content('<?xml version="1.0" encoding="utf-8"?><html><body><main>x</main></body></html>', URL)
+    assert declared["main_text"] == "x"
+    print("✓ 数量上限和兜底")
+
+
+def test_main_text_corpus():
+    # (样本, 正文中应包含的内容, 不应包含的内容)
+    corpus = [
+        ("news_article.html", "起步价 2 元", "news@example.com"),
+        ("docs_page.html", "Connection pooling", "Last updated"),
+        ("product_listing.html", "Compact 65% Wireless", "Partner"),
+        # 没有语义化容器：带几个链接的长正文胜过没有链接的短侧栏
+        ("blog_plain.html", "先测量再动手", "后端工程师"),
+        # 每段都很短：由帖子列表容器汇总，不取整页
+        ("forum_thread.html", "用户1", "论坛首页"),
+    ]
+    for name, expected, unexpected in corpus:
+        main_text = extract_content(load(name), URL)["main_text"]
+        assert expected in main_text, name
+        assert unexpected not in main_text, name
+    print("✓ 正文样本")
+
+
+def test_text_stats_linear():
+    root = _parse("<div><p>ab <a>cd</a> ef</p><p><a>g</a></p>h</div>")
+    div = next(root.iter("div"))
+    first, second = div[0], div[1]
+    assert text_stats(root)[div] == (8, 3)
+    assert text_stats(root)[first] == (6, 2) and text_stats(root)[second] == (1, 1)
+
+    # 1MB 以上、所有段落在同一容器中的网页，逐段读取父元素文本需要数分钟
+    paragraph = "<p>" + "很长的正文段落，<a href='/x'>链接</a>。" * 10 + "</p>"
+    html = "<html><body><div>" + paragraph * (1024 * 1024 // len(paragraph.encode()) + 1) + "</div></body></html>"
+    start = time.perf_counter()
+    result = extract_content(html, URL)
+    elapsed = time.perf_counter() - start
+    print(f"  1MB 网页提取耗时 {elapsed:.2f}s")
+    assert result["main_text"].startswith("很长的正文段落") and elapsed < 5
+    print("✓ 线性正文打分")
+
+
+def test_process_pool():
+    html_extract.configure_pool(1)
+
+    async def main():
+        html = load("news_article.html")
+        results = await asyncio.gather(*(extract_html(html, URL) for _ in range(4)))
+        return html, results
+
+    try:
+        html, results = asyncio.run(main())
+        assert html_extract._pool is not None
+        # 工作进程不从多线程的主进程 fork
+        assert html_extract._pool._mp_context.get_start_method() != "fork"
+        assert all(result == extract_content(html, URL) for result in results)
+    finally:
+        html_extract.shutdown_pool()
+    assert html_extract._pool is None
+
+    # 不使用进程池时在线程中解析
+    html_extract.configure_pool(0)
+    try:
+        result = asyncio.run(extract_html("<article>线程</article>", URL))
+        assert result["main_text"] == "线程" and html_extract._pool is None
+    finally:
+        html_extract.configure_pool(None)
+    print("✓ 进程池")
+
+
+if __name__ == "__main__":
+    test_news_article()
+    test_docs_and_product()
+    test_limits_and_fallbacks()
+    test_main_text_corpus()
+    test_text_stats_linear()
+    test_process_pool()
+    print("测试完成！")
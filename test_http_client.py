@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+测试共享 HTTP 客户端：连接复用、临时错误重试、按事件循环关闭、异步 Tavily 并发查询
+在本地启动模拟的博查和 Tavily 搜索服务
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tools import http_client
+from tools.bocha import BochaSearch
+from tools.tavily_api import TavilySearch
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = set()
+    failures = {"count": 0}
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        MockHandler.connections.add(self.client_address)
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if self.path == "/flaky" and MockHandler.failures["count"] < 2:
+            MockHandler.failures["count"] += 1
+            self._send(503, {"error": "busy"}, {"Retry-After": "0"})
+            return
+        if self.path == "/search":
+            # Tavily
+            if self.headers.get("Authorization") != "Bearer tvly-test":
+                self._send(401, {"detail": {"error": "Unauthorized"}})
+                return
+            time.sleep(0.2)
+            results = [{"title": payload["query"], "url": f"https://example.com/{i}", "content": "内容", "score": 0.9}
+                       for i in range(payload.get("max_results", 1))]
+            self._send(200, {"results": results})
+            return
+        time.sleep(0.02)  # 模拟服务端处理时间
+        pages = [{"name": f"{payload.get('query')} {i}", "url": f"https://example.com/{i}", "snippet": "摘要"}
+                 for i in range(payload.get("count", 1))]
+        self._send(200, {"data": {"webPages": {"value": pages}}})
+
+
+def _start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_bocha_reuses_connection():
+    server, base_url = _start_server()
+    MockHandler.connections.clear()
+    client = BochaSearch(api_key="test")
+    client.base_url = base_url
+
+    async def main():
+        start = time.perf_counter()
+        for i in range(10):
+            response = await client.search(f"查询{i}", count=3)
+            assert response.success and response.total_results == 3, response.error
+        elapsed = time.perf_counter() - start
+        print(f"10 次搜索耗时 {elapsed:.3f}s，使用 {len(MockHandler.connections)} 个连接")
+        assert len(MockHandler.connections) == 1
+        assert http_client.get_http_client() is http_client.get_http_client()
+        await client.close()
+        assert asyncio.get_running_loop() not in http_client._clients
+
+    try:
+        asyncio.run(main())
+    finally:
+        server.shutdown()
+
+
+def test_retry():
+    server, base_url = _start_server()
+    MockHandler.failures["count"] = 0
+
+    async def main():
+        response = await http_client.request("POST", f"{base_url}/flaky", json={"query": "x"}, retries=2, backoff=0)
+        assert response.status_code == 200 and MockHandler.failures["count"] == 2
+
+        MockHandler.failures["count"] = 0
+        response = await http_client.request("POST", f"{base_url}/flaky", json={"query": "x"}, retries=1, backoff=0)
+        assert response.status_code == 503
+
+        # 连接失败重试用尽后抛出异常
+        try:
+            await http_client.request("POST", "http://127.0.0.1:1/", retries=1, backoff=0)
+            assert False, "应当连接失败"
+        except Exception as e:
+            assert isinstance(e, http_client.RETRY_ERRORS)
+        await http_client.close_http_client()
+
+    try:
+        asyncio.run(main())
+    finally:
+        server.shutdown()
+
+
+def test_async_tavily():
+    server, base_url = _start_server()
+    tavily = TavilySearch.__new__(TavilySearch)  # 不创建同步客户端
+    tavily.api_key = "tvly-test"
+    tavily.base_url = base_url
+    tavily.timeout = 10
+
+    async def main():
+        # 并发查询不阻塞事件循环
+        start = time.perf_counter()
+        outputs = await asyncio.gather(*(tavily.asearch(f"问题{i}", max_results=2) for i in range(5)))
+        elapsed = time.perf_counter() - start
+        print(f"5 次并发查询耗时 {elapsed:.3f}s")
+        assert elapsed < 0.9
+        assert outputs[0].startswith("标题: 问题0\n内容: 内容\n来源: https://example.com/0")
+
+        tavily.api_key = "wrong"
+        try:
+            await tavily.asearch_results("x")
+            assert False, "应当返回错误"
+        except RuntimeError as e:
+            assert "401" in str(e) and "Unauthorized" in str(e)
+        await http_client.close_http_client()
+
+    try:
+        asyncio.run(main())
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_bocha_reuses_connection()
+    test_retry()
+    test_async_tavily()
+    print("测试完成！")
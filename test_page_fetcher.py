@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+测试静态网页快速抓取：直接下载解析、空壳页面和下载失败时改用浏览器、编码识别
+在本地启动 HTTP 服务提供 test/fixtures/html 中的网页，替换浏览器渲染部分，不需要安装 Chromium
+"""
+
+import asyncio
+import gzip
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from tools.page_fetcher import fetch_static, js_shell_reason
+from tools.playwiright import SmartWebExtractor
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test", "fixtures", "html")
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/redirect":
+            self.send_response(302)
+            self.send_header("Location", "/docs_page.html")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if path == "/huge":
+            # 声明了很大的长度但不发送内容，读取响应体会一直等到超时
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(10 * 1024 ** 3))
+            self.end_headers()
+            return
+        if path == "/endless":
+            # 没有长度、不会结束的响应
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            chunk = b"<p>" + b"x" * 8192 + b"</p>"
+            try:
+                for _ in range(100000):
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            except OSError:
+                pass
+            return
+        if path == "/gbk":
+            data = "<html><head><meta charset='gbk'></head><body><article>中文编码的网页</article></body></html>".encode("gbk")
+            content_type = "text/html"
+        elif path == "/file.pdf":
+            data, content_type = b"%PDF-1.4", "application/pdf"
+        else:
+            name = os.path.join(FIXTURES, os.path.basename(path))
+            if not os.path.isfile(name):
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            with open(name, "rb") as f:
+                data = f.read()
+            content_type = "text/html; charset=utf-8"
+        headers = {"Content-Type": content_type, "ETag": '"v1"'}
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            data = gzip.compress(data)
+            headers["Content-Encoding"] = "gzip"
+        self.send_response(200)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def _start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class FakeBrowserExtractor(SmartWebExtractor):
+    """浏览器渲染部分返回固定内容，记录哪些网页用了浏览器"""
+
+    def __init__(self):
+        super().__init__(static_first=True, use_cache=False)
+        self.rendered = []
+
+    async def _fetch(self, url):
+        self.rendered.append(url)
+        return "<html><body><main>" + "浏览器渲染后的内容" * 30 + "</main></body></html>", "渲染"
+
+
+def test_fetch_static():
+    server, base_url = _start_server()
+
+    async def main():
+        page = await fetch_static(f"{base_url}/news_article.html")
+        assert page.etag == '"v1"' and "城市轨道交通" in page.html
+        redirected = await fetch_static(f"{base_url}/redirect")
+        assert redirected.final_url.endswith("/docs_page.html")
+        gbk = await fetch_static(f"{base_url}/gbk")
+        assert "中文编码的网页" in gbk.html
+        for path in ("/missing.html", "/file.pdf"):
+            try:
+                await fetch_static(base_url + path)
+                assert False, path
+            except RuntimeError as e:
+                print(f"  {path}: {e}")
+
+        # 超过大小上限时不把整个响应读入内存
+        for path in ("/huge", "/endless"):
+            start = time.perf_counter()
+            try:
+                await fetch_static(base_url + path, timeout=5, max_bytes=100 * 1024)
+                assert False, path
+            except RuntimeError as e:
+                assert "网页过大" in str(e) and time.perf_counter() - start < 2, path
+                print(f"  {path}: {e}")
+
+    try:
+        asyncio.run(main())
+    finally:
+        server.shutdown()
+    print("✓ 直接下载")
+
+
+def test_js_shell_reason():
+    with open(os.path.join(FIXTURES, "spa_shell.html"), encoding="utf-8") as f:
+        shell = f.read()
+    assert "JavaScript" in js_shell_reason(shell, "")
+    assert js_shell_reason("<p>短</p>", "短").startswith("正文过短")
+    assert js_shell_reason("<script>" + "x" * 100000 + "</script><p>" + "正文" * 200 + "</p>", "正文" * 200).startswith("正文占比过低")
+    mount = "<div id='root'></div><script>" + "x" * 20000 + "</script><p>" + "正文" * 250 + "</p>"
+    assert "挂载点" in js_shell_reason(mount, "正文" * 250)
+    assert js_shell_reason("<article>" + "正文" * 200 + "</article>", "正文" * 200) is None
+    print("✓ 空壳页面判断")
+
+
+def test_tiered_extract():
+    server, base_url = _start_server()
+    extractor = FakeBrowserExtractor()
+
+    async def main():
+        start = time.perf_counter()
+        content = await extractor.extract(f"{base_url}/news_article.html")
+        elapsed = time.perf_counter() - start
+        print(f"  静态网页提取耗时 {elapsed * 1000:.0f}ms")
+        assert content.fetch_method == "static" and content.url == f"{base_url}/news_article.html"
+        assert "起步价 2 元" in content.main_text
+        assert content.title == "城市轨道交通新线路今日开通运营 - 示例新闻网"
+        # 相对链接按服务地址补全
+        assert any(link["url"] == f"{base_url}/category/city/" for link in content.links)
+
+        results = {}
+        urls = [f"{base_url}/docs_page.html", f"{base_url}/spa_shell.html", f"{base_url}/missing.html"]
+        async for url, item in extractor.extract_many(urls):
+            results[url] = item
+        return results
+
+    try:
+        results = asyncio.run(main())
+    finally:
+        server.shutdown()
+    docs, shell, missing = (results[url] for url in (f"{base_url}/docs_page.html",
+                                                      f"{base_url}/spa_shell.html",
+                                                      f"{base_url}/missing.html"))
+    assert docs.fetch_method == "static"
+    # 空壳页面和下载失败的网页交给浏览器
+    assert shell.fetch_method == "browser" and shell.main_text.startswith("浏览器渲染后的内容")
+    assert missing.fetch_method == "browser"
+    assert sorted(extractor.rendered) == [f"{base_url}/missing.html", f"{base_url}/spa_shell.html"]
+    print("✓ 分级提取")
+
+
+if __name__ == "__main__":
+    test_fetch_static()
+    test_js_shell_reason()
+    test_tiered_extract()
+    print("测试完成！")
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+测试页面就绪检测：网络空闲、DOM 静止、跳转后重新检测、滚动高度稳定，以及提取器和 BrowserTools 不再固定等待
+使用模拟的页面对象，不需要安装 Chromium
+"""
+
+import asyncio
+import time
+
+from tools import page_ready
+from tools.page_ready import NetworkTracker, settle_after, wait_until_settled
+from tools.playwiright import BrowserTools, SmartWebExtractor, MAX_SCROLL_STEPS
+
+
+class FakeRequest:
+    def __init__(self, resource_type="xhr"):
+        self.resource_type = resource_type
+
+
+class FakePage:
+    """模拟页面：quiet_at 之前 DOM 一直在变化，heights 为每次滚动到底后依次出现的高度"""
+
+    def __init__(self, height=800, heights=(), busy=0.0, request_time=0.0):
+        self.listeners = {}
+        self.height = height
+        self.heights = list(heights)
+        self.busy = busy                  # 操作后 DOM 继续变化的时间（秒）
+        self.request_time = request_time  # 操作后发出的请求持续的时间（秒）
+        self.quiet_at = time.monotonic()
+        self.positions = []
+        self.navigating = False
+        self.url = "https://www.example.com/"
+
+    def on(self, event, handler):
+        self.listeners.setdefault(event, []).append(handler)
+
+    def remove_listener(self, event, handler):
+        self.listeners[event].remove(handler)
+
+    def emit(self, event, request):
+        for handler in list(self.listeners.get(event, [])):
+            handler(request)
+
+    def is_closed(self):
+        return False
+
+    async def _act(self):
+        self.quiet_at = time.monotonic() + self.busy
+        if self.request_time:
+            request = FakeRequest()
+            self.emit("request", request)
+            asyncio.get_running_loop().call_later(self.request_time, self.emit, "requestfinished", request)
+
+    async def wait_for_selector(self, selector, timeout=None):
+        pass
+
+    async def click(self, selector):
+        await self._act()
+
+    async def goto(self, url, **kwargs):
+        await self._act()
+
+    async def wait_for_load_state(self, state="load", timeout=None):
+        self.navigating = False
+
+    async def evaluate(self, script, arg=None):
+        if script == page_ready._DOM_QUIET_JS:
+            if self.navigating:
+                raise RuntimeError("Execution context was destroyed, most likely because of a navigation")
+            quiet, cap = arg["quiet"] / 1000, arg["cap"] / 1000
+            wait = max(self.quiet_at - time.monotonic(), 0) + quiet
+            await asyncio.sleep(min(wait, cap))
+            return {"settled": wait <= cap}
+        if script == page_ready._HEIGHT_STABLE_JS:
+            if self.heights:
+                self.height = self.heights.pop(0)
+            return {"height": self.height}
+        if script == page_ready._SCROLL_STEP_JS:
+            self.positions.append(arg["y"])
+            return self.height
+        if script == "document.body.scrollHeight":
+            return self.height
+        return None
+
+
+def test_network_tracker():
+    async def main():
+        page = FakePage()
+        tracker = NetworkTracker(page)
+        request = FakeRequest()
+        page.emit("request", request)
+        page.emit("request", FakeRequest("websocket"))   # 长连接不计入
+        asyncio.get_running_loop().call_later(0.1, page.emit, "requestfinished", request)
+        start = time.monotonic()
+        assert await tracker.wait_idle(quiet=0.05, cap=2)
+        assert 0.15 <= time.monotonic() - start < 1
+
+        # 请求一直没有结束时到上限返回
+        page.emit("request", FakeRequest())
+        start = time.monotonic()
+        assert not await tracker.wait_idle(quiet=0.05, cap=0.2)
+        assert time.monotonic() - start < 0.5
+
+        tracker.detach()
+        assert all(not handlers for handlers in page.listeners.values())
+
+    asyncio.run(main())
+    print("✓ 网络空闲")
+
+
+def test_settle_after_action():
+    async def main():
+        # DOM 变化 0.2 秒、请求 0.3 秒：约 0.6 秒后返回，不是固定等待
+        page = FakePage(busy=0.2, request_time=0.3)
+        start = time.monotonic()
+        async with settle_after(page, quiet=0.1, cap=3):
+            await page.click("#more")
+        elapsed = time.monotonic() - start
+        assert 0.3 <= elapsed < 1.5, elapsed
+        assert all(not handlers for handlers in page.listeners.values())
+
+        # 页面一直在变化时到上限返回
+        page = FakePage(busy=10)
+        await page.click("#ticker")
+        result = await wait_until_settled(page, quiet=0.1, cap=0.3)
+        assert not result["settled"] and result["elapsed"] < 1
+
+        # 操作引起跳转：等新文档加载后重新检测
+        page = FakePage()
+        page.navigating = True
+        result = await wait_until_settled(page, quiet=0.05, cap=1)
+        assert result["settled"] and not page.navigating
+
+    asyncio.run(main())
+    print("✓ 操作后等待页面稳定")
+
+
+def test_extractor_scroll():
+    extractor = SmartWebExtractor(static_first=False, use_cache=False)
+
+    async def main():
+        # 到底后加载了更多内容：继续滚动，高度不再变化时停止
+        page = FakePage(height=2500, heights=[4200, 4200])
+        start = time.monotonic()
+        await extractor._scroll_page(page)
+        assert page.positions == [1000, 2000, 3000, 4000]
+        # 原来 2500 像素的页面要固定等待 0.3 * 2 + 0.5 秒
+        assert time.monotonic() - start < 0.5
+
+        # 无限滚动：滚动和到底后的等待合计最多 MAX_SCROLL_STEPS 步
+        heights = [1500 + 1000 * i for i in range(1, 50)]
+        page = FakePage(height=1500, heights=heights)
+        await extractor._scroll_page(page)
+        assert len(page.positions) + (49 - len(page.heights)) == MAX_SCROLL_STEPS
+
+        # 每次只增长 100 像素的页面同样受步数限制
+        page = FakePage(height=1500, heights=[1500 + 100 * i for i in range(1, 500)])
+        await extractor._scroll_page(page)
+        assert len(page.positions) + (499 - len(page.heights)) == MAX_SCROLL_STEPS
+
+    asyncio.run(main())
+    print("✓ 提取器滚动")
+
+
+def test_browser_tools_waits():
+    async def main():
+        tools = BrowserTools()
+        page = tools._page = FakePage(busy=0.05)
+        start = time.monotonic()
+        result = await tools.click("#button")
+        # 原来固定等待 1 秒
+        assert result["success"] and time.monotonic() - start < 0.9
+
+        page.request_time = 0.2
+        start = time.monotonic()
+        result = await tools.submit("#submit")
+        # 原来固定等待 2 秒，现在等到请求结束后再静止 quiet 秒
+        assert result["success"] and 0.2 <= time.monotonic() - start < 1.5
+
+        page.heights = [1800]
+        result = await tools.scroll(distance=400, steps=3)
+        assert result["success"] and page.positions == [400, 400, 400]
+        tools._page = None
+
+    asyncio.run(main())
+    print("✓ BrowserTools 等待")
+
+
+if __name__ == "__main__":
+    test_network_tracker()
+    test_settle_after_action()
+    test_extractor_scroll()
+    test_browser_tools_waits()
+    print("测试完成！")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+测试按 token 预算渲染网页提取结果：链接排序、表格转 CSV、正文转 Markdown、预算上限
+"""
+
+import os
+
+from tools.html_extract import extract_content
+from tools.page_render import html_to_markdown, rank_links, table_to_csv
+from tools.playwiright import ExtractedContent
+from tools.token_count import count_tokens, truncate_to_tokens
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test", "fixtures", "html")
+URL = "https://www.example.com/news/2024/06/line12"
+
+
+def load(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def page(name, url=URL):
+    html = load(name)
+    return ExtractedContent(**extract_content(html, url), raw_html=html)
+
+
+def test_rank_links():
+    links = [
+        {"url": "https://a.com/", "text": "首页", "type": "navigation"},
+        {"url": "https://a.com/#top", "text": "返回顶部", "type": "anchor"},
+        {"url": "mailto:x@a.com", "text": "联系我们", "type": "email"},
+        {"url": "https://a.com/img", "text": "", "type": "content"},
+        {"url": "https://a.com/fare", "text": "地铁票价调整", "type": "content"},
+        {"url": "https://a.com/docs/python-client", "text": "Client", "type": "content"},
+    ]
+    # 没有任务时保持页面顺序，跳过锚点、邮件和没有文字的链接
+    assert [link["url"] for link in rank_links(links)] == [
+        "https://a.com/", "https://a.com/fare", "https://a.com/docs/python-client"]
+    assert rank_links(links, "地铁票价是多少", limit=1)[0]["url"] == "https://a.com/fare"
+    # 路径中的单词也参与比较
+    assert rank_links(links, "python client setup")[0]["url"] == "https://a.com/docs/python-client"
+    print("✓ 链接排序")
+
+
+def test_table_to_csv():
+    table = {"headers": ["名称", "说明"], "rows": [["名称", "说明"], ["a", "含,逗号"], ["b", "x"], ["c", "y"]]}
+    assert table_to_csv(table) == '名称,说明\na,"含,逗号"\nb,x\nc,y'
+    assert table_to_csv(table, max_rows=1) == '名称,说明\na,"含,逗号"'
+    assert table_to_csv({"headers": [], "rows": []}) == ""
+    print("✓ 表格转 CSV")
+
+
+def test_html_to_markdown():
+    docs = extract_content(load("docs_page.html"), "https://docs.example.com/config.html")
+    markdown = html_to_markdown(docs["main_html"])
+    assert "## Memory settings" in markdown
+    assert "exampledb.connect" in markdown and "```" in markdown
+    # 表格单独输出，图片去掉，链接只保留文字
+    assert "cache_size | 128MB" not in markdown and "![" not in markdown
+    assert "](" not in markdown and "Replication" in markdown
+    assert html_to_markdown("") == ""
+    print("✓ 正文转 Markdown")
+
+
+def test_render_within_budget():
+    forum = page("forum_thread.html", "https://bbs.example.com/thread/12345")
+    assert count_tokens(forum.to_json()) > 20000
+    for budget in (300, 1500, 4000):
+        rendered = forum.to_markdown(max_tokens=budget)
+        assert count_tokens(rendered) <= budget, budget
+        assert rendered.startswith("# ") and "## 正文" in rendered
+    assert "正文已截断" in forum.to_markdown(max_tokens=1500)
+
+    news = page("news_article.html")
+    rendered = news.to_markdown(max_tokens=2000, query="地铁票价")
+    assert "起步价 2 元" in rendered and "东湖站,2 号线,06:00" in rendered
+    assert "## 标题结构" in rendered and "正文已截断" not in rendered
+    # 与任务相关的链接排在最前
+    links = rendered.split("## 相关链接\n")[1].splitlines()
+    assert links[0].startswith("- [票价政策（PDF）]")
+    print("✓ token 预算")
+
+
+def test_raw_html_and_fallback():
+    news = page("news_article.html")
+    assert "<html" not in news.to_markdown()
+    with_raw = news.to_markdown(max_tokens=6000, include_raw_html=True)
+    assert "## 原始 HTML" in with_raw and count_tokens(with_raw) <= 6000
+
+    # 缓存中的旧记录没有 main_html，使用纯文本正文
+    content = ExtractedContent(url=URL, title="旧记录", meta_description="", main_text="纯文本正文",
+                               structured_data=[], headings_outline=[], links=[], images=[], tables=[],
+                               lists=[], interactive_elements=[], semantic_html5_tags=[], code_blocks=[],
+                               raw_html_hash="")
+    assert "纯文本正文" in content.to_markdown()
+    print("✓ 原始 HTML 和兜底")
+
+
+def test_truncate_to_tokens():
+    text = "截断测试 " * 500
+    truncated = truncate_to_tokens(text, 100)
+    assert count_tokens(truncated) <= 100 and text.startswith(truncated)
+    assert truncate_to_tokens("短文本", 100) == "短文本"
+    assert truncate_to_tokens(text, 0) == ""
+    print("✓ 按 token 截断")
+
+
+if __name__ == "__main__":
+    test_rank_links()
+    test_table_to_csv()
+    test_html_to_markdown()
+    test_render_within_budget()
+    test_raw_html_and_fallback()
+    test_truncate_to_tokens()
+    print("测试完成！")
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+测试浏览器请求拦截：按资源类型和跟踪主机拦截、页面文档放行、按任务放行、拦截统计、两条浏览器路径的安装
+使用模拟的浏览器对象，不需要安装 Chromium
+"""
+
+import asyncio
+
+from tools import playwiright
+from tools.browser_pool import BrowserPool
+from tools.playwiright import BrowserTools, SmartWebExtractor
+from tools.request_policy import BlockStats, RequestPolicy, install_policy
+
+
+class FakeRequest:
+    def __init__(self, resource_type, url):
+        self.resource_type = resource_type
+        self.url = url
+
+
+class FakeRoute:
+    def __init__(self, resource_type, url):
+        self.request = FakeRequest(resource_type, url)
+        self.result = None
+
+    async def continue_(self):
+        self.result = "continue"
+
+    async def abort(self, error_code=None):
+        self.result = "abort"
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.closed = False
+
+    def is_closed(self):
+        return self.closed
+
+    async def goto(self, url, **kwargs):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self):
+        self.handlers = []
+        self.closed = False
+
+    async def route(self, pattern, handler):
+        assert pattern == "**/*"
+        self.handlers.append(handler)
+
+    def on(self, event, handler):
+        pass
+
+    async def new_page(self):
+        return FakePage(self)
+
+    async def close(self):
+        self.closed = True
+
+    async def request(self, resource_type, url):
+        """模拟页面发出请求，返回 continue 或 abort"""
+        route = FakeRoute(resource_type, url)
+        for handler in self.handlers:
+            await handler(route)
+        return route.result or "continue"
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+
+    def is_connected(self):
+        return True
+
+    def on(self, event, handler):
+        pass
+
+    async def new_context(self, **options):
+        context = FakeContext()
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        pass
+
+
+class FakePlaywright:
+    async def stop(self):
+        pass
+
+
+def fake_pool():
+    browser = FakeBrowser()
+
+    async def launcher(headless):
+        return FakePlaywright(), browser
+
+    return BrowserPool(idle_timeout=0, launcher=launcher), browser
+
+
+def test_block_reason():
+    policy = RequestPolicy.create(["image", "font", "document", "unknown"], block_trackers=True,
+                                  extra_hosts=["Ads.Example.com"])
+    # 未知类型和 document 被忽略
+    assert policy.block_types == frozenset({"image", "font"})
+    assert policy.block_reason("image", "https://cdn.example.com/a") == "image"
+    assert policy.block_reason("script", "https://www.google-analytics.com/analytics.js") == "tracker"
+    assert policy.block_reason("xhr", "https://hm.baidu.com/hm.gif") == "tracker"
+    assert policy.block_reason("script", "https://x.ads.example.com/t.js") == "tracker"
+    # 后缀匹配按完整的域名段，页面文档始终放行
+    assert policy.block_reason("script", "https://notdoubleclick.net/a.js") is None
+    assert policy.block_reason("document", "https://doubleclick.net/") is None
+    assert policy.block_reason("stylesheet", "https://www.example.com/a.css") is None
+    assert policy.block_reason("script", "https://www.baidu.com/s.js") is None
+
+    allowed = policy.allowing(["image"], trackers=True)
+    assert allowed.block_reason("image", "https://cdn.example.com/a") is None
+    assert allowed.block_reason("script", "https://doubleclick.net/a.js") is None
+    # 额外主机不受 trackers 放行影响
+    assert allowed.block_reason("script", "https://ads.example.com/a.js") == "tracker"
+    assert policy.key == "font+image+trackers+hosts1" and RequestPolicy().key == "none"
+    assert not RequestPolicy().blocks_anything
+    print("✓ 拦截规则")
+
+
+def test_install_and_stats():
+    async def main():
+        stats = BlockStats()
+        context = FakeContext()
+        await install_policy(context, RequestPolicy.create(["image", "media"]), stats)
+        results = [
+            await context.request("document", "https://www.example.com/"),
+            await context.request("image", "https://www.example.com/a.png"),
+            await context.request("image", "https://img.example.com/photo"),   # 没有扩展名的地址同样拦截
+            await context.request("media", "https://www.example.com/v.mp4"),
+            await context.request("script", "https://www.googletagmanager.com/gtm.js"),
+            await context.request("script", "https://www.example.com/app.js"),
+        ]
+        assert results == ["continue", "abort", "abort", "abort", "abort", "continue"]
+        assert stats.stats()["blocked_requests"] == 4
+        assert stats.stats()["by_reason"] == {"image": 2, "media": 1, "tracker": 1}
+        assert stats.stats()["blocked_bytes"] == (2 * 40 + 500 + 20) * 1024
+
+    asyncio.run(main())
+    print("✓ 安装和统计")
+
+
+def test_extractor_context():
+    original = playwiright.get_browser_pool
+    pool, browser = fake_pool()
+    playwiright.get_browser_pool = lambda headless=True: pool
+
+    async def main():
+        extractor = SmartWebExtractor(static_first=False, use_cache=False, scroll_to_load=False,
+                                      request_policy=RequestPolicy.create(["image", "stylesheet"]))
+        async with pool.page(f"extract:{extractor.request_policy.key}", setup=extractor._setup_context) as page:
+            context = page.context
+            assert await context.request("stylesheet", "https://cdn.example.com/site") == "abort"
+            assert await context.request("font", "https://cdn.example.com/f.woff2") == "continue"
+
+        # 不同策略使用不同的共享上下文，不拦截任何请求时不安装规则
+        plain = SmartWebExtractor(static_first=False, use_cache=False,
+                                  request_policy=RequestPolicy())
+        async with pool.page(f"extract:{plain.request_policy.key}", setup=plain._setup_context) as page:
+            assert page.context is not context and page.context.handlers == []
+
+    try:
+        asyncio.run(main())
+    finally:
+        playwiright.get_browser_pool = original
+    print("✓ 提取器上下文")
+
+
+def test_browser_tools_override():
+    original = playwiright.get_browser_pool
+    pool, browser = fake_pool()
+    playwiright.get_browser_pool = lambda headless=True: pool
+
+    async def main():
+        tools = BrowserTools(request_policy=RequestPolicy.create(["image", "media"]))
+        await tools.start()
+        context = browser.contexts[0]
+        assert len(context.handlers) == 1
+        assert await context.request("image", "https://www.example.com/a.png") == "abort"
+
+        # 任务需要图片时放行，同一个上下文中立即生效，不重复安装
+        await tools.set_request_policy(tools.default_policy.allowing(["image"]))
+        assert await context.request("image", "https://www.example.com/a.png") == "continue"
+        assert await context.request("media", "https://www.example.com/v.mp4") == "abort"
+        assert len(context.handlers) == 1
+
+        await tools.set_request_policy(None)
+        assert await context.request("image", "https://www.example.com/a.png") == "abort"
+        await tools.close()
+
+        # 默认策略不拦截时先不安装，之后改为拦截再安装
+        tools = BrowserTools(request_policy=RequestPolicy())
+        await tools.start()
+        context = browser.contexts[1]
+        assert context.handlers == []
+        await tools.set_request_policy(RequestPolicy.create(["font"], block_trackers=False))
+        assert await context.request("font", "https://www.example.com/f.woff") == "abort"
+        await tools.close()
+
+    try:
+        asyncio.run(main())
+    finally:
+        playwiright.get_browser_pool = original
+    print("✓ BrowserTools 按任务修改策略")
+
+
+if __name__ == "__main__":
+    test_block_reason()
+    test_install_and_stats()
+    test_extractor_context()
+    test_browser_tools_override()
+    print("测试完成！")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+测试搜索结果缓存：查询规范化、内存层与磁盘层、过期和容量淘汰
+"""
+
+import os
+import tempfile
+
+from tools.search_cache import SearchCache, normalize_query
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_normalize_query():
+    assert normalize_query("  Python　教程\n") == "python 教程"
+    assert normalize_query("ＧＰＴ－４ 发布") == normalize_query("gpt-4  发布")
+    key = SearchCache.make_key("bocha", "ＡＩ 新闻", 5)
+    assert key == SearchCache.make_key("bocha", "ai  新闻", 5)
+    assert key != SearchCache.make_key("tavily", "ai 新闻", 5)
+    assert key != SearchCache.make_key("bocha", "ai 新闻", 3)
+
+
+def test_memory_and_disk():
+    with tempfile.TemporaryDirectory() as directory:
+        clock = FakeClock()
+        cache = SearchCache(directory, ttl=60, disk_ttl=600, clock=clock)
+        assert cache.get("bocha", "天气", 5) is None
+        cache.set("bocha", "天气", 5, "晴")
+        assert cache.get("bocha", " 天气 ", 5) == "晴"
+
+        # 新进程（新的缓存实例）从磁盘层读取
+        other = SearchCache(directory, ttl=60, disk_ttl=600, clock=clock)
+        assert other.get("bocha", "天气", 5) == "晴"
+        assert other.get("bocha", "天气", 5) == "晴"
+        stats = other.stats()
+        print(stats)
+        assert stats["disk_hits"] == 1 and stats["memory_hits"] == 1
+
+        # 内存层过期后回到磁盘层，磁盘层过期后未命中
+        clock.now += 120
+        assert cache.get("bocha", "天气", 5) == "晴"
+        clock.now += 600
+        assert cache.get("bocha", "天气", 5) is None
+        assert cache.stats()["misses"] == 2
+
+        disabled = SearchCache(directory, enabled=False)
+        disabled.set("bocha", "x", 5, "y")
+        assert disabled.get("bocha", "x", 5) is None
+
+
+def test_disk_eviction():
+    with tempfile.TemporaryDirectory() as directory:
+        clock = FakeClock()
+        cache = SearchCache(directory, max_disk_bytes=4000, clock=clock)
+        for i in range(10):
+            cache.set("tavily", f"查询{i}", 5, "x" * 500)
+        files = [name for name in os.listdir(directory) if name.endswith(".json")]
+        stats = cache.stats()
+        print(stats)
+        assert stats["disk_bytes"] <= 4000 and stats["disk_evictions"] > 0
+        assert len(files) < 10
+        # 最近写入的条目保留
+        assert SearchCache(directory, clock=clock).get("tavily", "查询9", 5) == "x" * 500
+
+
+if __name__ == "__main__":
+    test_normalize_query()
+    test_memory_and_disk()
+    test_disk_eviction()
+    print("测试完成！")
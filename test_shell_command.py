@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+测试 shell 命令执行：实时输出、输出截断、超时与终止、常驻会话保留状态
+"""
+
+import asyncio
+import sys
+import time
+from tools.shell import run_shell_command, ShellSession, OutputBuffer
+
+
+def test_stream_and_returncode():
+    lines = []
+    result = asyncio.run(run_shell_command("echo hello && echo world 1>&2 && exit 3", on_output=lines.append))
+    print(result)
+    assert lines == ["hello", "world"]
+    assert result.returncode == 3
+    assert "hello" in result.output and "world" in result.output
+
+
+def test_output_buffer():
+    buffer = OutputBuffer(head_chars=10, tail_chars=10)
+    for i in range(100):
+        buffer.append(f"{i:03d}\n")
+    output = buffer.render()
+    assert output.startswith("000\n001\n00")
+    assert output.endswith("098\n099\n")
+    assert "省略中间" in output
+
+
+def test_timeout_and_stop():
+    start = time.time()
+    result = asyncio.run(run_shell_command(f"{sys.executable} -c \"import time; time.sleep(30)\"", timeout=0.5))
+    assert result.timed_out
+    assert time.time() - start < 10
+
+    stop_at = time.time() + 0.3
+    result = asyncio.run(run_shell_command(
+        f"{sys.executable} -c \"import time; time.sleep(30)\"",
+        should_stop=lambda: time.time() > stop_at
+    ))
+    assert result.cancelled
+
+
+def test_persistent_session():
+    if sys.platform == "win32":
+        return
+
+    async def run():
+        session = ShellSession()
+        await session.run("cd /tmp && export SHITBOT_TEST=42")
+        result = await session.run("pwd; echo $SHITBOT_TEST")
+        assert result.output.split() == ["/tmp", "42"], result.output
+        result = await session.run("false")
+        assert result.returncode == 1
+
+        # 超时后会话被重建，之前的状态不再保留
+        result = await session.run("sleep 30", timeout=0.5)
+        assert result.timed_out and not session.alive
+        result = await session.run("echo ${SHITBOT_TEST:-none}")
+        assert result.output.strip() == "none"
+        await session.close()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    test_stream_and_returncode()
+    test_output_buffer()
+    test_timeout_and_stop()
+    test_persistent_session()
+    print("测试完成！")
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+测试启动分析：解析 -X importtime 输出并汇总
+"""
+
+from src.startup_profile import parse_importtime, summarize_imports
+
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   _io
+import time:       200 |        200 |       litellm.types
+import time:      3000 |       3200 |     litellm.main
+import time:       500 |       3700 |   litellm
+import time:       300 |        300 |   rich.console
+Warning: Input is not a terminal (fd=0).
+import time:        50 |       4150 | src.agent.bot
+"""
+
+
+def test_parse():
+    records = parse_importtime(SAMPLE)
+    assert len(records) == 6
+    assert records[1].module == "litellm.types"
+    assert records[1].depth == 3
+    assert records[-1].module == "src.agent.bot" and records[-1].depth == 0
+
+
+def test_summarize():
+    summary = summarize_imports(parse_importtime(SAMPLE), top=3)
+    print(summary)
+    assert summary["total_us"] == 4150
+    # 同一个包只保留最外层的导入
+    assert summary["cumulative"] == [("src.agent.bot", 4150), ("litellm", 3700), ("rich.console", 300)]
+    assert summary["packages"][0] == ("litellm", 3700)
+
+
+if __name__ == "__main__":
+    test_parse()
+    test_summarize()
+    print("测试完成！")
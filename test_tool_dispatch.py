@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+测试工具分发表：异步识别、参数校验与类型转换、注入参数、参数解析
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+from src.tool import Tool, _mcp_caller, _parse_arguments
+from src.tool_registry import registry, compile_validator, ToolArgumentError
+
+
+def test_compiled_table():
+    table = registry.compile()
+    assert table is registry.compile()  # 只编译一次
+    assert table["shell_command"].is_async and table["search_web"].is_async
+    assert not table["read_file"].is_async
+    assert table["delete_file"].context_params == ("if_user",)
+    assert table["run_code"].requires == "venv"
+    assert table["read_file"].func is registry.get_implementation("read_file")
+
+    # 注入参数不暴露给模型
+    properties = registry._tools["delete_file"]["function"]["parameters"]["properties"]
+    assert "if_user" not in properties
+
+
+def test_validator():
+    validate = registry.compile()["get_dir_tree"].validate
+    args = validate({"dir_path": "src", "max_depth": "2", "unknown": 1})
+    assert args == {"dir_path": "src", "max_depth": 2}
+
+    try:
+        validate({"max_depth": "deep"})
+        assert False, "应当校验失败"
+    except ToolArgumentError as e:
+        message = str(e)
+        print(message)
+        assert "缺少必填参数 dir_path" in message
+        assert "max_depth 应为 integer" in message
+        assert "ignore (string, 默认 \"\")" in message
+
+    # 可选参数传 null 使用默认值
+    assert registry.compile()["read_line_at"].validate(
+        {"file_path": "a", "line_number": 1.0, "end_number": None}) == {"file_path": "a", "line_number": 1}
+
+    schema = {"properties": {"flag": {"type": "boolean"}, "items": {"type": "array"}, "extra": {}}, "required": ["flag"]}
+    validate = compile_validator(schema, allow_extra=True)
+    assert validate({"flag": "false", "items": "[1, 2]", "extra": {"a": 1}, "other": 3}) == {
+        "flag": False, "items": [1, 2], "extra": {"a": 1}, "other": 3}
+
+
+def test_parse_arguments():
+    assert _parse_arguments('{"a": 1}') == {"a": 1}
+    assert _parse_arguments("") == {}
+    assert _parse_arguments({"a": 1}) == {"a": 1}
+    # 只在 JSON 解析失败时才去掉 XML 标签，参数内容中的标签保持不变
+    assert _parse_arguments('<arg>{"a": 1}</arg>') == {"a": 1}
+    assert _parse_arguments(json.dumps({"content": "<b>x</b>"})) == {"content": "<b>x</b>"}
+
+
+def test_mcp_caller():
+    calls = []
+
+    async def call_tool(name, arguments):
+        calls.append((name, arguments))
+        return "ok"
+
+    tool = SimpleNamespace(mcp_client=SimpleNamespace(call_tool=call_tool))
+    # MCP 工具的参数名可以是 tool
+    assert asyncio.run(_mcp_caller("lookup")(tool, tool="hammer", size=2)) == "ok"
+    assert calls == [("lookup", {"tool": "hammer", "size": 2})]
+
+
+if __name__ == "__main__":
+    test_compiled_table()
+    test_validator()
+    test_parse_arguments()
+    test_mcp_caller()
+    print("测试完成！")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+测试冻结的工具定义和工具路由
+"""
+
+import src.tool  # 注册内置工具
+from src.tool_registry import registry
+from src.tool_router import ToolRouter, tokenize
+
+
+def test_frozen_schemas():
+    full = registry.get_frozen_schemas()
+    assert full is registry.get_frozen_schemas()  # 只生成一次
+    timer_context = registry.get_frozen_schemas(if_not_timer=False)
+    names = {item.name for item in timer_context}
+    assert "daily_at" not in names and "read_file" in names
+    # 不同过滤条件共用同一个 FrozenSchema
+    read_file = next(item for item in full if item.name == "read_file")
+    assert read_file in timer_context
+    assert read_file.tokens > 0
+    # 返回新的列表，修改列表不影响缓存
+    definitions = registry.get_tools_definition()
+    definitions.append({})
+    assert len(registry.get_tools_definition()) == len(full)
+
+
+def test_tokenize():
+    assert tokenize("get_email_list 读邮件") == ["get", "email", "list", "读邮", "邮件"]
+    assert tokenize("删") == ["删"]
+
+
+def test_select():
+    schemas = registry.get_frozen_schemas()
+    router = ToolRouter(top_k=5, core=["read_file"], recent_size=2)
+
+    selected = [item.name for item in router.select("看看邮箱里的未读邮件", schemas)]
+    print(selected)
+    assert "get_email_list" in selected and "read_file" in selected
+    assert len(selected) <= 6
+
+    # 没有匹配时沿用上一轮的选择，最近用过的工具继续提供
+    router.record_use(["get_dir_tree"])
+    again = [item.name for item in router.select("ok", schemas)]
+    assert set(selected) <= set(again) and "get_dir_tree" in again
+
+    stats = router.stats()
+    assert stats["turns"] == 2 and stats["selected_tokens"] < stats["full_tokens"]
+
+
+if __name__ == "__main__":
+    test_frozen_schemas()
+    test_tokenize()
+    test_select()
+    print("测试完成！")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+测试工具超时与取消：工具任务超时、用户终止、工作进程响应终止标志
+"""
+
+import asyncio
+import json
+import sys
+import time
+from types import SimpleNamespace
+
+from config.config import ToolTimeoutConfig
+from src.tool import Tool, _interrupted_result
+from src.tool_registry import compile_handler
+from tools.worker_pool import PythonWorkerPool
+
+
+def _make_tool(stop_checker=None, tools=None):
+    # 只测试超时与取消逻辑，不初始化完整的 Tool
+    tool = Tool.__new__(Tool)
+    tool.config = SimpleNamespace(tool_timeouts=ToolTimeoutConfig(default=300, tools=tools or {}))
+    tool.stop_checker = stop_checker
+    return tool
+
+
+def _handler(name, func, timeout=None):
+    schema = {"type": "function", "function": {"name": name, "parameters": {"type": "object", "properties": {}}}}
+    return compile_handler(schema, func, asyncio.iscoroutinefunction(func), allow_extra=True, timeout=timeout)
+
+
+def test_timeout_precedence():
+    tool = _make_tool(tools={"slow": 5})
+    assert tool._get_timeout(_handler("slow", lambda self: None, timeout=60)) == 5
+    assert tool._get_timeout(_handler("fast", lambda self: None, timeout=60)) == 60
+    assert tool._get_timeout(_handler("other", lambda self: None)) == 300
+    assert tool._get_timeout(_handler("shell", lambda self: None, timeout=0)) is None
+
+
+def test_run_handler_timeout():
+    tool = _make_tool()
+
+    async def slow(self):
+        await asyncio.sleep(30)
+
+    def cooperative(self):
+        # 同步工具在线程中运行，超时后通过取消标志自行结束
+        while not self._should_stop():
+            time.sleep(0.05)
+        return "partial"
+
+    async def main():
+        start = time.time()
+        state, result = await tool._run_handler(_handler("slow", slow), {}, 0.3)
+        assert (state, result) == ("timeout", None)
+        # 响应取消标志的工具返回已有的结果
+        state, result = await tool._run_handler(_handler("cooperative", cooperative), {}, 0.3)
+        assert (state, result) == ("done", "partial")
+        assert time.time() - start < 5
+        state, result = await tool._run_handler(_handler("fast", lambda self, x: x * 2), {"x": 2}, 1)
+        assert (state, result) == ("done", 4)
+
+    asyncio.run(main())
+
+    message = json.loads(_interrupted_result("search_web", "timeout", 60))
+    print(message)
+    assert message["status"] == "timeout" and message["timeout_seconds"] == 60
+
+
+def test_run_handler_stopped():
+    stopped = {"value": False}
+    tool = _make_tool(stop_checker=lambda: stopped["value"])
+
+    async def slow(self):
+        await asyncio.sleep(30)
+
+    async def main():
+        asyncio.get_running_loop().call_later(0.2, stopped.update, {"value": True})
+        state, _ = await tool._run_handler(_handler("slow", slow), {}, None)
+        assert state == "stopped"
+
+    asyncio.run(main())
+    assert json.loads(_interrupted_result("slow", "stopped", None))["status"] == "cancelled"
+
+
+def test_worker_pool_stop():
+    pool = PythonWorkerPool(sys.executable, size=1)
+    deadline = time.time() + 0.5
+    try:
+        returncode, stdout, stderr = pool.run("import time; print('start', flush=True); time.sleep(30)",
+                                              should_stop=lambda: time.time() > deadline)
+        assert returncode == 1 and stdout == "start\n" and "终止" in stderr
+        assert time.time() - deadline < 5
+        assert pool.run("print('ok')")[1] == "ok\n"
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    test_timeout_precedence()
+    test_run_handler_timeout()
+    test_run_handler_stopped()
+    test_worker_pool_stop()
+    print("测试完成！")
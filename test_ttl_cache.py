@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+测试工具结果缓存：过期、LRU 淘汰、按工具失效、参数规范化、失败结果不缓存
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import src.tool  # 注册内置工具
+from config.config import ToolTimeoutConfig
+from src.tool import Tool
+from src.tool_registry import registry, compile_handler, ToolFailure
+from src.ttl_cache import TTLCache, normalize_args, MISSING
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_and_lru():
+    clock = FakeClock()
+    cache = TTLCache(max_entries=2, clock=clock)
+    cache.set("get_doc", "a", "A", ttl=10)
+    assert cache.get("get_doc", "a") == "A"
+    clock.now = 11
+    assert cache.lookup("get_doc", "a") is MISSING
+
+    cache.set("t", 1, None, ttl=10)
+    cache.set("t", 2, "two", ttl=10)
+    assert cache.lookup("t", 1) is None  # 缓存值可以是 None，同时刷新为最近使用
+    cache.set("t", 3, "three", ttl=10)
+    assert cache.lookup("t", 2) is MISSING
+    stats = cache.stats()
+    print(stats)
+    assert stats["entries"] == 2 and stats["evictions"] == 1
+
+
+def test_invalidate():
+    cache = TTLCache()
+    cache.set("get_subagent", "{}", "list", ttl=60)
+    cache.set("get_role", "{}", "roles", ttl=60)
+    assert cache.invalidate("get_subagent") == 1
+    assert cache.lookup("get_subagent", "{}") is MISSING
+    assert cache.get("get_role", "{}") == "roles"
+    assert cache.invalidate() == 1
+
+
+def test_normalize_and_options():
+    assert normalize_args({"query": " 天气 ", "count": 5}) == normalize_args({"count": 5, "query": "天气"})
+
+    table = registry.compile()
+    assert table["get_subagent"].cache_ttl > 0
+    assert "get_subagent" in table["create_subagent"].invalidates
+    assert table["write_file"].cache_ttl == 0
+    # 文档、角色、技能索引按目录变化重建，不再额外缓存
+    assert table["get_doc_list"].cache_ttl == 0 and table["get_role"].cache_ttl == 0
+
+
+def test_failure_not_cached():
+    calls = []
+
+    def flaky(self):
+        calls.append(1)
+        if len(calls) == 1:
+            return ToolFailure("连接邮件服务器失败: timeout")
+        return "INBOX"
+
+    schema = {"type": "function", "function": {"name": "flaky", "parameters": {"type": "object", "properties": {}}}}
+    tool = Tool.__new__(Tool)
+    tool.config = SimpleNamespace(tool_timeouts=ToolTimeoutConfig(default=30))
+    tool.stop_checker = None
+    tool.tool_cache = TTLCache()
+    tool.dispatch = {"flaky": compile_handler(schema, flaky, False, cache_ttl=600)}
+    tool._mcp_handlers = {}
+
+    async def main():
+        assert await tool._dispatch("flaky", "{}", {}) == "连接邮件服务器失败: timeout"
+        # 失败结果没有缓存，服务恢复后重新执行；成功结果缓存
+        assert await tool._dispatch("flaky", "{}", {}) == "INBOX"
+        assert await tool._dispatch("flaky", "{}", {}) == "INBOX"
+
+    asyncio.run(main())
+    assert len(calls) == 2
+    print("✓ 失败结果不缓存")
+
+
+if __name__ == "__main__":
+    test_ttl_and_lru()
+    test_invalidate()
+    test_normalize_and_options()
+    test_failure_not_cached()
+    print("测试完成！")
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+测试启动预热：组件并行执行、按组件等待、失败和超时
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+from config.config import WarmupConfig
+from src import warmup as warmup_module
+from src.warmup import Warmup, start_warmup_and_mcp
+
+
+def test_parallel_and_wait():
+    async def main():
+        release = threading.Event()
+        warmup = Warmup(wait_timeout=5)
+        warmup.add("slow", lambda: release.wait(5), label="慢")
+        warmup.add("fast", lambda: "ok", label="快")
+
+        async def async_job():
+            await asyncio.sleep(0.05)
+            return 1
+        warmup.add("async", async_job, label="异步", in_thread=False)
+
+        start = time.perf_counter()
+        warmup.start()
+        # 启动立即返回，等待快组件不受慢组件影响
+        assert await warmup.wait_for("fast")
+        assert await warmup.wait_for("async")
+        assert warmup.state("slow") == "pending"
+        assert time.perf_counter() - start < 1
+        print(warmup.status_text())
+        assert "慢 …" in warmup.status_text()
+
+        release.set()
+        assert await warmup.wait_for("slow")
+        assert warmup.all_done()
+        # 未登记的组件不需要等待
+        assert await warmup.wait_for("missing")
+        assert warmup.state("missing") is None
+
+    asyncio.run(main())
+
+
+def test_failure_and_timeout():
+    async def main():
+        warmup = Warmup(wait_timeout=0.2)
+
+        def broken():
+            raise RuntimeError("登录失败")
+        warmup.add("broken", broken, label="坏")
+        warmup.add("hang", lambda: time.sleep(2), label="卡")
+        warmup.start()
+
+        assert not await warmup.wait_for("broken")
+        assert warmup.error("broken") == "登录失败"
+        assert "坏 ✗" in warmup.status_text()
+
+        # 超时返回 False，但组件仍在继续预热
+        start = time.perf_counter()
+        assert not await warmup.wait_for("hang")
+        assert time.perf_counter() - start < 1
+        assert warmup.state("hang") == "pending"
+
+    asyncio.run(main())
+
+
+def test_wait_from_other_thread():
+    """子智能体在自己的线程和事件循环中等待主线程的预热组件"""
+    warmup = Warmup(wait_timeout=5)
+    release = threading.Event()
+    warmup.add("component", lambda: release.wait(5))
+    results = []
+
+    async def start():
+        warmup.start()
+    asyncio.run(start())
+
+    thread = threading.Thread(target=lambda: results.append(asyncio.run(warmup.wait_for("component"))))
+    thread.start()
+    time.sleep(0.1)
+    release.set()
+    thread.join(5)
+    assert results == [True]
+
+
+class FakeBot:
+    def __init__(self):
+        self.tools = None
+        self.mcp_calls = []
+
+    async def init_mcp(self, verbose=True):
+        self.mcp_calls.append(verbose)
+
+
+def test_mcp_without_warmup():
+    """关闭预热或不预热 MCP 时，交互模式启动时直接连接 MCP"""
+    mcp = SimpleNamespace(enabled=True, servers=[{"name": "demo"}])
+    imap = SimpleNamespace(email="", password="")
+    original = warmup_module._global_warmup
+
+    async def main(warmup_config):
+        bot = FakeBot()
+        config = SimpleNamespace(warmup=warmup_config, mcp=mcp, imap=imap)
+        warmup = await start_warmup_and_mcp(bot, config)
+        if warmup:
+            assert await warmup.wait_for("mcp")
+        return warmup, bot.mcp_calls
+
+    try:
+        warmup, calls = asyncio.run(main(WarmupConfig(enabled=False)))
+        assert warmup is None and calls == [True]
+
+        off = dict(mcp=False, imap=False, venv=False, browser=False, index=False)
+        warmup, calls = asyncio.run(main(WarmupConfig(**off)))
+        assert warmup is not None and calls == [True]
+
+        # 预热 MCP 时由预热任务在后台连接，不重复调用
+        warmup, calls = asyncio.run(main(WarmupConfig(**dict(off, mcp=True))))
+        assert warmup.state("mcp") is not None and calls == [False]
+    finally:
+        warmup_module._global_warmup = original
+
+
+if __name__ == "__main__":
+    test_parallel_and_wait()
+    test_failure_and_timeout()
+    test_wait_from_other_thread()
+    test_mcp_without_warmup()
+    print("测试完成！")
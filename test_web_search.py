@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+测试多搜索服务并发检索：URL 规范化、结果融合去重、截止时间和提前返回、批量搜索、不完整结果不缓存
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from src import tool as tool_module
+from src.tool import Tool
+from tools.search_cache import SearchCache
+from tools.url_utils import canonical_url
+from src.tool_registry import registry
+from tools.web_search import fan_out_search, fuse_results, format_fanout_results, format_batch_results, limit_concurrency
+
+
+def test_canonical_url():
+    assert canonical_url("http://WWW.Example.com:80/a/?utm_source=x&b=2&a=1#top") == "https://example.com/a?a=1&b=2"
+    assert canonical_url("https://example.com/a") == canonical_url("https://example.com/a/")
+    assert canonical_url("https://example.com:8443/") == "https://example.com:8443"
+    assert canonical_url("mailto:a@b.com") == "mailto:a@b.com"
+
+
+def test_fuse_results():
+    fused = fuse_results({
+        "bocha": [{"title": "A", "url": "https://a.com/x", "content": "短"},
+                  {"title": "B", "url": "https://b.com", "content": "b"}],
+        "tavily": [{"title": "B", "url": "http://www.b.com/", "content": "b 的更长摘要"},
+                   {"title": "C", "url": "https://c.com", "content": "c"}],
+    })
+    assert [item["title"] for item in fused] == ["B", "A", "C"]
+    assert fused[0]["providers"] == ["bocha", "tavily"]
+    assert fused[0]["content"] == "b 的更长摘要"
+
+
+def _provider(delay, urls, error=None):
+    async def search(query, count):
+        await asyncio.sleep(delay)
+        if error:
+            raise RuntimeError(error)
+        return [{"title": url, "url": url, "content": query} for url in urls[:count]]
+    return search
+
+
+def test_fan_out():
+    async def main():
+        # 快的服务结果已经足够，不等慢的服务
+        start = time.perf_counter()
+        outcome = await fan_out_search("q", 2, {
+            "fast": _provider(0.05, ["https://a.com", "https://b.com"]),
+            "slow": _provider(5, ["https://c.com"]),
+            "broken": _provider(0, [], error="401"),
+        }, deadline=3, grace=0.2)
+        assert time.perf_counter() - start < 1
+        assert outcome.completed == ["fast"] and outcome.timed_out == ["slow"]
+        assert outcome.failed == {"broken": "401"}
+        assert len(outcome.results) == 2
+        print(format_fanout_results(outcome))
+
+        # 结果不够时等到截止时间
+        outcome = await fan_out_search("q", 5, {
+            "fast": _provider(0.01, ["https://a.com"]),
+            "slow": _provider(5, ["https://c.com"]),
+        }, deadline=0.3)
+        assert outcome.timed_out == ["slow"] and 0.25 < outcome.elapsed < 1
+
+        # 宽限时间内返回的服务参与融合
+        outcome = await fan_out_search("q", 2, {
+            "a": _provider(0.01, ["https://x.com"]),
+            "b": _provider(0.05, ["https://y.com", "https://x.com"]),
+        }, deadline=3, grace=0.5)
+        assert outcome.completed == ["a", "b"]
+        assert outcome.results[0]["url"] == "https://x.com" and outcome.results[0]["providers"] == ["a", "b"]
+
+    asyncio.run(main())
+
+
+def test_batch():
+    schema = registry._tools["search_web_batch"]["function"]["parameters"]["properties"]["queries"]
+    assert schema["type"] == "array" and schema["items"] == {"type": "string"}
+
+    active = {"now": 0, "max": 0}
+
+    async def search(query, count):
+        active["now"] += 1
+        active["max"] = max(active["max"], active["now"])
+        await asyncio.sleep(0.05)
+        active["now"] -= 1
+        return [{"title": query, "url": f"https://{query}.com", "content": ""},
+                {"title": "公共", "url": "https://common.com/", "content": ""}]
+
+    async def main():
+        limited = limit_concurrency(search, asyncio.Semaphore(2))
+        queries = [f"q{i}" for i in range(6)]
+        return await asyncio.gather(*(limited(query, 2) for query in queries)), queries
+
+    outcomes, queries = asyncio.run(main())
+    assert active["max"] == 2
+    outcomes[1] = RuntimeError("429")
+    text = format_batch_results(queries, outcomes, 0.3)
+    print(text)
+    assert text.count("https://common.com/") == 1
+    assert "另有 1 条与前面的结果重复: 1.2" in text
+    assert "✗ 搜索失败: 429" in text
+
+
+def test_degraded_fanout_not_cached():
+    calls = {"slow": 0}
+
+    async def fast(query, count):
+        return [{"title": "快", "url": "https://fast.com/", "content": ""}]
+
+    async def slow(query, count):
+        calls["slow"] += 1
+        if calls["slow"] <= 2:
+            await asyncio.sleep(5)
+        return [{"title": "慢", "url": "https://slow.com/", "content": ""}]
+
+    tool = Tool.__new__(Tool)
+    tool.config = SimpleNamespace(web_search=SimpleNamespace(
+        mode="fanout", providers=["fast", "slow"], deadline=0.2, grace=0.1, batch_concurrency=2, batch_max_queries=10))
+    tool._search_providers = lambda names: {"fast": fast, "slow": slow}
+    cache = SearchCache(None)
+    original = tool_module.get_search_cache
+    tool_module.get_search_cache = lambda: cache
+
+    async def main():
+        # 前两次 slow 超时：结果不完整，不缓存
+        first = await tool.search_web("天气", count=2)
+        assert "https://slow.com/" not in first and cache.stats()["writes"] == 0
+        results = await tool._search_results("天气", 2, {"fast": fast, "slow": slow})
+        assert cache.stats()["writes"] == 0 and [r["url"] for r in results] == ["https://fast.com/"]
+        # 所有服务都按时返回时缓存
+        second = await tool.search_web("天气", count=2)
+        assert "https://slow.com/" in second and cache.stats()["writes"] == 1
+
+    try:
+        asyncio.run(main())
+    finally:
+        tool_module.get_search_cache = original
+    print("✓ 不完整的并发检索结果不缓存")
+
+
+if __name__ == "__main__":
+    test_canonical_url()
+    test_fuse_results()
+    test_fan_out()
+    test_batch()
+    test_degraded_fanout_not_cached()
+    print("测试完成！")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+测试 Python 工作进程池：输出捕获、会话命名空间、超时重建和按次数回收
+"""
+
+import sys
+import time
+from tools.worker_pool import PythonWorkerPool
+
+
+def test_run_and_isolation():
+    pool = PythonWorkerPool(sys.executable, size=1)
+    try:
+        returncode, stdout, stderr = pool.run("import sys; print('out'); print('err', file=sys.stderr); x = 1")
+        assert (returncode, stdout, stderr) == (0, "out\n", "err\n")
+
+        # 普通调用之间不共享变量
+        returncode, _, stderr = pool.run("print(x)")
+        assert returncode == 1 and "NameError" in stderr
+
+        assert pool.run("raise SystemExit(3)")[0] == 3
+        assert pool.run("print(__name__)")[1] == "__main__\n"
+
+        start = time.time()
+        for _ in range(20):
+            pool.run("print(1)")
+        print(f"20 次调用耗时 {time.time() - start:.3f}s")
+    finally:
+        pool.shutdown()
+
+
+def test_session():
+    pool = PythonWorkerPool(sys.executable, size=1)
+    try:
+        pool.run("data = [1, 2, 3]", session_id="s1")
+        assert pool.run("print(sum(data))", session_id="s1")[1] == "6\n"
+        assert pool.run("print(data)", session_id="s2")[0] == 1
+        assert pool.close_session("s1")
+        assert pool.stats()["sessions"] == 1
+    finally:
+        pool.shutdown()
+
+
+def test_timeout_and_recycle():
+    pool = PythonWorkerPool(sys.executable, size=1, max_runs=2)
+    try:
+        start = time.time()
+        returncode, stdout, stderr = pool.run("import time; print('start', flush=True); time.sleep(30)", timeout=1)
+        assert returncode == 1 and stdout == "start\n" and "超时" in stderr
+        assert time.time() - start < 10
+        assert pool.run("print('ok')")[1] == "ok\n"
+
+        pool.run("print(1)")
+        stats = pool.stats()
+        print(stats)
+        assert stats["timeouts"] == 1
+        assert stats["recycled"] == 2
+        assert stats["idle"] == 1
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    test_run_and_isolation()
+    test_session()
+    test_timeout_and_recycle()
+    print("测试完成！")
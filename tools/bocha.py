@@ -11,6 +11,7 @@ import httpx
 from typing import Optional, Dict, Any
 from dataclasses import dataclass
 from config.config import load_config 
+from tools.http_client import request, close_http_client
 
 @dataclass
 class SearchResult:
@@ -97,15 +98,16 @@ class BochaSearch:
                 "Content-Type": "application/json"
             }
             
-            # 发送 POST 请求
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/v1/web-search",
-                    headers=headers,
-                    json=payload
-                )
-                response.raise_for_status()
-                data = response.json()
+            # 发送 POST 请求（共享长连接客户端，临时错误自动重试）
+            response = await request(
+                "POST",
+                f"{self.base_url}/v1/web-search",
+                headers=headers,
+                json=payload,
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            data = response.json()
             
             # 解析结果
             results = []
@@ -266,9 +268,9 @@ class BochaSearch:
     async def close(self) -> None:
         """
         关闭客户端
-        由于使用异步上下文管理，此方法为空实现
+        关闭当前事件循环共享的 HTTP 连接池
         """
-        pass
+        await close_http_client()
 
 
 async def create_bocha_search_client() -> BochaSearch:
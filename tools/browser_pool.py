@@ -0,0 +1,320 @@
+"""
+浏览器池
+SmartWebExtractor 过去每提取一个网页都要启动一次 Chromium（1~2 秒，占用数百 MB 内存）再关闭。
+浏览器池让同一事件循环中的提取器、BrowserTools 和 get_web_data 共用一个 Chromium：
+- 页面池：按 key 区分的共享上下文，页面用完后重置为空白页放回，下次直接复用
+- 隔离上下文：new_context() 创建独占的上下文（独立的 Cookie 和存储），关闭上下文不影响浏览器
+- 每个上下文最多同时打开 max_pages_per_context 个页面，超过时创建同 key 的新上下文
+- 空闲超过 idle_timeout 秒后关闭浏览器，下次使用时重新启动
+- 浏览器崩溃或断开后丢弃全部上下文，下次使用时重新启动
+
+Playwright 对象绑定创建它的事件循环，浏览器池按事件循环区分：
+主线程共用一个浏览器，子智能体线程各自一个；事件循环结束前调用 close_browser_pool()。
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+# 新建共享上下文时的初始化函数（如设置资源拦截）
+ContextSetup = Callable[[Any], Awaitable[None]]
+# 启动浏览器的函数，返回 (playwright, browser)，测试时可替换
+Launcher = Callable[[bool], Awaitable[Tuple[Any, Any]]]
+
+
+async def _launch_chromium(headless: bool) -> Tuple[Any, Any]:
+    # playwright 导入较慢，第一次启动浏览器时才导入
+    from playwright.async_api import async_playwright
+    playwright = await async_playwright().start()
+    try:
+        browser = await playwright.chromium.launch(headless=headless)
+    except Exception:
+        await playwright.stop()
+        raise
+    return playwright, browser
+
+
+@dataclass(eq=False)
+class _PooledContext:
+    """页面池中的共享上下文"""
+    key: str
+    context: Any
+    idle_pages: List[Any] = field(default_factory=list)
+    in_use: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class BrowserPool:
+    """
+    单个事件循环内共享的 Chromium 浏览器、上下文和页面
+    """
+
+    def __init__(self,
+                 headless: bool = True,
+                 max_pages_per_context: int = 8,
+                 idle_timeout: float = 300,
+                 launcher: Launcher = _launch_chromium):
+        """
+        Args:
+            headless: 是否无头模式
+            max_pages_per_context: 每个共享上下文最多同时打开的页面数
+            idle_timeout: 没有页面和隔离上下文在使用时，空闲多少秒后关闭浏览器，0 表示不自动关闭
+            launcher: 启动浏览器的函数
+        """
+        self.headless = headless
+        self.max_pages_per_context = max_pages_per_context
+        self.idle_timeout = idle_timeout
+        self._launcher = launcher
+        self._playwright = None
+        self._browser = None
+        self._contexts: List[_PooledContext] = []
+        self._isolated: "weakref.WeakSet" = weakref.WeakSet()
+        self._lock = asyncio.Lock()
+        self._reaper: Optional[asyncio.Task] = None
+        self._last_active = time.monotonic()
+        self.launches = 0
+        self.crashes = 0
+        self.pages_created = 0
+        self.pages_reused = 0
+
+    @property
+    def is_running(self) -> bool:
+        """浏览器是否在运行"""
+        return self._browser is not None
+
+    async def get_browser(self):
+        """
+        获取浏览器，未启动、已空闲关闭或崩溃后重新启动
+
+        Returns:
+            playwright.async_api.Browser: 浏览器
+        """
+        if self._browser is not None and self._browser.is_connected():
+            return self._browser
+        async with self._lock:
+            if self._browser is not None and not self._browser.is_connected():
+                self._on_disconnected()
+            if self._browser is None:
+                self._playwright, self._browser = await self._launcher(self.headless)
+                self._browser.on("disconnected", lambda *_: self._on_disconnected())
+                self.launches += 1
+                self._touch()
+                if self.idle_timeout and (self._reaper is None or self._reaper.done()):
+                    self._reaper = asyncio.ensure_future(self._reap_idle())
+            return self._browser
+
+    async def new_context(self, **options):
+        """
+        创建独占的隔离上下文，调用方负责关闭（只关闭上下文，浏览器继续供其他人使用）
+        隔离上下文未关闭时浏览器不会因空闲而关闭
+
+        Args:
+            **options: 传给 browser.new_context 的参数（user_agent、viewport 等）
+
+        Returns:
+            playwright.async_api.BrowserContext: 新的上下文
+        """
+        browser = await self.get_browser()
+        context = await browser.new_context(**options)
+        self._isolated.add(context)
+        context.on("close", lambda *_: self._isolated.discard(context))
+        self._touch()
+        return context
+
+    @asynccontextmanager
+    async def page(self, key: str = "default", setup: Optional[ContextSetup] = None, **options):
+        """
+        从页面池借用一个页面，退出时重置为空白页放回
+
+        Args:
+            key: 共享上下文的名称，不同 key 的页面互相隔离；同一 key 应使用相同的 setup 和 options
+            setup: 新建上下文后的初始化函数
+            **options: 新建上下文时传给 browser.new_context 的参数
+
+        Yields:
+            playwright.async_api.Page: 页面
+        """
+        pooled, page = await self._acquire(key, setup, options)
+        try:
+            yield page
+        finally:
+            await self._release(pooled, page)
+
+    async def _acquire(self, key: str, setup: Optional[ContextSetup], options: Dict[str, Any]):
+        for attempt in range(2):
+            browser = await self.get_browser()
+            pooled = next((item for item in self._contexts
+                           if item.key == key and item.in_use < self.max_pages_per_context), None)
+            try:
+                if pooled is None:
+                    context = await browser.new_context(**options)
+                    if setup is not None:
+                        try:
+                            await setup(context)
+                        except Exception:
+                            # 初始化失败的上下文没有放入页面池，关闭后再抛出，避免泄漏
+                            try:
+                                await context.close()
+                            except Exception:
+                                pass
+                            raise
+                    pooled = _PooledContext(key, context)
+                    self._contexts.append(pooled)
+                pooled.in_use += 1
+                self._touch()
+                while pooled.idle_pages:
+                    page = pooled.idle_pages.pop()
+                    if not page.is_closed():
+                        self.pages_reused += 1
+                        return pooled, page
+                try:
+                    page = await pooled.context.new_page()
+                except Exception:
+                    pooled.in_use -= 1
+                    raise
+                self.pages_created += 1
+                return pooled, page
+            except Exception:
+                # 浏览器在这期间崩溃时重启一次
+                if attempt == 0 and not browser.is_connected():
+                    self._on_disconnected()
+                    continue
+                raise
+
+    async def _release(self, pooled: _PooledContext, page):
+        pooled.in_use -= 1
+        pooled.last_used = time.monotonic()
+        self._touch()
+        if pooled not in self._contexts or page.is_closed():
+            return
+        try:
+            await page.goto("about:blank")
+            pooled.idle_pages.append(page)
+        except Exception:
+            try:
+                await page.close()
+            except Exception:
+                pass
+
+    def _touch(self):
+        self._last_active = time.monotonic()
+
+    def _on_disconnected(self):
+        """浏览器崩溃或断开：丢弃全部状态，下次使用时重新启动"""
+        if self._browser is None:
+            return
+        self.crashes += 1
+        self._browser = None
+        self._contexts.clear()
+        self._isolated = weakref.WeakSet()
+        playwright, self._playwright = self._playwright, None
+        if playwright is not None:
+            asyncio.ensure_future(self._stop_playwright(playwright))
+
+    @staticmethod
+    async def _stop_playwright(playwright):
+        try:
+            await playwright.stop()
+        except Exception:
+            pass
+
+    def _busy(self) -> bool:
+        if any(item.in_use for item in self._contexts):
+            return True
+        return any(True for _ in self._isolated)
+
+    async def _reap_idle(self):
+        """后台任务：关闭空闲的共享上下文，整个浏览器空闲超时后关闭浏览器"""
+        interval = max(min(self.idle_timeout / 4, 30), 0.05)
+        while self._browser is not None:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            for pooled in list(self._contexts):
+                if not pooled.in_use and now - pooled.last_used >= self.idle_timeout:
+                    self._contexts.remove(pooled)
+                    try:
+                        await pooled.context.close()
+                    except Exception:
+                        pass
+            if not self._busy() and now - self._last_active >= self.idle_timeout:
+                await self.close(stop_reaper=False)
+                return
+
+    async def close(self, stop_reaper: bool = True):
+        """关闭全部上下文和浏览器"""
+        if stop_reaper and self._reaper is not None and self._reaper is not asyncio.current_task():
+            self._reaper.cancel()
+        self._reaper = None
+        async with self._lock:
+            browser, self._browser = self._browser, None
+            playwright, self._playwright = self._playwright, None
+            self._contexts.clear()
+            self._isolated = weakref.WeakSet()
+            if browser is not None:
+                try:
+                    await browser.close()
+                except Exception:
+                    pass
+            if playwright is not None:
+                await self._stop_playwright(playwright)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns:
+            dict: running, launches, crashes, contexts, pages_in_use, pages_created, pages_reused
+        """
+        return {
+            "running": int(self.is_running),
+            "launches": self.launches,
+            "crashes": self.crashes,
+            "contexts": len(self._contexts) + sum(1 for _ in self._isolated),
+            "pages_in_use": sum(item.in_use for item in self._contexts),
+            "pages_created": self.pages_created,
+            "pages_reused": self.pages_reused
+        }
+
+
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[bool, BrowserPool]]" = weakref.WeakKeyDictionary()
+_pools_lock = threading.Lock()
+
+
+def get_browser_pool(headless: bool = True) -> BrowserPool:
+    """
+    获取当前事件循环的浏览器池，不存在时按 config.yaml 中的 browser 配置创建
+
+    Args:
+        headless: 是否无头模式
+
+    Returns:
+        BrowserPool: 当前事件循环的浏览器池
+    """
+    loop = asyncio.get_running_loop()
+    with _pools_lock:
+        pools = _pools.setdefault(loop, {})
+        pool = pools.get(headless)
+        if pool is None:
+            from config.config import load_config, BrowserConfig
+            try:
+                browser_config = load_config().browser
+            except Exception:
+                browser_config = BrowserConfig()
+            pool = pools[headless] = BrowserPool(
+                headless=headless,
+                max_pages_per_context=browser_config.max_pages_per_context,
+                idle_timeout=browser_config.idle_timeout
+            )
+        return pool
+
+
+async def close_browser_pool():
+    """关闭当前事件循环的浏览器池，在事件循环结束前调用"""
+    loop = asyncio.get_running_loop()
+    with _pools_lock:
+        pools = _pools.pop(loop, {})
+    for pool in pools.values():
+        await pool.close()
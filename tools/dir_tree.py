@@ -0,0 +1,239 @@
+"""
+目录树工具
+功能：使用 os.scandir 递归列出目录结构（含文件大小、修改时间）
+每个目录的扫描结果按目录 mtime 缓存，会话内重复查看同一目录直接从内存返回
+"""
+
+import os
+import time
+import fnmatch
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+# 默认忽略的文件/目录（fnmatch 规则）
+DEFAULT_IGNORE = [
+    ".git", "__pycache__", "node_modules", ".venv", "venv", "code_venv",
+    ".mypy_cache", ".pytest_cache", ".ruff_cache", ".tox", ".idea",
+    ".DS_Store", "*.pyc", "*.egg-info",
+]
+
+
+@dataclass
+class DirEntry:
+    """目录中的单个条目"""
+    name: str
+    path: str
+    is_dir: bool
+    size: int
+    mtime: float
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估算文本 token 数
+    ASCII 字符约 4 个一个 token，非 ASCII（中文等）按 1 个字符一个 token 计算
+    """
+    ascii_count = sum(1 for ch in text if ord(ch) < 128)
+    return ascii_count // 4 + (len(text) - ascii_count) + 1
+
+
+def format_size(size: int) -> str:
+    """把字节数格式化为紧凑的 B/K/M/G 表示"""
+    value = float(size)
+    for unit in ("B", "K", "M", "G"):
+        if value < 1024 or unit == "G":
+            return f"{int(value)}{unit}" if unit == "B" else f"{value:.1f}{unit}"
+        value /= 1024
+    return f"{size}B"
+
+
+class DirTree:
+    """
+    目录树生成器
+
+    - 使用 os.scandir 扫描，Windows 上 stat 信息随目录项一起返回，无额外系统调用
+    - 缓存键为目录真实路径，目录 mtime 变化（增删改名）或超过 ttl 后重新扫描
+    - 写入类工具通过 invalidate() 主动失效对应目录
+    """
+
+    def __init__(self, ttl: float = 120.0):
+        """
+        Args:
+            ttl: 缓存最长有效时间（秒），用于兜底文件原地修改不会改变目录 mtime 的情况
+        """
+        self.ttl = ttl
+        self._cache: Dict[str, Tuple[int, float, List[DirEntry]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def scan_dir(self, dir_path: str) -> List[DirEntry]:
+        """
+        获取单个目录的条目列表（命中缓存时不访问磁盘目录项）
+
+        Args:
+            dir_path: 目录路径
+
+        Returns:
+            List[DirEntry]: 目录优先、按名称排序的条目列表
+        """
+        real_path = os.path.realpath(dir_path)
+        dir_mtime = os.stat(real_path).st_mtime_ns
+        now = time.monotonic()
+
+        with self._lock:
+            cached = self._cache.get(real_path)
+            if cached and cached[0] == dir_mtime and now - cached[1] < self.ttl:
+                self.hits += 1
+                return cached[2]
+            self.misses += 1
+
+        entries = []
+        with os.scandir(real_path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    stat = entry.stat(follow_symlinks=False)
+                    entries.append(DirEntry(
+                        name=entry.name,
+                        path=entry.path,
+                        is_dir=is_dir,
+                        size=0 if is_dir else stat.st_size,
+                        mtime=stat.st_mtime
+                    ))
+                except OSError:
+                    continue
+        entries.sort(key=lambda e: (not e.is_dir, e.name.lower()))
+
+        with self._lock:
+            self._cache[real_path] = (dir_mtime, now, entries)
+        return entries
+
+    def invalidate(self, path: str):
+        """
+        使路径本身及其父目录的缓存失效（写入、移动、删除文件后调用）
+
+        Args:
+            path: 被修改的文件或目录路径
+        """
+        real_path = os.path.realpath(path)
+        with self._lock:
+            self._cache.pop(real_path, None)
+            self._cache.pop(os.path.dirname(real_path), None)
+
+    def clear(self):
+        """清空全部缓存"""
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """获取缓存统计信息"""
+        with self._lock:
+            return {"dirs": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+    def render(self,
+               dir_path: str,
+               max_depth: int = 3,
+               max_entries: int = 200,
+               ignore: Optional[List[str]] = None,
+               exclude_paths: Optional[List[str]] = None,
+               token_budget: int = 2000) -> str:
+        """
+        生成紧凑的目录树文本
+
+        先按层（广度优先）收集条目，保证 max_entries 被均匀分配到各层，
+        再按深度优先顺序输出，未展开的目录会标注剩余条目数。
+
+        Args:
+            dir_path: 根目录路径
+            max_depth: 最大递归深度，1 表示只列出根目录
+            max_entries: 最多列出的条目数
+            ignore: 额外的忽略规则（fnmatch 格式），会与 DEFAULT_IGNORE 合并
+            exclude_paths: 禁止访问的路径列表，命中的条目不会出现在结果中
+            token_budget: 输出文本的 token 预算，超出部分截断
+
+        Returns:
+            str: 目录树文本
+        """
+        patterns = DEFAULT_IGNORE + [p for p in (ignore or []) if p]
+        excluded = {os.path.normcase(os.path.abspath(p)) for p in (exclude_paths or [])}
+
+        def is_ignored(entry: DirEntry) -> bool:
+            if any(fnmatch.fnmatch(entry.name, p) for p in patterns):
+                return True
+            return os.path.normcase(os.path.abspath(entry.path)) in excluded
+
+        # 广度优先收集：children[目录路径] = (展示的子条目, 被省略的数量)
+        children: Dict[str, Tuple[List[DirEntry], int]] = {}
+        queue = deque([(dir_path, 1)])
+        collected = 0
+        while queue:
+            path, depth = queue.popleft()
+            try:
+                entries = [e for e in self.scan_dir(path) if not is_ignored(e)]
+            except OSError:
+                children[path] = ([], 0)
+                continue
+            room = max(max_entries - collected, 0)
+            shown = entries[:room]
+            children[path] = (shown, len(entries) - len(shown))
+            collected += len(shown)
+            if depth < max_depth:
+                queue.extend((e.path, depth + 1) for e in shown if e.is_dir)
+
+        lines = [f"{os.path.abspath(dir_path)}/"]
+        used_tokens = estimate_tokens(lines[0])
+        truncated = False
+
+        def walk(path: str, indent: str) -> bool:
+            nonlocal used_tokens
+            shown, omitted = children.get(path, ([], 0))
+            for entry in shown:
+                if entry.is_dir:
+                    sub = children.get(entry.path)
+                    if sub is None:
+                        line = f"{indent}{entry.name}/ …"
+                    else:
+                        line = f"{indent}{entry.name}/"
+                else:
+                    mtime = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.mtime))
+                    line = f"{indent}{entry.name}  {format_size(entry.size)}  {mtime}"
+                used_tokens += estimate_tokens(line)
+                if used_tokens > token_budget:
+                    return False
+                lines.append(line)
+                if entry.is_dir and entry.path in children:
+                    if not walk(entry.path, indent + "  "):
+                        return False
+            if omitted:
+                lines.append(f"{indent}… 另有 {omitted} 项未列出")
+            return True
+
+        if not walk(dir_path, "  "):
+            truncated = True
+
+        summary = f"共列出 {collected} 项（深度≤{max_depth}）"
+        if truncated:
+            summary += "，输出超出预算已截断，可减小 max_depth 或指定子目录"
+        lines.append(summary)
+        return "\n".join(lines)
+
+
+# 全局目录树实例（单例模式）
+_global_dir_tree: Optional[DirTree] = None
+
+
+def get_dir_tree() -> DirTree:
+    """
+    获取全局目录树实例，整个进程共享同一份目录缓存
+
+    Returns:
+        DirTree: 全局目录树实例
+    """
+    global _global_dir_tree
+    if _global_dir_tree is None:
+        _global_dir_tree = DirTree()
+    return _global_dir_tree
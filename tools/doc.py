@@ -1,4 +1,5 @@
 import os
+from tools.file_cache import get_file_cache
 class Doc:
     def __init__(self) -> None:
         self.file_path = os.path.join(os.path.dirname(__file__), "..",".shitbot", "docs")  # 文件夹地址
@@ -28,8 +29,7 @@ class Doc:
         Args:
             file_name: 文件名称
         """
-        with open(os.path.join(self.file_path, f"{file_name}.md"), "r", encoding="utf-8") as f:
-            content = f.read()
+        content = get_file_cache().read_text(os.path.join(self.file_path, f"{file_name}.md"))
         v = None
         # md生成json格式 里面每个#会被识别为标题成为key然后#下面内容生成字典
         lines = content.split("\n")# 按行分割
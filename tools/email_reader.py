@@ -10,8 +10,10 @@ from email.header import decode_header
 from email.utils import parseaddr
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+from functools import wraps
 import re
 import imaplib
+import threading
 
 
 import base64
@@ -87,8 +89,17 @@ def imap_utf7_decode(s: str) -> str:
     return ''.join(result)
 
 
+def _synchronized(method):
+    """同一个 IMAP 连接不能并发使用，进程内共享时按实例加锁"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class EmailReader:
-    """邮件读取器"""
+    """邮件读取器（线程安全，可在主智能体、子智能体和定时任务之间共享）"""
     
     def __init__(self, email_address: str, password: str, 
                  imap_server: str = "imap.qq.com", 
@@ -107,7 +118,9 @@ class EmailReader:
         self.imap_server = imap_server
         self.imap_port = imap_port
         self.connection = None
+        self.lock = threading.RLock()
     
+    @_synchronized
     def connect(self) -> Dict[str, Any]:
         """
         连接到IMAP服务器
@@ -140,6 +153,7 @@ class EmailReader:
                 "message": f"连接失败: {str(e)}"
             }
     
+    @_synchronized
     def disconnect(self):
         """断开连接"""
         try:
@@ -215,6 +229,7 @@ class EmailReader:
         
         return body.strip()
     
+    @_synchronized
     def list_folders(self) -> Dict[str, Any]:
         """
         列出所有邮件文件夹
@@ -258,6 +273,7 @@ class EmailReader:
                 "error": str(e)
             }
     
+    @_synchronized
     def get_email_list(self, folder: str = "INBOX", limit: int = 10, 
                        unread_only: bool = False) -> Dict[str, Any]:
         """
@@ -348,6 +364,7 @@ class EmailReader:
                 return True
         return False
     
+    @_synchronized
     def get_email_content(self, email_id: str, folder: str = "INBOX") -> Dict[str, Any]:
         """
         获取邮件详细内容
@@ -428,6 +445,7 @@ class EmailReader:
                 "error": str(e)
             }
     
+    @_synchronized
     def search_emails(self, criteria: str, folder: str = "INBOX", 
                       limit: int = 10) -> Dict[str, Any]:
         """
@@ -506,6 +524,7 @@ class EmailReader:
                 "error": str(e)
             }
     
+    @_synchronized
     def delete_email(self, email_id: str, folder: str = "INBOX") -> Dict[str, Any]:
         """
         删除邮件
@@ -543,6 +562,7 @@ class EmailReader:
                 "error": str(e)
             }
     
+    @_synchronized
     def mark_as_read(self, email_id: str, folder: str = "INBOX") -> Dict[str, Any]:
         """
         标记邮件为已读
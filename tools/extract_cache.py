@@ -0,0 +1,185 @@
+"""
+网页提取结果缓存
+定时任务和子智能体经常反复读取同一批网页。提取结果按规范化 URL 缓存在 .shitbot/cache/extract 下，
+每条记录保存解析后的 ExtractedContent（不含 raw_html）、ETag/Last-Modified、HTML 摘要和抓取时间：
+- 抓取后 fresh_ttl 秒内直接返回缓存，不发请求
+- 过期后带 If-None-Match/If-Modified-Since 发条件请求，304 时沿用缓存
+- 网页重新下载或渲染后 HTML 摘要没有变化时不再解析
+超过 max_age 的记录删除，磁盘层的原子写入和按最近使用时间淘汰与搜索缓存相同。
+"""
+
+import hashlib
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from src.ttl_cache import MISSING
+from tools.search_cache import SearchCache
+from tools.url_utils import canonical_url
+
+
+_DEFAULT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".shitbot", "cache", "extract")
+_NAMESPACE = "extract"
+
+
+class ExtractCache(SearchCache):
+    """
+    网页提取结果缓存（线程安全），复用 SearchCache 的内存层和磁盘层
+    """
+
+    def __init__(self,
+                 directory: Optional[str] = _DEFAULT_DIR,
+                 fresh_ttl: float = 300,
+                 max_age: float = 7 * 86400,
+                 max_disk_bytes: int = 100 * 1024 * 1024,
+                 memory_entries: int = 64,
+                 enabled: bool = True,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            directory: 磁盘缓存目录，None 表示只使用内存层
+            fresh_ttl: 抓取后多少秒内直接使用缓存，不发请求
+            max_age: 记录最长保存时间（秒），超过后重新抓取
+            max_disk_bytes: 磁盘层容量上限（字节）
+            memory_entries: 内存层最多保存的条目数
+            enabled: 是否启用
+            clock: 时钟函数，测试时可替换
+        """
+        super().__init__(directory=directory, ttl=max_age, disk_ttl=max_age,
+                         max_disk_bytes=max_disk_bytes, memory_entries=memory_entries,
+                         enabled=enabled, clock=clock)
+        self.fresh_ttl = fresh_ttl
+        self.revalidated = 0
+
+    @staticmethod
+    def url_key(url: str) -> str:
+        """
+        Returns:
+            str: 规范化 URL 的摘要，同时用作磁盘文件名
+        """
+        return hashlib.sha1(canonical_url(url).encode("utf-8")).hexdigest()
+
+    def get(self, url: str) -> Optional[dict]:
+        """
+        读取网页的缓存记录（可能已不新鲜，由 is_fresh 判断）
+
+        Returns:
+            dict: 记录，包含 content、etag、last_modified、hash、fetch_method、created；未命中时返回 None
+        """
+        if not self.enabled:
+            return None
+        key = self.url_key(url)
+        entry = self._memory.lookup(_NAMESPACE, key)
+        if entry is not MISSING:
+            with self._lock:
+                self.memory_hits += 1
+            return entry
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._memory.set(_NAMESPACE, key, entry, ttl=entry["created"] + self.disk_ttl - self._clock())
+        return entry
+
+    def is_fresh(self, entry: dict) -> bool:
+        """记录是否在 fresh_ttl 内，可以不发请求直接使用"""
+        return self._clock() - entry["created"] < self.fresh_ttl
+
+    def set(self, url: str, content: Dict, html_hash: str, fetch_method: str,
+            etag: str = "", last_modified: str = "") -> Optional[dict]:
+        """
+        保存提取结果
+
+        Args:
+            url: 网页地址
+            content: ExtractedContent 的字段（不含 raw_html）
+            html_hash: HTML 摘要
+            fetch_method: static 或 browser
+            etag: 响应头 ETag
+            last_modified: 响应头 Last-Modified
+
+        Returns:
+            dict: 保存的记录，未启用时返回 None
+        """
+        if not self.enabled:
+            return None
+        entry = {
+            "created": self._clock(),
+            "url": canonical_url(url),
+            "content": content,
+            "hash": html_hash,
+            "fetch_method": fetch_method,
+            "etag": etag,
+            "last_modified": last_modified
+        }
+        self._store(url, entry)
+        with self._lock:
+            self.writes += 1
+        return entry
+
+    def refresh(self, url: str, entry: dict, etag: str = "", last_modified: str = "") -> dict:
+        """
+        网页未变化（304 或 HTML 摘要相同）：更新抓取时间和校验头，沿用解析结果
+
+        Returns:
+            dict: 更新后的记录
+        """
+        entry = dict(entry, created=self._clock(),
+                     etag=etag or entry.get("etag", ""),
+                     last_modified=last_modified or entry.get("last_modified", ""))
+        if self.enabled:
+            self._store(url, entry)
+        with self._lock:
+            self.revalidated += 1
+        return entry
+
+    def _store(self, url: str, entry: dict):
+        key = self.url_key(url)
+        self._memory.set(_NAMESPACE, key, entry, ttl=self.disk_ttl)
+        if self.directory:
+            self._write_disk(key, entry)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns:
+            dict: memory_hits, disk_hits, misses, writes, revalidated, memory_entries, disk_bytes, disk_evictions
+        """
+        stats = super().stats()
+        stats["revalidated"] = self.revalidated
+        return stats
+
+
+# 全局提取缓存（单例模式）
+_global_extract_cache: Optional[ExtractCache] = None
+_extract_cache_lock = threading.Lock()
+
+
+def get_extract_cache() -> ExtractCache:
+    """
+    获取全局提取缓存，首次调用时按 config.yaml 中的 extract_cache 配置创建
+
+    Returns:
+        ExtractCache: 全局提取缓存
+    """
+    global _global_extract_cache
+    if _global_extract_cache is None:
+        with _extract_cache_lock:
+            if _global_extract_cache is None:
+                from config.config import load_config, ExtractCacheConfig
+                try:
+                    config = load_config().extract_cache
+                except Exception:
+                    config = ExtractCacheConfig()
+                _global_extract_cache = ExtractCache(
+                    directory=_DEFAULT_DIR if config.disk else None,
+                    fresh_ttl=config.fresh_ttl,
+                    max_age=config.max_age,
+                    max_disk_bytes=int(config.max_disk_mb * 1024 * 1024),
+                    memory_entries=config.memory_entries,
+                    enabled=config.enabled
+                )
+    return _global_extract_cache
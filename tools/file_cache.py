@@ -0,0 +1,150 @@
+"""
+文件内容缓存
+功能：进程内共享的文本文件缓存，供 read_file / read_line_at / get_line_info /
+run_code_file 以及 Doc、Skill、Role、提示词加载复用，避免同一会话反复打开和解码同一文件
+
+缓存键为 (真实路径, mtime_ns, 文件大小)，文件变化后自动失效；
+写入类工具修改文件后调用 invalidate() 主动失效。
+总缓存按字节数做 LRU 淘汰。
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+
+class FileCache:
+    """
+    文本文件内容缓存（LRU，按字节数限制）
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        """
+        初始化文件缓存
+
+        Args:
+            max_bytes: 缓存总字节数上限，默认 32MB；单个文件超过上限的 1/4 时不缓存
+        """
+        self.max_bytes = max_bytes
+        # 真实路径 -> (mtime_ns, size, encoding, 文本内容)
+        self._entries: "OrderedDict[str, Tuple[int, int, str, str]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def read_text(self, file_path: str, encoding: str = "utf-8") -> str:
+        """
+        读取文本文件内容，命中缓存时不访问文件内容
+
+        Args:
+            file_path: 文件路径
+            encoding: 文件编码，默认 utf-8
+
+        Returns:
+            str: 文件内容（换行符已按文本模式统一为 \\n）
+
+        Raises:
+            OSError / UnicodeDecodeError: 与内置 open() 行为一致
+        """
+        real_path = os.path.realpath(file_path)
+        stat = os.stat(real_path)
+
+        with self._lock:
+            entry = self._entries.get(real_path)
+            if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size and entry[2] == encoding:
+                self._entries.move_to_end(real_path)
+                self.hits += 1
+                return entry[3]
+            self.misses += 1
+
+        with open(real_path, "r", encoding=encoding) as f:
+            content = f.read()
+
+        if stat.st_size <= self.max_bytes // 4:
+            with self._lock:
+                self._remove(real_path)
+                self._entries[real_path] = (stat.st_mtime_ns, stat.st_size, encoding, content)
+                self._total_bytes += stat.st_size
+                while self._total_bytes > self.max_bytes and self._entries:
+                    oldest = next(iter(self._entries))
+                    self._remove(oldest)
+                    self.evictions += 1
+        return content
+
+    def read_lines(self, file_path: str, encoding: str = "utf-8") -> List[str]:
+        """
+        按行读取文件，结果与 f.readlines() 一致（每行保留换行符）
+
+        Args:
+            file_path: 文件路径
+            encoding: 文件编码，默认 utf-8
+
+        Returns:
+            List[str]: 行列表
+        """
+        content = self.read_text(file_path, encoding)
+        parts = content.split("\n")
+        lines = [part + "\n" for part in parts[:-1]]
+        if parts[-1]:
+            lines.append(parts[-1])
+        return lines
+
+    def invalidate(self, file_path: str):
+        """
+        使指定文件的缓存失效
+
+        Args:
+            file_path: 被修改、移动或删除的文件路径
+        """
+        real_path = os.path.realpath(file_path)
+        with self._lock:
+            self._remove(real_path)
+
+    def clear(self):
+        """清空全部缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        获取缓存统计信息
+
+        Returns:
+            dict: 命中次数、未命中次数、淘汰次数、缓存文件数和占用字节数
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "files": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes
+            }
+
+    def _remove(self, real_path: str):
+        """删除单个条目（调用方需持有锁）"""
+        entry = self._entries.pop(real_path, None)
+        if entry:
+            self._total_bytes -= entry[1]
+
+
+# 全局文件缓存实例（单例模式）
+_global_file_cache: Optional[FileCache] = None
+
+
+def get_file_cache() -> FileCache:
+    """
+    获取全局文件缓存实例，所有工具共享同一份缓存
+
+    Returns:
+        FileCache: 全局文件缓存实例
+    """
+    global _global_file_cache
+    if _global_file_cache is None:
+        _global_file_cache = FileCache()
+    return _global_file_cache
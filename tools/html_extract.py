@@ -0,0 +1,516 @@
+"""
+单遍 HTML 结构提取
+SmartWebExtractor 原来的 BeautifulSoup 实现为每个字段各做一次全树遍历（链接、图片、表格、列表、表单……约 12 次），
+并且在事件循环线程中同步执行，大网页会让事件循环卡顿数百毫秒。
+
+这里用 lxml 解析，一次深度优先遍历收集 ExtractedContent 的全部字段：
+遍历时记录需要的元素、读取 JSON-LD、剪掉 script/style 等无关子树，遍历结束后再取各元素的文本。
+没有语义化容器时，自底向上统计一次各元素的文本和链接长度，给段落容器打分定位正文，耗时与网页大小成正比。
+extract_html() 把解析放到进程池中执行，不占用事件循环，也不受 GIL 限制。
+工作进程用 forkserver（Windows 上用 spawn）启动，不从已运行多个线程（预热、子智能体、Playwright）的主进程 fork，
+避免子进程继承其他线程持有的锁而卡死。本模块只依赖 lxml，解析时不使用项目的其他模块。
+"""
+
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import re
+import threading
+from html import escape as html_escape
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import lxml.html
+from lxml import etree
+
+
+# 清理时整棵剪掉的标签
+_DROP_TAGS = frozenset({"script", "style", "noscript", "iframe", "canvas", "svg"})
+_HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+_SEMANTIC_TAGS = ("article", "section", "aside", "nav", "header", "footer")
+_FORM_FIELDS = ("input", "textarea", "select")
+_BUTTON_CLASS = re.compile(r"btn|button", re.I)
+_TAXONOMY = re.compile(r"/(tag|category|topic)/")
+_WHITESPACE = re.compile(r"\s+")
+
+MAX_LINKS = 50
+MAX_IMAGES = 30
+MAX_TABLES = 5
+MAX_TABLE_ROWS = 20
+MAX_LISTS = 10
+MAX_LIST_ITEMS = 15
+MAX_INTERACTIVE = 20
+MAX_CODE_BLOCKS = 10
+MAX_MICRODATA = 5
+# 正文 HTML 最多保留的字符数，用于生成 Markdown
+MAX_MAIN_HTML = 100000
+# 正文容器至少包含的字符数（不含空白）
+MIN_BLOCK_CHARS = 200
+# 段落祖父元素的得分权重
+GRANDPARENT_WEIGHT = 0.5
+
+
+def clean_text(text: str) -> str:
+    """合并连续空白并去掉首尾空白"""
+    if not text:
+        return ""
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def html_hash(html: str) -> str:
+    """HTML 的摘要，用于判断网页内容是否变化"""
+    return hashlib.md5(html.encode()).hexdigest()
+
+
+def classify_link(href: str) -> str:
+    """分类链接类型：anchor、document、email、taxonomy、page"""
+    if href.startswith("#"):
+        return "anchor"
+    elif any(x in href.lower() for x in [".pdf", ".doc", ".zip"]):
+        return "document"
+    elif "mailto:" in href:
+        return "email"
+    elif _TAXONOMY.search(href):
+        return "taxonomy"
+    else:
+        return "page"
+
+
+def _text(element) -> str:
+    return element.text_content() or ""
+
+
+def _classes(element) -> List[str]:
+    return (element.get("class") or "").split()
+
+
+def _parse(html: str):
+    try:
+        return lxml.html.document_fromstring(html)
+    except (etree.ParserError, ValueError):
+        # 空文档或带编码声明的字符串
+        return lxml.html.document_fromstring(html.encode("utf-8", "replace")) if html.strip() else None
+
+
+def extract_content(html: str, url: str, title: str = "") -> Dict[str, Any]:
+    """
+    一次遍历提取网页结构
+
+    Args:
+        html: 渲染后的 HTML
+        url: 网页地址，用于补全相对链接
+        title: 页面标题，为空时使用 <title>
+
+    Returns:
+        dict: ExtractedContent 的各个字段（不含 raw_html），main_html 为正文元素的 HTML（已清理，可能截断）
+    """
+    result: Dict[str, Any] = {
+        "url": url,
+        "title": title,
+        "meta_description": "",
+        "main_text": "",
+        "structured_data": [],
+        "headings_outline": [],
+        "links": [],
+        "images": [],
+        "tables": [],
+        "lists": [],
+        "interactive_elements": [],
+        "semantic_html5_tags": {},
+        "code_blocks": [],
+        "raw_html_hash": html_hash(html),
+        "main_html": "",
+    }
+    root = _parse(html)
+    if root is None:
+        return result
+
+    json_ld: List[Any] = []
+    meta_name = meta_og = None
+    page_title = None
+    candidates: Dict[str, Any] = {}
+    headings, anchors, images, tables, lists = [], [], [], [], []
+    forms, buttons, microdata, pres, codes = [], [], [], [], []
+    text_blocks: Dict[Any, float] = {}
+    semantic: Dict[str, list] = {tag: [] for tag in _SEMANTIC_TAGS}
+
+    # 深度优先遍历，被剪掉的子树不再进入
+    stack = [root]
+    while stack:
+        element = stack.pop()
+        tag = element.tag
+        if not isinstance(tag, str):
+            # 注释和处理指令
+            if tag is etree.Comment:
+                element.drop_tree()
+            continue
+        tag = tag.lower()
+
+        if tag in _DROP_TAGS:
+            if tag == "script" and (element.get("type") or "").lower() == "application/ld+json":
+                try:
+                    json_ld.append(json.loads(element.text or ""))
+                except ValueError:
+                    pass
+            element.drop_tree()
+            continue
+
+        if tag == "meta":
+            if meta_name is None and element.get("name") == "description":
+                meta_name = element.get("content", "")
+            elif meta_og is None and element.get("property") == "og:description":
+                meta_og = element.get("content", "")
+        elif tag == "title":
+            if page_title is None:
+                page_title = element
+        elif tag in _HEADINGS:
+            headings.append(element)
+        elif tag == "a":
+            if element.get("href") is not None:
+                anchors.append(element)
+            if _BUTTON_CLASS.search(element.get("class") or ""):
+                buttons.append(element)
+        elif tag == "button":
+            if _BUTTON_CLASS.search(element.get("class") or ""):
+                buttons.append(element)
+        elif tag == "img":
+            images.append(element)
+        elif tag == "table":
+            tables.append(element)
+        elif tag in ("ul", "ol"):
+            lists.append(element)
+        elif tag == "form":
+            forms.append(element)
+        elif tag == "pre":
+            pres.append(element)
+        elif tag == "code":
+            codes.append(element)
+        elif tag == "p":
+            # 段落的父元素和祖父元素都可能是正文容器，祖父元素得分减半
+            parent = element.getparent()
+            if parent is not None:
+                text_blocks[parent] = 1.0
+                grandparent = parent.getparent()
+                if grandparent is not None:
+                    text_blocks.setdefault(grandparent, GRANDPARENT_WEIGHT)
+
+        if tag in semantic:
+            semantic[tag].append(element)
+        if tag in ("article", "main") and tag not in candidates:
+            candidates[tag] = element
+        if "role=main" not in candidates and element.get("role") == "main":
+            candidates["role=main"] = element
+        if ".content" not in candidates and "content" in _classes(element):
+            candidates[".content"] = element
+        if "#content" not in candidates and element.get("id") == "content":
+            candidates["#content"] = element
+        if element.get("itemscope") is not None and len(microdata) < MAX_MICRODATA:
+            microdata.append(element)
+
+        # 逆序入栈，保持文档顺序
+        stack.extend(reversed(element))
+
+    # 遍历结束后无关子树已剪掉，再读取各元素的文本
+    if not title and page_title is not None:
+        result["title"] = clean_text(_text(page_title))
+    result["meta_description"] = meta_name if meta_name is not None else (meta_og or "")
+    main = _main_element(root, candidates, text_blocks)
+    result["main_text"] = clean_text(_text(main))
+    result["main_html"] = _main_html(main, MAX_MAIN_HTML)
+    result["structured_data"] = [{"type": "json-ld", "data": data} for data in json_ld] + [
+        {"type": "microdata", "properties": {
+            prop.get("itemprop"): clean_text(_text(prop)) for prop in item.iterdescendants() if prop.get("itemprop") is not None
+        }}
+        for item in microdata
+    ]
+    result["headings_outline"] = sorted(
+        ({"level": _HEADINGS[h.tag.lower()], "text": clean_text(_text(h)), "id": h.get("id", "")} for h in headings),
+        key=lambda item: item["level"]
+    )
+    result["links"] = _links(anchors, url)
+    result["images"] = _images(images, url)
+    result["tables"] = [_table(i, table) for i, table in enumerate(tables[:MAX_TABLES])]
+    result["lists"] = _lists(lists)
+    result["interactive_elements"] = (_forms(forms) + [
+        {"tag": btn.tag.lower(), "text": clean_text(_text(btn)), "classes": _classes(btn)} for btn in buttons
+    ])[:MAX_INTERACTIVE]
+    result["semantic_html5_tags"] = {
+        tag: " ".join(clean_text(_text(el))[:500] for el in elements)[:1000]
+        for tag, elements in semantic.items() if elements
+    }
+    result["code_blocks"] = _code_blocks(pres, codes)
+    return result
+
+
+def _main_element(root, candidates: Dict[str, Any], text_blocks: Dict[Any, float]):
+    for key in ("article", "main", "role=main", ".content", "#content"):
+        if key in candidates:
+            return candidates[key]
+
+    # 没有语义化容器时，在段落容器中选得分最高的
+    best = _best_text_block(root, text_blocks)
+    return best if best is not None else root
+
+
+def _main_html(element, limit: int) -> str:
+    """
+    序列化正文元素，超过 limit 个字符时按子元素截断（不切断标签），
+    单个子元素过大时进入其内部继续截断
+    """
+    if element.tag == "html":
+        body = next(element.iter("body"), None)
+        element = body if body is not None else element
+    parts: List[str] = []
+    remaining = limit
+
+    def collect(node):
+        nonlocal remaining
+        if node.text:
+            parts.append(html_escape(node.text[:remaining], quote=False))
+            remaining -= len(node.text)
+        for child in node:
+            if remaining <= 0:
+                return
+            chunk = etree.tostring(child, encoding="unicode", method="html", with_tail=False)
+            if len(chunk) <= remaining:
+                parts.append(chunk)
+                remaining -= len(chunk)
+            elif len(child):
+                tag = child.tag if isinstance(child.tag, str) else "div"
+                parts.append(f"<{tag}>")
+                collect(child)
+                parts.append(f"</{tag}>")
+                return
+            else:
+                return
+            if child.tail and remaining > 0:
+                parts.append(html_escape(child.tail[:remaining], quote=False))
+                remaining -= len(child.tail)
+
+    collect(element)
+    return "".join(parts)
+
+
+def _visible_len(text: Optional[str]) -> int:
+    """不含空白的字符数"""
+    if not text:
+        return 0
+    return sum(map(len, text.split()))
+
+
+def text_stats(root) -> Dict[Any, Tuple[int, int]]:
+    """
+    自底向上统计每个元素的文本长度和其中链接文本的长度（均不含空白）
+
+    先序遍历的逆序保证子元素先于父元素处理，每个元素的结果由子元素的结果累加，
+    整棵树只访问一次，不会像逐段调用 get_text() 那样重复读取同一段文本
+
+    Returns:
+        dict: 元素 -> (文本长度, 链接文本长度)
+    """
+    stats: Dict[Any, Tuple[int, int]] = {}
+    for element in reversed(list(root.iter())):
+        text_len = _visible_len(element.text) if isinstance(element.tag, str) else 0
+        link_len = 0
+        for child in element:
+            child_text, child_link = stats.get(child, (0, 0))
+            text_len += child_text + _visible_len(child.tail)
+            link_len += child_link
+        if element.tag == "a":
+            link_len = text_len
+        stats[element] = (text_len, link_len)
+    return stats
+
+
+def _best_text_block(root, text_blocks: Dict[Any, float]):
+    """
+    选出正文所在的段落容器
+
+    得分为非链接文本长度乘以非链接文本占比，再乘以容器的权重：既要正文长，也要链接少。
+    只比较占比时，一小段没有链接的侧栏会胜过带几个链接的长正文；
+    每段都很短的页面（如论坛回帖）由祖父元素汇总
+
+    Args:
+        root: 文档根元素
+        text_blocks: 候选容器 -> 权重
+
+    Returns:
+        得分最高的容器，没有足够长的容器时返回 None
+    """
+    if not text_blocks:
+        return None
+    stats = text_stats(root)
+    best, best_score = None, 0.0
+    for block, weight in text_blocks.items():
+        text_len, link_len = stats.get(block, (0, 0))
+        if text_len <= MIN_BLOCK_CHARS:
+            continue
+        plain = text_len - link_len
+        score = plain * plain / text_len * weight
+        if score > best_score:
+            best, best_score = block, score
+    return best
+
+
+def _links(anchors: list, base_url: str) -> List[Dict]:
+    links = []
+    seen = set()
+    base_host = urlsplit(base_url).netloc.lower()
+    for a in anchors:
+        href = a.get("href")
+        full_url = urljoin(base_url, href)
+        if full_url in seen:
+            continue
+        seen.add(full_url)
+        links.append({
+            "url": full_url,
+            "text": clean_text(_text(a)),
+            "title": a.get("title", ""),
+            "is_external": urlsplit(full_url).netloc.lower() != base_host,
+            "type": classify_link(href)
+        })
+        if len(links) >= MAX_LINKS:
+            break
+    return links
+
+
+def _images(images: list, base_url: str) -> List[Dict]:
+    result = []
+    for img in images:
+        # 懒加载图片的 src 常为空或占位，真实地址在 data-src
+        src = img.get("src") or img.get("data-src", "")
+        if not src:
+            continue
+        result.append({
+            "url": urljoin(base_url, src),
+            "alt": img.get("alt", ""),
+            "title": img.get("title", ""),
+            "width": img.get("width", ""),
+            "height": img.get("height", ""),
+            "is_lazy": "lazy" in img.get("loading", "")
+        })
+        if len(result) >= MAX_IMAGES:
+            break
+    return result
+
+
+def _table(index: int, table) -> Dict:
+    headers = []
+    thead = next(table.iter("thead"), None)
+    if thead is not None:
+        headers = [_text(cell).strip() for cell in thead.iter("th", "td")]
+    rows = []
+    for tr in table.iter("tr"):
+        row = [_text(cell).strip() for cell in tr.iter("td", "th")]
+        if row:
+            rows.append(row)
+    return {"index": index, "headers": headers, "rows": rows[:MAX_TABLE_ROWS], "row_count": len(rows)}
+
+
+def _lists(lists: list) -> List[Dict]:
+    result = []
+    for lst in lists:
+        items = [clean_text(_text(li)) for li in lst if isinstance(li.tag, str) and li.tag.lower() == "li"]
+        if len(items) > 1:
+            result.append({"type": lst.tag.lower(), "items": items[:MAX_LIST_ITEMS], "item_count": len(items)})
+            if len(result) >= MAX_LISTS:
+                break
+    return result
+
+
+def _forms(forms: list) -> List[Dict]:
+    result = []
+    for form in forms:
+        inputs = [{
+            "type": field.get("type", field.tag.lower()),
+            "name": field.get("name", ""),
+            "placeholder": field.get("placeholder", ""),
+            "required": field.get("required") is not None
+        } for field in form.iter(*_FORM_FIELDS)]
+        result.append({
+            "tag": "form",
+            "action": form.get("action", ""),
+            "method": form.get("method", "get"),
+            "inputs": inputs
+        })
+    return result
+
+
+def _code_blocks(pres: list, codes: list) -> List[str]:
+    blocks = []
+    for pre in pres:
+        code = next(pre.iter("code"), None)
+        text = _text(code if code is not None else pre)
+        if len(text.strip()) > 20:
+            blocks.append(text[:2000])
+    for code in codes:
+        text = _text(code)
+        if len(text.strip()) > 30 and text not in blocks:
+            blocks.append(text[:1000])
+    return blocks[:MAX_CODE_BLOCKS]
+
+
+# ==================== 进程池 ====================
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_pool_workers: Optional[int] = None
+
+
+def configure_pool(workers: Optional[int]):
+    """
+    设置解析进程数，0 表示在线程中解析（不使用进程池），None 表示读取配置
+    默认读取 config.yaml 中的 html_extract.processes，在第一次解析之前调用才生效
+    """
+    global _pool_workers
+    _pool_workers = workers
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool, _pool_workers
+    if _pool_workers is None:
+        # 只在主进程中读取配置，工作进程不导入项目模块
+        from config.config import load_config, HTMLExtractConfig
+        try:
+            _pool_workers = load_config().html_extract.processes
+        except Exception:
+            _pool_workers = HTMLExtractConfig().processes
+    if _pool is None and _pool_workers > 0:
+        with _pool_lock:
+            if _pool is None:
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                _pool = ProcessPoolExecutor(max_workers=_pool_workers,
+                                            mp_context=multiprocessing.get_context(method))
+    return _pool
+
+
+def shutdown_pool():
+    """关闭解析进程池"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def extract_html(html: str, url: str, title: str = "") -> Dict[str, Any]:
+    """
+    在进程池中执行 extract_content，不阻塞事件循环
+    进程池不可用（如工作进程被杀死）时重建一次，仍然失败则退回线程中解析
+
+    Returns:
+        dict: ExtractedContent 的各个字段（不含 raw_html）
+    """
+    loop = asyncio.get_running_loop()
+    for _ in range(2):
+        pool = _get_pool()
+        if pool is None:
+            break
+        try:
+            return await loop.run_in_executor(pool, extract_content, html, url, title)
+        except BrokenProcessPool:
+            shutdown_pool()
+    return await asyncio.to_thread(extract_content, html, url, title)
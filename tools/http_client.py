@@ -0,0 +1,171 @@
+"""
+共享的出站 HTTP 客户端
+每次请求都新建 httpx.AsyncClient 时，DNS 解析、TCP 和 TLS 握手都要重来一遍。
+这里为每个事件循环保留一个长连接的 AsyncClient（连接池、keep-alive，安装了 h2 时启用 HTTP/2），
+并统一超时和临时错误的重试策略。
+
+httpx 的连接绑定创建它的事件循环，主智能体和子智能体各自在独立的事件循环中运行，
+所以客户端按事件循环区分；事件循环结束前调用 close_http_client() 关闭当前循环的客户端。
+"""
+
+import asyncio
+import email.utils
+import threading
+import time
+import weakref
+from typing import Any, Optional
+
+import httpx
+
+
+# 可以重试的状态码：限流和网关/服务暂时不可用
+RETRY_STATUS = frozenset({429, 502, 503, 504})
+# 可以重试的传输错误：连接失败、超时、连接被对端关闭
+RETRY_ERRORS = (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)
+# Retry-After 最多等待的时间（秒）
+MAX_RETRY_AFTER = 10.0
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+_http_config = None
+
+
+def get_http_config():
+    """
+    读取 config.yaml 中的 http 配置，只读取一次，配置文件不可用时使用默认值
+
+    Returns:
+        HTTPClientConfig: 出站 HTTP 配置
+    """
+    global _http_config
+    if _http_config is None:
+        from config.config import load_config, HTTPClientConfig
+        try:
+            _http_config = load_config().http
+        except Exception:
+            _http_config = HTTPClientConfig()
+    return _http_config
+
+
+def http2_available() -> bool:
+    """是否安装了 HTTP/2 依赖 h2"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def create_http_client(config=None, **kwargs) -> httpx.AsyncClient:
+    """
+    按配置创建带连接池的 AsyncClient
+
+    Args:
+        config: HTTPClientConfig，默认读取 config.yaml 中的 http 配置
+        **kwargs: 传给 httpx.AsyncClient 的其他参数
+
+    Returns:
+        httpx.AsyncClient: 新的客户端
+    """
+    config = config or get_http_config()
+    timeout = httpx.Timeout(config.timeout, connect=config.connect_timeout)
+    limits = httpx.Limits(
+        max_connections=config.max_connections,
+        max_keepalive_connections=config.max_keepalive,
+        keepalive_expiry=config.keepalive_expiry
+    )
+    return httpx.AsyncClient(
+        timeout=timeout,
+        limits=limits,
+        http2=config.http2 and http2_available(),
+        **kwargs
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    获取当前事件循环共享的 HTTP 客户端，不存在或已关闭时创建
+
+    Returns:
+        httpx.AsyncClient: 当前事件循环的客户端
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        with _clients_lock:
+            client = _clients.get(loop)
+            if client is None or client.is_closed:
+                client = create_http_client()
+                _clients[loop] = client
+    return client
+
+
+async def close_http_client():
+    """关闭当前事件循环的 HTTP 客户端，在事件循环结束前调用"""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client = _clients.pop(loop, None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """解析 Retry-After 响应头（秒数或 HTTP 日期）"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+async def request(method: str,
+                  url: str,
+                  retries: Optional[int] = None,
+                  backoff: Optional[float] = None,
+                  client: Optional[httpx.AsyncClient] = None,
+                  **kwargs: Any) -> httpx.Response:
+    """
+    用共享客户端发送请求，临时错误按指数退避重试
+
+    Args:
+        method: 请求方法
+        url: 请求地址
+        retries: 重试次数，默认使用配置
+        backoff: 首次重试前的等待时间（秒），之后每次翻倍，默认使用配置
+        client: 使用的客户端，默认为当前事件循环的共享客户端
+        **kwargs: 传给 httpx.AsyncClient.request 的参数（headers、json、params、timeout 等）
+
+    Returns:
+        httpx.Response: 响应（重试用尽后返回最后一次的响应，由调用方检查状态码）
+
+    Raises:
+        httpx.TransportError: 重试用尽后仍然连接失败或超时
+    """
+    if retries is None or backoff is None:
+        config = get_http_config()
+        retries = config.retries if retries is None else retries
+        backoff = config.backoff if backoff is None else backoff
+    client = client or get_http_client()
+
+    attempt = 0
+    while True:
+        try:
+            response = await client.request(method, url, **kwargs)
+        except RETRY_ERRORS:
+            if attempt >= retries:
+                raise
+            delay = backoff * (2 ** attempt)
+        else:
+            if response.status_code not in RETRY_STATUS or attempt >= retries:
+                return response
+            retry_after = _retry_after(response)
+            delay = backoff * (2 ** attempt) if retry_after is None else retry_after
+            await response.aclose()
+        attempt += 1
+        await asyncio.sleep(delay)
@@ -138,12 +138,19 @@ class MCPClientManager:
             cls._instance = cls()
         return cls._instance
     
-    async def start(self, servers_config: List[MCPServerConfig]) -> int:
-        """启动 MCP 客户端"""
+    async def start(self, servers_config: List[MCPServerConfig], verbose: bool = True) -> int:
+        """
+        启动 MCP 客户端
+
+        Args:
+            servers_config: MCP Server 配置列表
+            verbose: 是否打印连接进度（后台预热时关闭，避免打乱输入提示）
+        """
         if not servers_config:
             return 0
             
-        print("\n[MCP] 正在初始化 MCP Servers...")
+        log = print if verbose else (lambda *args, **kwargs: None)
+        log("\n[MCP] 正在初始化 MCP Servers...")
         
         async def _run_all():
             async with anyio.create_task_group() as tg:
@@ -152,7 +159,7 @@ class MCPClientManager:
                 
                 for server_config in servers_config:
                     if server_config.name in self._blocked_servers:
-                        print(f"  ⊘ MCP Server [{server_config.name}] 已被安全策略屏蔽，跳过")
+                        log(f"  ⊘ MCP Server [{server_config.name}] 已被安全策略屏蔽，跳过")
                         continue
 
                     conn = MCPServerConnection(server_config)
@@ -181,14 +188,14 @@ class MCPClientManager:
                         self._tool_to_server[tool.name] = server_name
                 active_tools = len([t for t in conn.tools if t.name not in self._blocked_tools])
                 total_tools += active_tools
-                print(f"  ✓ MCP Server [{server_name}] 已连接，发现 {active_tools} 个工具")
+                log(f"  ✓ MCP Server [{server_name}] 已连接，发现 {active_tools} 个工具")
             elif conn._error:
-                print(f"  ✗ MCP Server [{server_name}] 连接失败: {conn._error}")
+                log(f"  ✗ MCP Server [{server_name}] 连接失败: {conn._error}")
             else:
-                print(f"  ✗ MCP Server [{server_name}] 连接超时")
+                log(f"  ✗ MCP Server [{server_name}] 连接超时")
 
         self._initialized = True
-        print(f"[MCP] 初始化完成，共 {total_tools} 个 MCP 工具可用\n")
+        log(f"[MCP] 初始化完成，共 {total_tools} 个 MCP 工具可用\n")
         return total_tools
     
     async def stop(self):
@@ -309,8 +316,8 @@ class MCPClient:
     def initialized(self) -> bool:
         return self._manager.initialized
 
-    async def connect_all(self, servers_config: List[MCPServerConfig]) -> int:
-        return await self._manager.start(servers_config)
+    async def connect_all(self, servers_config: List[MCPServerConfig], verbose: bool = True) -> int:
+        return await self._manager.start(servers_config, verbose=verbose)
 
     def get_tools_definition(self) -> list:
         return self._manager.get_tools_definition()
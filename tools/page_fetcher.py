@@ -0,0 +1,160 @@
+"""
+静态网页快速抓取
+大多数要读取的网页（新闻、文档、博客）是服务端渲染的，用浏览器渲染要等待数秒。
+SmartWebExtractor 先用共享的 HTTP 客户端直接下载（连接池、gzip/br 压缩），解析后检查是否只是
+需要 JavaScript 才能显示内容的空壳页面，只有下载失败或判断为空壳时才交给浏览器渲染。
+
+空壳页面的判断：
+- 正文过短（少于 min_text_chars 个字符）
+- 正文在 HTML 中的占比极低（大量脚本、少量文字）
+- 有空的应用挂载点（<div id="root"></div> 等）且正文占比偏低
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+from tools.http_client import get_http_client
+
+
+# 与浏览器渲染使用相同的 User-Agent，避免网站对两种方式返回不同的内容
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+
+# 正文字符数与 HTML 长度之比低于该值时视为空壳
+MIN_TEXT_RATIO = 0.01
+# 有空挂载点时，正文占比低于该值视为空壳
+MOUNT_TEXT_RATIO = 0.05
+
+_EMPTY_MOUNT = re.compile(
+    r"<div[^>]*\bid=[\"']?(?:root|app|__next|__nuxt|q-app)[\"']?[^>]*>\s*</div>", re.I
+)
+_NOSCRIPT_JS = re.compile(r"<noscript\b[^>]*>(?:(?!</noscript>).){0,500}?javascript", re.I | re.S)
+_META_CHARSET = re.compile(rb"<meta[^>]+charset=[\"']?([\w-]+)", re.I)
+
+
+@dataclass
+class StaticPage:
+    """直接下载的网页"""
+    url: str                      # 请求的地址
+    final_url: str                # 重定向后的地址
+    html: str
+    status: int = 200
+    etag: str = ""
+    last_modified: str = ""
+
+
+def _decode(content: bytes, header_charset: Optional[str]) -> str:
+    """按响应头、<meta charset> 的顺序确定编码，都没有时按 UTF-8 解码"""
+    charset = header_charset
+    if not charset:
+        match = _META_CHARSET.search(content[:4096])
+        if match:
+            charset = match.group(1).decode("ascii", "ignore")
+    try:
+        return content.decode(charset or "utf-8", errors="replace")
+    except LookupError:
+        return content.decode("utf-8", errors="replace")
+
+
+async def fetch_static(url: str,
+                       timeout: float = 10.0,
+                       max_bytes: int = 5 * 1024 * 1024,
+                       headers: Optional[dict] = None) -> StaticPage:
+    """
+    不经过浏览器直接下载网页
+
+    Args:
+        url: 网页地址
+        timeout: 超时（秒）
+        max_bytes: 网页最大字节数，超过时放弃
+        headers: 额外的请求头（如条件请求的 If-None-Match、If-Modified-Since）
+
+    Returns:
+        StaticPage: 下载的网页；条件请求命中时 status 为 304，html 为空
+
+    Raises:
+        RuntimeError: 状态码不是 200、不是 HTML 或网页过大
+        httpx.HTTPError: 连接失败或超时
+    """
+    request_headers = {
+        "User-Agent": USER_AGENT,
+        "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+    }
+    request_headers.update(headers or {})
+    # 快速路径不重试，失败直接交给浏览器；流式读取，超过 max_bytes 时立即停止下载
+    async with get_http_client().stream("GET", url, headers=request_headers,
+                                        timeout=timeout, follow_redirects=True) as response:
+        etag = response.headers.get("etag", "")
+        last_modified = response.headers.get("last-modified", "")
+        if response.status_code == 304:
+            return StaticPage(url=url, final_url=str(response.url), html="", status=304,
+                              etag=etag, last_modified=last_modified)
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}")
+        content_type = response.headers.get("content-type", "").lower()
+        if content_type and not content_type.startswith(HTML_TYPES):
+            raise RuntimeError(f"不是 HTML: {content_type}")
+        length = response.headers.get("content-length", "")
+        if length.isdigit() and int(length) > max_bytes:
+            raise RuntimeError(f"网页过大: {length} 字节")
+        chunks = []
+        size = 0
+        async for chunk in response.aiter_bytes():
+            size += len(chunk)
+            if size > max_bytes:
+                raise RuntimeError(f"网页过大: 超过 {max_bytes} 字节")
+            chunks.append(chunk)
+        content = b"".join(chunks)
+    return StaticPage(
+        url=url,
+        final_url=str(response.url),
+        html=_decode(content, response.charset_encoding),
+        status=response.status_code,
+        etag=etag,
+        last_modified=last_modified
+    )
+
+
+def conditional_headers(etag: str = "", last_modified: str = "") -> dict:
+    """
+    生成条件请求头
+
+    Returns:
+        dict: If-None-Match / If-Modified-Since
+    """
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    return headers
+
+
+def js_shell_reason(html: str, main_text: str, min_text_chars: int = 200) -> Optional[str]:
+    """
+    判断直接下载的网页是否需要浏览器渲染
+
+    Args:
+        html: 网页 HTML
+        main_text: 从 HTML 中提取的正文
+        min_text_chars: 正文至少包含的字符数
+
+    Returns:
+        Optional[str]: 需要浏览器渲染的原因，内容完整时返回 None
+    """
+    text_len = len(main_text)
+    if text_len < min_text_chars:
+        if _NOSCRIPT_JS.search(html):
+            return "正文过短，页面提示需要启用 JavaScript"
+        return f"正文过短（{text_len} 字符）"
+    ratio = text_len / max(len(html), 1)
+    if ratio < MIN_TEXT_RATIO:
+        return f"正文占比过低（{ratio:.1%}）"
+    if ratio < MOUNT_TEXT_RATIO and _EMPTY_MOUNT.search(html):
+        return "应用挂载点为空，内容由 JavaScript 渲染"
+    return None
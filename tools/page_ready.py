@@ -0,0 +1,217 @@
+"""
+页面就绪检测
+打开网页、点击、提交和滚动后原来都固定等待（每次滚动 0.3 秒、回到顶部 0.5 秒、点击后 1 秒、提交后 2 秒），
+而打开网页时等待 Playwright 的 networkidle 在有长连接或统计脚本的网站上要等到超时。这里改为检测页面何时稳定：
+- DOM 静止：页面内的 MutationObserver 在 quiet 秒内没有观察到节点或文本变化
+- 网络空闲：监听页面的请求事件，没有进行中的请求且 quiet 秒内没有新请求（不计 WebSocket、EventSource）
+- 滚动高度稳定：scrollHeight 在 quiet 秒内没有变化
+每种等待都有上限（cap），到达上限时不再等待，按当前页面继续。
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+
+
+# 长连接不会结束，不参与网络空闲的判断
+LONG_LIVED_TYPES = ("websocket", "eventsource")
+
+# DOM 在 quiet 毫秒内没有变化时返回，最多等待 cap 毫秒
+_DOM_QUIET_JS = """
+({quiet, cap}) => new Promise(resolve => {
+    const start = performance.now();
+    let last = start, mutations = 0;
+    const observer = new MutationObserver(records => {
+        mutations += records.length;
+        last = performance.now();
+    });
+    observer.observe(document.documentElement || document, {childList: true, subtree: true, characterData: true});
+    const check = () => {
+        const now = performance.now();
+        if (now - last >= quiet || now - start >= cap) {
+            observer.disconnect();
+            resolve({settled: now - last >= quiet, elapsed: now - start, mutations});
+        } else {
+            setTimeout(check, Math.max(Math.min(quiet - (now - last), cap - (now - start)), 10));
+        }
+    };
+    setTimeout(check, quiet);
+})
+"""
+
+# scrollHeight 在 quiet 毫秒内没有变化时返回高度，最多等待 cap 毫秒
+_HEIGHT_STABLE_JS = """
+({quiet, cap}) => new Promise(resolve => {
+    const height = () => Math.max(document.body ? document.body.scrollHeight : 0,
+                                  document.documentElement ? document.documentElement.scrollHeight : 0);
+    const start = performance.now();
+    let last = height(), changed = start;
+    const timer = setInterval(() => {
+        const now = performance.now(), current = height();
+        if (current !== last) {
+            last = current;
+            changed = now;
+        }
+        if (now - changed >= quiet || now - start >= cap) {
+            clearInterval(timer);
+            resolve({height: current, settled: now - changed >= quiet, elapsed: now - start});
+        }
+    }, 50);
+})
+"""
+
+# 滚动到指定位置（relative 时相对当前位置滚动），等两帧让懒加载的 IntersectionObserver 触发，返回当前高度
+_SCROLL_STEP_JS = """
+({y, relative}) => new Promise(resolve => {
+    if (relative) {
+        window.scrollBy(0, y);
+    } else {
+        window.scrollTo(0, y);
+    }
+    requestAnimationFrame(() => requestAnimationFrame(() => resolve(
+        Math.max(document.body ? document.body.scrollHeight : 0,
+                 document.documentElement ? document.documentElement.scrollHeight : 0))));
+})
+"""
+
+
+class NetworkTracker:
+    """
+    记录页面进行中的请求，在操作之前创建，操作后用 wait_idle 等待网络空闲
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.pending = set()
+        self.last_activity = time.monotonic()
+        self._handlers = {
+            "request": self._on_request,
+            "requestfinished": self._on_done,
+            "requestfailed": self._on_done,
+        }
+        for event, handler in self._handlers.items():
+            page.on(event, handler)
+
+    def _on_request(self, request):
+        if request.resource_type not in LONG_LIVED_TYPES:
+            self.pending.add(request)
+        self.last_activity = time.monotonic()
+
+    def _on_done(self, request):
+        self.pending.discard(request)
+        self.last_activity = time.monotonic()
+
+    def detach(self):
+        """移除事件监听（页面池中的页面会被复用）"""
+        for event, handler in self._handlers.items():
+            try:
+                self.page.remove_listener(event, handler)
+            except Exception:
+                pass
+
+    async def wait_idle(self, quiet: float, cap: float) -> bool:
+        """
+        等待没有进行中的请求，且 quiet 秒内没有新请求
+
+        Returns:
+            bool: 是否在上限内达到空闲
+        """
+        deadline = time.monotonic() + cap
+        while True:
+            now = time.monotonic()
+            if not self.pending and now - self.last_activity >= quiet:
+                return True
+            if now >= deadline:
+                return False
+            wait = quiet - (now - self.last_activity) if not self.pending else 0.05
+            await asyncio.sleep(min(max(wait, 0.01), deadline - now))
+
+
+async def _dom_quiet(page, quiet: float, cap: float) -> bool:
+    """等待 DOM 静止；操作引起跳转时执行上下文会被销毁，等新文档加载后再检测一次"""
+    deadline = time.monotonic() + cap
+    for attempt in range(2):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        try:
+            result = await page.evaluate(_DOM_QUIET_JS, {"quiet": quiet * 1000, "cap": remaining * 1000})
+            return bool(result and result.get("settled"))
+        except Exception:
+            if attempt:
+                return False
+            try:
+                await page.wait_for_load_state("domcontentloaded", timeout=max(remaining, 0.1) * 1000)
+            except Exception:
+                return False
+    return False
+
+
+async def wait_until_settled(page,
+                             quiet: float = 0.3,
+                             cap: float = 3.0,
+                             tracker: Optional[NetworkTracker] = None) -> Dict[str, Any]:
+    """
+    等待页面稳定：DOM 静止，提供 tracker 时同时等待网络空闲
+
+    Args:
+        page: playwright.async_api.Page
+        quiet: 没有变化多长时间视为稳定（秒）
+        cap: 最多等待的时间（秒）
+        tracker: 操作前创建的网络请求记录
+
+    Returns:
+        dict: settled（是否在上限内稳定）、elapsed（等待秒数）
+    """
+    start = time.monotonic()
+    waits = [_dom_quiet(page, quiet, cap)]
+    if tracker is not None:
+        waits.append(tracker.wait_idle(quiet, cap))
+    try:
+        results = await asyncio.wait_for(asyncio.gather(*waits), cap + 1)
+        settled = all(results)
+    except asyncio.TimeoutError:
+        settled = False
+    return {"settled": settled, "elapsed": time.monotonic() - start}
+
+
+@asynccontextmanager
+async def settle_after(page, quiet: float = 0.3, cap: float = 3.0):
+    """
+    在 with 块中执行操作（点击、提交、打开网页），退出时等待页面稳定
+
+    用法:
+        async with settle_after(page, cap=2.0):
+            await page.click(selector)
+    """
+    tracker = NetworkTracker(page)
+    try:
+        yield tracker
+        await wait_until_settled(page, quiet, cap, tracker)
+    finally:
+        tracker.detach()
+
+
+async def wait_for_stable_height(page, quiet: float = 0.25, cap: float = 1.5) -> int:
+    """
+    等待滚动高度稳定（懒加载和无限滚动的内容加载完成）
+
+    Returns:
+        int: 稳定后（或到达上限时）的 scrollHeight
+    """
+    try:
+        result = await page.evaluate(_HEIGHT_STABLE_JS, {"quiet": quiet * 1000, "cap": cap * 1000})
+        return int(result["height"])
+    except Exception:
+        return 0
+
+
+async def scroll_step(page, y: int, relative: bool = False) -> int:
+    """
+    滚动到 y（relative 时向下滚动 y 像素），等待两帧后返回当前 scrollHeight
+
+    Returns:
+        int: 当前 scrollHeight
+    """
+    return int(await page.evaluate(_SCROLL_STEP_JS, {"y": y, "relative": relative}) or 0)
@@ -0,0 +1,199 @@
+"""
+按 token 预算渲染网页提取结果
+ExtractedContent.to_json() 包含全部链接、图片和原始 HTML，一个网页就可能占掉半个上下文窗口。
+这里把提取结果渲染为紧凑的 Markdown，总长度不超过 token 预算：
+- 标题、地址和描述
+- 正文：正文元素的 HTML 转为 Markdown（去掉图片、链接只保留文字，表格单独列出）
+- 标题层级
+- 表格：CSV 格式
+- 链接：按与任务的相关度排序，只列出前 N 个
+原始 HTML 默认不输出。正文之外的各部分有各自的份额，剩下的预算都给正文。
+"""
+
+import csv
+import io
+import re
+from typing import Dict, List
+from urllib.parse import unquote, urlsplit
+
+import lxml.html
+from lxml import etree
+from markdownify import markdownify
+
+from tools.token_count import count_tokens, truncate_to_tokens
+
+
+# 正文之外各部分最多占用的预算比例
+OUTLINE_SHARE = 0.1
+TABLES_SHARE = 0.2
+LINKS_SHARE = 0.15
+MAX_TABLE_ROWS = 10
+
+_WORD = re.compile(r"[a-z0-9]+")
+_CJK = re.compile(r"[㐀-鿿豈-﫿]+")
+_BLANK_LINES = re.compile(r"\n\s*\n\s*\n+")
+
+
+def _terms(text: str) -> set:
+    """相关度比较用的词项：英文单词和数字，中文按相邻两字切分"""
+    text = text.lower()
+    terms = {word for word in _WORD.findall(text) if len(word) > 1}
+    for run in _CJK.findall(text):
+        if len(run) == 1:
+            terms.add(run)
+        terms.update(run[i:i + 2] for i in range(len(run) - 1))
+    return terms
+
+
+def rank_links(links: List[Dict], query: str = "", limit: int = 15) -> List[Dict]:
+    """
+    按与任务的相关度排序链接
+
+    Args:
+        links: ExtractedContent.links
+        query: 任务或问题，为空时保持页面中的顺序
+        limit: 最多返回的链接数
+
+    Returns:
+        List[Dict]: 排序后的链接，跳过页内锚点、邮件和没有文字的链接
+    """
+    candidates = [link for link in links
+                  if link.get("type") not in ("anchor", "email") and (link.get("text") or link.get("title"))]
+    query_terms = _terms(query) if query else set()
+    if query_terms:
+        def score(link: Dict) -> float:
+            path = unquote(urlsplit(link["url"]).path)
+            terms = _terms(f"{link.get('text', '')} {link.get('title', '')} {path}")
+            return len(query_terms & terms) / len(query_terms)
+        # sorted 是稳定的，得分相同的保持页面中的顺序
+        candidates = sorted(candidates, key=lambda link: -score(link))
+    return candidates[:limit]
+
+
+def table_to_csv(table: Dict, max_rows: int = MAX_TABLE_ROWS) -> str:
+    """
+    把 ExtractedContent.tables 中的表格转为 CSV
+
+    Args:
+        table: 表格（headers、rows）
+        max_rows: 最多输出的数据行数
+
+    Returns:
+        str: CSV 文本
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    headers = table.get("headers") or []
+    rows = [row for row in table.get("rows") or [] if row != headers]
+    if headers:
+        writer.writerow(headers)
+    writer.writerows(rows[:max_rows])
+    return buffer.getvalue().rstrip("\n")
+
+
+def html_to_markdown(html: str) -> str:
+    """
+    把正文 HTML 转为 Markdown：去掉图片和表格（表格单独以 CSV 列出），链接只保留文字
+
+    Args:
+        html: 正文元素的 HTML
+
+    Returns:
+        str: Markdown 文本
+    """
+    if not html.strip():
+        return ""
+    try:
+        root = lxml.html.fragment_fromstring(html, create_parent="div")
+    except (etree.ParserError, ValueError):
+        return ""
+    for element in list(root.iter("img", "table", "picture", "video")):
+        element.drop_tree()
+    cleaned = etree.tostring(root, encoding="unicode", method="html")
+    markdown = markdownify(cleaned, heading_style="ATX", bullets="-", strip=["a"])
+    return _BLANK_LINES.sub("\n\n", markdown).strip()
+
+
+def _outline(headings: List[Dict]) -> str:
+    return "\n".join(f"{'  ' * (h['level'] - 1)}- {h['text']}" for h in headings if h.get("text"))
+
+
+def _fit_lines(text: str, max_tokens: int) -> str:
+    """按整行截断到预算内"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    lines = []
+    used = 0
+    for line in text.split("\n"):
+        cost = count_tokens(line) + 1
+        if used + cost > max_tokens:
+            break
+        lines.append(line)
+        used += cost
+    return "\n".join(lines)
+
+
+def render_page(content,
+                max_tokens: int = 4000,
+                query: str = "",
+                max_links: int = 15,
+                include_raw_html: bool = False) -> str:
+    """
+    把提取结果渲染为不超过 token 预算的 Markdown
+
+    Args:
+        content: ExtractedContent
+        max_tokens: token 预算
+        query: 当前任务或问题，用于给链接排序
+        max_links: 最多列出的链接数
+        include_raw_html: 是否在剩余预算内附上原始 HTML
+
+    Returns:
+        str: Markdown 文本
+    """
+    header_lines = [f"# {content.title or content.url}", f"URL: {content.url}"]
+    if content.meta_description:
+        header_lines.append(f"描述: {content.meta_description}")
+    header = _fit_lines("\n".join(header_lines), max(max_tokens // 10, 1))
+
+    sections: Dict[str, str] = {}
+    outline = _outline(content.headings_outline)
+    if outline:
+        sections["outline"] = "## 标题结构\n" + _fit_lines(outline, int(max_tokens * OUTLINE_SHARE))
+
+    table_parts = []
+    table_budget = int(max_tokens * TABLES_SHARE)
+    for table in content.tables:
+        csv_text = table_to_csv(table)
+        if not csv_text:
+            continue
+        part = f"### 表格 {table['index'] + 1}（共 {table['row_count']} 行）\n```csv\n{csv_text}\n```"
+        cost = count_tokens(part)
+        if cost > table_budget:
+            break
+        table_parts.append(part)
+        table_budget -= cost
+    if table_parts:
+        sections["tables"] = "## 表格\n" + "\n".join(table_parts)
+
+    links = rank_links(content.links, query, max_links)
+    if links:
+        link_lines = "\n".join(f"- [{link.get('text') or link.get('title')}]({link['url']})" for link in links)
+        sections["links"] = "## 相关链接\n" + _fit_lines(link_lines, int(max_tokens * LINKS_SHARE))
+
+    # 剩下的预算给正文，分隔的空行按每段 2 个 token 预留
+    used = count_tokens(header) + sum(count_tokens(text) for text in sections.values()) + 2 * (len(sections) + 2)
+    body_budget = max(max_tokens - used, 0)
+    body = html_to_markdown(getattr(content, "main_html", "")) or content.main_text
+    full_tokens = count_tokens(body)
+    if full_tokens > body_budget:
+        note = f"\n\n…（正文已截断，共约 {full_tokens} tokens）"
+        body = truncate_to_tokens(body, max(body_budget - count_tokens(note), 0)).rstrip() + note
+    parts = [header, "## 正文\n" + body] + [sections[key] for key in ("outline", "tables", "links") if key in sections]
+    result = "\n\n".join(parts)
+
+    if include_raw_html and content.raw_html:
+        remaining = max_tokens - count_tokens(result) - 10
+        if remaining > 0:
+            result += "\n\n## 原始 HTML\n" + truncate_to_tokens(content.raw_html, remaining)
+    return truncate_to_tokens(result, max_tokens)
@@ -3,6 +3,7 @@
 功能：
 1. SmartWebExtractor - 智能网页内容提取器
 2. BrowserTools - 底层浏览器操作工具（导航、点击、表单）
+两者共用 tools.browser_pool 中的浏览器，不再各自启动 Chromium
 """
 
 import sys
@@ -11,20 +12,27 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import asyncio
 import json
-import re
 from dataclasses import dataclass, asdict
-from typing import List, Dict, Optional, Any
-from urllib.parse import urljoin, urlparse
-import hashlib
+from typing import AsyncIterator, Iterable, List, Dict, Optional, Any, Tuple, Union
 
-from playwright.async_api import async_playwright, Page, Browser, BrowserContext
-from bs4 import BeautifulSoup, Comment
+from playwright.async_api import Page, BrowserContext
 from config.config import load_config
+from tools.browser_pool import get_browser_pool
+from tools.extract_cache import ExtractCache, get_extract_cache
+from tools.html_extract import extract_html, html_hash
+from tools.page_fetcher import conditional_headers, fetch_static, js_shell_reason
+from tools.page_ready import scroll_step, settle_after, wait_for_stable_height
+from tools.page_render import render_page
+from tools.request_policy import RequestPolicy, install_policy, policy_from_config
 
 config = load_config()
 if config.browser.playwright_browsers_path:
     os.environ['PLAYWRIGHT_BROWSERS_PATH'] = config.browser.playwright_browsers_path
 
+# 提取时滚动加载懒加载内容：每步滚动的像素和最多滚动的步数
+SCROLL_STEP = 1000
+MAX_SCROLL_STEPS = 10
+
 
 @dataclass
 class ExtractedContent:
@@ -42,362 +50,221 @@ class ExtractedContent:
     semantic_html5_tags: Dict[str, str]
     code_blocks: List[str]
     raw_html_hash: str
+    main_html: str = ""             # 正文元素的 HTML（已清理），用于生成 Markdown
     raw_html: str = ""
+    fetch_method: str = "browser"   # static：直接下载；browser：浏览器渲染；cache：提取结果缓存
     
     def to_json(self) -> str:
         return json.dumps(asdict(self), ensure_ascii=False, indent=2)
+    
+    def to_markdown(self, max_tokens: int = 4000, query: str = "", max_links: int = 15,
+                    include_raw_html: bool = False) -> str:
+        """
+        渲染为不超过 token 预算的紧凑 Markdown（正文、标题层级、CSV 表格、按相关度排序的链接），
+        交给模型阅读时使用，默认不含原始 HTML
+        
+        Args:
+            max_tokens: token 预算
+            query: 当前任务或问题，用于给链接排序
+            max_links: 最多列出的链接数
+            include_raw_html: 是否在剩余预算内附上原始 HTML
+        """
+        return render_page(self, max_tokens=max_tokens, query=query, max_links=max_links,
+                           include_raw_html=include_raw_html)
 
 
 class SmartWebExtractor:
     """
     智能网页提取器
-    使用 Playwright 获取渲染后的内容，并提取语义化结构
+    先直接下载网页，下载失败或内容需要 JavaScript 渲染时再用 Playwright 获取渲染后的内容，并提取语义化结构
     """
     
     def __init__(self, 
                  headless: bool = True,
                  wait_for_network_idle: bool = True,
                  scroll_to_load: bool = True,
-                 timeout: int = 30000):
+                 timeout: int = 30000,
+                 static_first: Optional[bool] = None,
+                 use_cache: Optional[bool] = None,
+                 request_policy: Optional[RequestPolicy] = None):
+        """
+        Args:
+            headless: 是否无头模式
+            wait_for_network_idle: 浏览器渲染时是否等待网络空闲
+            scroll_to_load: 浏览器渲染时是否滚动页面加载懒加载内容
+            timeout: 浏览器加载页面的超时（毫秒）
+            static_first: 是否先尝试直接下载，默认使用 config.yaml 中的 page_fetch.static_first
+            use_cache: 是否使用提取结果缓存，默认使用 config.yaml 中的 extract_cache.enabled
+            request_policy: 浏览器渲染时的请求拦截策略，默认使用 config.yaml 中的 request_block.extract_types
+        """
         self.headless = headless
         self.wait_for_network_idle = wait_for_network_idle
         self.scroll_to_load = scroll_to_load
         self.timeout = timeout
+        self.fetch_config = config.page_fetch
+        self.static_first = self.fetch_config.static_first if static_first is None else static_first
+        use_cache = config.extract_cache.enabled if use_cache is None else use_cache
+        self.cache: Optional[ExtractCache] = get_extract_cache() if use_cache else None
+        self.request_policy = request_policy or policy_from_config("extract")
+        self.wait_config = config.page_wait
         self.user_agent = (
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
             "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
         )
     
     async def extract(self, url: str) -> ExtractedContent:
-        """主提取方法"""
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=self.headless)
-            context = await browser.new_context(
-                user_agent=self.user_agent,
-                viewport={"width": 1920, "height": 1080}
-            )
-            
-            await context.route("**/*.{png,jpg,jpeg,gif,svg,css,woff,woff2}", 
-                              lambda route: route.abort())
-            
-            page = await context.new_page()
-            
-            try:
-                await self._goto_page(page, url)
-                
-                if self.scroll_to_load:
-                    await self._scroll_page(page)
-                
-                html_content = await page.content()
-                page_title = await page.title()
-                
-                extracted = self._parse_html(
-                    html=html_content,
-                    url=url,
-                    title=page_title
-                )
-                
-                return extracted
-                
-            finally:
-                await browser.close()
+        """
+        主提取方法：先直接下载，失败或需要 JavaScript 时在浏览器池的页面中渲染，
+        HTML 在解析进程池中单遍提取，不阻塞事件循环
+        
+        提取结果按 URL 缓存：新鲜的记录直接返回（fetch_method 为 cache，raw_html 为空），
+        过期的记录用条件请求验证，网页未变化时沿用解析结果
+        """
+        entry = self.cache.get(url) if self.cache else None
+        if entry is not None and self.cache.is_fresh(entry):
+            return self._from_cache(url, entry)
+        if self.static_first:
+            content = await self._extract_static(url, entry)
+            if content is not None:
+                return content
+        html_content, page_title = await self._fetch(url)
+        if entry is not None and entry["hash"] == html_hash(html_content):
+            entry = self.cache.refresh(url, entry)
+            return self._from_cache(url, entry, html_content)
+        fields = await extract_html(html_content, url, page_title)
+        self._remember(url, fields, "browser")
+        return ExtractedContent(**fields, raw_html=html_content)
+    
+    async def _extract_static(self, url: str, entry: Optional[dict] = None) -> Optional[ExtractedContent]:
+        """直接下载并解析，下载失败或判断为需要 JavaScript 渲染的空壳页面时返回 None"""
+        headers = conditional_headers(entry["etag"], entry["last_modified"]) if entry else {}
+        try:
+            page = await fetch_static(url, timeout=self.fetch_config.static_timeout,
+                                      max_bytes=self.fetch_config.max_bytes, headers=headers)
+        except Exception:
+            return None
+        if page.status == 304:
+            if entry is None:
+                return None
+            entry = self.cache.refresh(url, entry, page.etag, page.last_modified)
+            return self._from_cache(url, entry)
+        if entry is not None and entry["hash"] == html_hash(page.html):
+            # 服务器不支持条件请求，但内容没有变化
+            entry = self.cache.refresh(url, entry, page.etag, page.last_modified)
+            return self._from_cache(url, entry, page.html)
+        fields = await extract_html(page.html, page.final_url, "")
+        if js_shell_reason(page.html, fields["main_text"], self.fetch_config.min_text_chars):
+            return None
+        fields["url"] = url
+        self._remember(url, fields, "static", page.etag, page.last_modified)
+        return ExtractedContent(**fields, raw_html=page.html, fetch_method="static")
+    
+    def _remember(self, url: str, fields: Dict[str, Any], fetch_method: str,
+                  etag: str = "", last_modified: str = ""):
+        if self.cache is not None:
+            self.cache.set(url, fields, fields["raw_html_hash"], fetch_method, etag, last_modified)
+    
+    @staticmethod
+    def _from_cache(url: str, entry: dict, raw_html: str = "") -> ExtractedContent:
+        fields = dict(entry["content"], url=url)
+        return ExtractedContent(**fields, raw_html=raw_html, fetch_method="cache")
+    
+    async def extract_many(self,
+                           urls: Iterable[str],
+                           concurrency: int = 4,
+                           timeout: Optional[float] = None) -> AsyncIterator[Tuple[str, Union[ExtractedContent, Exception]]]:
+        """
+        并发提取多个网页，按完成顺序逐个返回
+        
+        Args:
+            urls: 网址列表（重复的只提取一次）
+            concurrency: 同时打开的页面数
+            timeout: 单个网页的超时（秒，不含排队时间），默认为页面加载超时加 15 秒
+        
+        Yields:
+            (url, ExtractedContent 或异常)
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        timeout = timeout or self.timeout / 1000 + 15
+        
+        async def run(url: str):
+            async with semaphore:
+                try:
+                    return url, await asyncio.wait_for(self.extract(url), timeout)
+                except asyncio.TimeoutError:
+                    return url, TimeoutError(f"提取超时（{timeout:g} 秒）")
+                except Exception as e:
+                    return url, e
+        
+        tasks = [asyncio.ensure_future(run(url)) for url in dict.fromkeys(urls)]
+        try:
+            for future in asyncio.as_completed(tasks):
+                yield await future
+        finally:
+            # 调用方提前结束迭代时取消剩余的提取
+            for task in tasks:
+                task.cancel()
+    
+    async def _fetch(self, url: str) -> Tuple[str, str]:
+        """从浏览器池借用页面渲染网页，返回 (HTML, 标题)"""
+        pool = get_browser_pool(self.headless)
+        # 共享上下文按拦截策略区分，同一 key 的上下文使用相同的拦截规则
+        async with pool.page(f"extract:{self.request_policy.key}", setup=self._setup_context,
+                             user_agent=self.user_agent,
+                             viewport={"width": 1920, "height": 1080}) as page:
+            await self._goto_page(page, url)
+            
+            if self.scroll_to_load:
+                await self._scroll_page(page)
+            
+            return await page.content(), await page.title()
+    
+    async def _setup_context(self, context: BrowserContext):
+        """提取用的共享上下文按拦截策略拦截请求（默认不加载图片、媒体、字体、样式和跟踪脚本）"""
+        if self.request_policy.blocks_anything:
+            await install_policy(context, self.request_policy)
     
     async def _goto_page(self, page: Page, url: str):
         """安全访问页面"""
         try:
             if self.wait_for_network_idle:
-                await page.goto(url, wait_until="networkidle", timeout=self.timeout)
+                # 文档加载后等待 DOM 静止和网络空闲，不用 Playwright 的 networkidle（有长连接时要等到超时）
+                async with settle_after(page, self.wait_config.quiet, self.wait_config.load_cap):
+                    await page.goto(url, wait_until="domcontentloaded", timeout=self.timeout)
             else:
                 await page.goto(url, wait_until="domcontentloaded", timeout=self.timeout)
-            
-            await page.wait_for_load_state("load")
-            await asyncio.sleep(1)
+                await page.wait_for_load_state("load", timeout=self.timeout)
             
         except Exception as e:
             print(f"页面加载警告: {e}")
     
     async def _scroll_page(self, page: Page):
-        """滚动页面加载懒加载内容"""
+        """
+        滚动页面加载懒加载内容：逐屏滚动，每步只等两帧；到底后等待滚动高度稳定，
+        高度增长（加载了更多内容）时继续滚动；滚动和到底后的等待合计最多 MAX_SCROLL_STEPS 步，
+        每次增长不足一屏的页面（实时动态、计数器）也不会一直等待下去
+        """
+        wait = self.wait_config
         try:
             height = await page.evaluate("document.body.scrollHeight")
-            steps = min(height // 1000, 10)
-            for i in range(steps):
-                await page.evaluate(f"window.scrollTo(0, {(i + 1) * 1000})")
-                await asyncio.sleep(0.3)
+            position = 0
+            steps = 0
+            while steps < MAX_SCROLL_STEPS:
+                if position + SCROLL_STEP > height:
+                    settled_height = await wait_for_stable_height(page, wait.scroll_quiet, wait.scroll_cap)
+                    steps += 1
+                    if settled_height <= height:
+                        break
+                    height = settled_height
+                    continue
+                position += SCROLL_STEP
+                height = max(height, await scroll_step(page, position))
+                steps += 1
             
             await page.evaluate("window.scrollTo(0, 0)")
-            await asyncio.sleep(0.5)
             
         except Exception as e:
             print(f"滚动警告: {e}")
-    
-    def _parse_html(self, html: str, url: str, title: str) -> ExtractedContent:
-        """解析HTML内容"""
-        soup = BeautifulSoup(html, 'lxml')
-        self._clean_soup(soup)
-        raw_hash = hashlib.md5(html.encode()).hexdigest()
-        
-        return ExtractedContent(
-            url=url,
-            title=title,
-            meta_description=self._extract_meta(soup),
-            main_text=self._extract_main_text(soup),
-            structured_data=self._extract_structured_data(soup),
-            headings_outline=self._extract_headings(soup),
-            links=self._extract_links(soup, url),
-            images=self._extract_images(soup, url),
-            tables=self._extract_tables(soup),
-            lists=self._extract_lists(soup),
-            interactive_elements=self._extract_interactive(soup),
-            semantic_html5_tags=self._extract_semantic_tags(soup),
-            code_blocks=self._extract_code_blocks(soup),
-            raw_html_hash=raw_hash,
-            raw_html=html
-        )
-    
-    def _clean_soup(self, soup: BeautifulSoup):
-        """清理无关标签"""
-        for element in soup(["script", "style", "noscript", "iframe", "canvas", "svg"]):
-            element.decompose()
-        
-        for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
-            comment.extract()
-    
-    def _extract_meta(self, soup: BeautifulSoup) -> str:
-        """提取元描述"""
-        meta = soup.find("meta", attrs={"name": "description"}) or \
-               soup.find("meta", attrs={"property": "og:description"})
-        return meta.get("content", "") if meta else ""
-    
-    def _extract_main_text(self, soup: BeautifulSoup) -> str:
-        """智能提取正文内容"""
-        for selector in ["article", "main", '[role="main"]', ".content", "#content"]:
-            element = soup.select_one(selector)
-            if element:
-                return self._clean_text(element.get_text())
-        
-        paragraphs = soup.find_all("p")
-        best_text = ""
-        max_density = 0
-        
-        for p in paragraphs:
-            parent = p.parent
-            text = parent.get_text()
-            text_len = len(text.strip())
-            link_len = sum(len(a.get_text()) for a in parent.find_all("a"))
-            
-            if text_len > 0:
-                density = (text_len - link_len) / text_len
-                if text_len > 200 and density > max_density:
-                    max_density = density
-                    best_text = text
-        
-        return self._clean_text(best_text) if best_text else self._clean_text(soup.get_text())
-    
-    def _extract_structured_data(self, soup: BeautifulSoup) -> List[Dict]:
-        """提取 JSON-LD 等结构化数据"""
-        structured = []
-        
-        for script in soup.find_all("script", type="application/ld+json"):
-            try:
-                data = json.loads(script.string)
-                structured.append({"type": "json-ld", "data": data})
-            except:
-                pass
-        
-        microdata_items = soup.find_all(attrs={"itemscope": True})
-        for item in microdata_items[:5]:
-            item_data = {"type": "microdata", "properties": {}}
-            for prop in item.find_all(attrs={"itemprop": True}):
-                item_data["properties"][prop["itemprop"]] = prop.get_text(strip=True)
-            structured.append(item_data)
-        
-        return structured
-    
-    def _extract_headings(self, soup: BeautifulSoup) -> List[Dict]:
-        """提取标题层级结构"""
-        headings = []
-        for i in range(1, 7):
-            for h in soup.find_all(f"h{i}"):
-                headings.append({
-                    "level": i,
-                    "text": self._clean_text(h.get_text()),
-                    "id": h.get("id", "")
-                })
-        return headings
-    
-    def _extract_links(self, soup: BeautifulSoup, base_url: str) -> List[Dict]:
-        """提取链接信息"""
-        links = []
-        seen = set()
-        
-        for a in soup.find_all("a", href=True):
-            href = a["href"]
-            full_url = urljoin(base_url, href)
-            
-            if full_url in seen:
-                continue
-            seen.add(full_url)
-            
-            link_type = self._classify_link(href)
-            
-            links.append({
-                "url": full_url,
-                "text": self._clean_text(a.get_text()),
-                "title": a.get("title", ""),
-                "is_external": not full_url.startswith(base_url.split("/")[2]),
-                "type": link_type
-            })
-        
-        return links[:50]
-    
-    def _classify_link(self, href: str) -> str:
-        """分类链接类型"""
-        if href.startswith("#"):
-            return "anchor"
-        elif any(x in href.lower() for x in [".pdf", ".doc", ".zip"]):
-            return "document"
-        elif "mailto:" in href:
-            return "email"
-        elif re.search(r"/(tag|category|topic)/", href):
-            return "taxonomy"
-        else:
-            return "page"
-    
-    def _extract_images(self, soup: BeautifulSoup, base_url: str) -> List[Dict]:
-        """提取图片信息"""
-        images = []
-        
-        for img in soup.find_all("img"):
-            src = img.get("src", img.get("data-src", ""))
-            if not src:
-                continue
-            
-            images.append({
-                "url": urljoin(base_url, src),
-                "alt": img.get("alt", ""),
-                "title": img.get("title", ""),
-                "width": img.get("width", ""),
-                "height": img.get("height", ""),
-                "is_lazy": "lazy" in str(img.get("loading", ""))
-            })
-        
-        return images[:30]
-    
-    def _extract_tables(self, soup: BeautifulSoup) -> List[Dict]:
-        """提取表格数据"""
-        tables = []
-        
-        for i, table in enumerate(soup.find_all("table")):
-            rows = []
-            headers = []
-            
-            thead = table.find("thead")
-            if thead:
-                headers = [th.get_text(strip=True) for th in thead.find_all(["th", "td"])]
-            
-            for tr in table.find_all("tr"):
-                row_data = [td.get_text(strip=True) for td in tr.find_all(["td", "th"])]
-                if row_data:
-                    rows.append(row_data)
-            
-            tables.append({
-                "index": i,
-                "headers": headers,
-                "rows": rows[:20],
-                "row_count": len(rows)
-            })
-        
-        return tables[:5]
-    
-    def _extract_lists(self, soup: BeautifulSoup) -> List[Dict]:
-        """提取列表结构（ul/ol）"""
-        lists = []
-        
-        for i, lst in enumerate(soup.find_all(["ul", "ol"])):
-            items = [
-                self._clean_text(li.get_text()) 
-                for li in lst.find_all("li", recursive=False)
-            ]
-            
-            if items and len(items) > 1:
-                lists.append({
-                    "type": lst.name,
-                    "items": items[:15],
-                    "item_count": len(items)
-                })
-        
-        return lists[:10]
-    
-    def _extract_interactive(self, soup: BeautifulSoup) -> List[Dict]:
-        """提取交互元素（表单、按钮等）"""
-        elements = []
-        
-        for form in soup.find_all("form"):
-            inputs = []
-            for inp in form.find_all(["input", "textarea", "select"]):
-                inputs.append({
-                    "type": inp.get("type", inp.name),
-                    "name": inp.get("name", ""),
-                    "placeholder": inp.get("placeholder", ""),
-                    "required": bool(inp.get("required"))
-                })
-            
-            elements.append({
-                "tag": "form",
-                "action": form.get("action", ""),
-                "method": form.get("method", "get"),
-                "inputs": inputs
-            })
-        
-        for btn in soup.find_all(["button", "a"], class_=re.compile(r"btn|button", re.I)):
-            elements.append({
-                "tag": btn.name,
-                "text": self._clean_text(btn.get_text()),
-                "classes": btn.get("class", [])
-            })
-        
-        return elements[:20]
-    
-    def _extract_semantic_tags(self, soup: BeautifulSoup) -> Dict[str, str]:
-        """提取 HTML5 语义化标签内容"""
-        semantic_tags = {}
-        
-        for tag in ["article", "section", "aside", "nav", "header", "footer"]:
-            elements = soup.find_all(tag)
-            if elements:
-                combined_text = " ".join([
-                    self._clean_text(el.get_text())[:500] 
-                    for el in elements
-                ])
-                semantic_tags[tag] = combined_text[:1000]
-        
-        return semantic_tags
-    
-    def _extract_code_blocks(self, soup: BeautifulSoup) -> List[str]:
-        """提取代码块"""
-        code_blocks = []
-        
-        for pre in soup.find_all("pre"):
-            code = pre.find("code")
-            text = code.get_text() if code else pre.get_text()
-            if len(text.strip()) > 20:
-                code_blocks.append(text[:2000])
-        
-        for code in soup.find_all("code"):
-            text = code.get_text()
-            if len(text.strip()) > 30 and text not in code_blocks:
-                code_blocks.append(text[:1000])
-        
-        return code_blocks[:10]
-    
-    def _clean_text(self, text: str) -> str:
-        """清理文本"""
-        if not text:
-            return ""
-        text = re.sub(r'\s+', ' ', text)
-        text = text.replace('\n', ' ').replace('\t', ' ')
-        return text.strip()
 
 
 class BrowserTools:
@@ -406,36 +273,69 @@ class BrowserTools:
     提供导航、点击、表单填写等基础操作
     """
     
-    def __init__(self, headless: bool = True, timeout: int = 30000):
+    def __init__(self, headless: bool = True, timeout: int = 30000,
+                 request_policy: Optional[RequestPolicy] = None):
+        """
+        Args:
+            headless: 是否无头模式
+            timeout: 操作超时（毫秒）
+            request_policy: 请求拦截策略，默认使用 config.yaml 中的 request_block.browser_types
+        """
         self.headless = headless
         self.timeout = timeout
         self.user_agent = (
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
             "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
         )
-        self._browser: Optional[Browser] = None
         self._context: Optional[BrowserContext] = None
         self._page: Optional[Page] = None
+        self.default_policy = request_policy or policy_from_config("browser")
+        self.request_policy = self.default_policy
+        self._routed = False
+        self.wait_config = config.page_wait
+    
+    async def set_request_policy(self, policy: Optional[RequestPolicy] = None):
+        """
+        修改拦截策略（如某个任务需要加载图片），对之后的请求立即生效，不必重建上下文
+
+        Args:
+            policy: 新策略，None 表示恢复默认策略
+        """
+        self.request_policy = policy or self.default_policy
+        if self._context is not None:
+            await self._install_policy()
+    
+    async def _install_policy(self):
+        """拦截规则每个请求时读取当前策略；策略不拦截任何请求时不安装，避免每个请求多一次往返"""
+        if not self._routed and self.request_policy.blocks_anything:
+            await install_policy(self._context, lambda: self.request_policy)
+            self._routed = True
     
     async def _ensure_browser(self) -> Page:
-        """确保浏览器已启动"""
-        if self._page is None:
-            p = await async_playwright().start()
-            self._browser = await p.chromium.launch(headless=self.headless)
-            self._context = await self._browser.new_context(
+        """确保页面可用：在共享浏览器中创建独占的上下文和页面，浏览器崩溃或页面被关闭后重新创建"""
+        if self._page is None or self._page.is_closed():
+            await self.close()
+            self._context = await get_browser_pool(self.headless).new_context(
                 user_agent=self.user_agent,
                 viewport={"width": 1920, "height": 1080}
             )
+            self._routed = False
+            await self._install_policy()
             self._page = await self._context.new_page()
         return self._page
     
+    async def start(self):
+        """预先启动浏览器（启动预热时调用），第一次操作时不再等待 Chromium 启动"""
+        await self._ensure_browser()
+    
     async def close(self):
-        """关闭浏览器"""
-        if self._browser:
-            await self._browser.close()
-            self._browser = None
-            self._context = None
-            self._page = None
+        """关闭自己的上下文和页面，共享的浏览器由浏览器池管理"""
+        context, self._context, self._page = self._context, None, None
+        if context is not None:
+            try:
+                await context.close()
+            except Exception:
+                pass
     
     async def navigate(self, url: str, wait_until: str = "networkidle") -> Dict[str, Any]:
         """
@@ -448,8 +348,13 @@ class BrowserTools:
         """
         try:
             page = await self._ensure_browser()
-            await page.goto(url, wait_until=wait_until, timeout=self.timeout)
-            await page.wait_for_load_state("load")
+            if wait_until == "networkidle":
+                # 文档加载后等待 DOM 静止和网络空闲，最多 load_cap 秒
+                async with settle_after(page, self.wait_config.quiet, self.wait_config.load_cap):
+                    await page.goto(url, wait_until="domcontentloaded", timeout=self.timeout)
+            else:
+                await page.goto(url, wait_until=wait_until, timeout=self.timeout)
+                await page.wait_for_load_state("load")
             
             title = await page.title()
             current_url = page.url
@@ -467,20 +372,21 @@ class BrowserTools:
                 "message": f"导航失败: {str(e)}"
             }
     
-    async def click(self, selector: str, wait_after: float = 1.0) -> Dict[str, Any]:
+    async def click(self, selector: str, wait_after: Optional[float] = None) -> Dict[str, Any]:
         """
         点击页面元素
         Args:
             selector: CSS选择器
-            wait_after: 点击后等待时间（秒）
+            wait_after: 点击后等待页面稳定的最长时间（秒），默认使用 config.yaml 中的 page_wait.action_cap
         Returns:
             操作结果
         """
         try:
             page = await self._ensure_browser()
             await page.wait_for_selector(selector, timeout=self.timeout)
-            await page.click(selector)
-            await asyncio.sleep(wait_after)
+            cap = self.wait_config.action_cap if wait_after is None else wait_after
+            async with settle_after(page, self.wait_config.quiet, cap):
+                await page.click(selector)
             
             return {
                 "success": True,
@@ -574,12 +480,12 @@ class BrowserTools:
         try:
             page = await self._ensure_browser()
             
-            if selector:
-                await page.click(selector)
-            else:
-                await page.keyboard.press("Enter")
-            
-            await asyncio.sleep(2)
+            # 提交通常会跳转，等待新页面稳定，最多 load_cap 秒
+            async with settle_after(page, self.wait_config.quiet, self.wait_config.load_cap):
+                if selector:
+                    await page.click(selector)
+                else:
+                    await page.keyboard.press("Enter")
             
             return {
                 "success": True,
@@ -714,8 +620,9 @@ class BrowserTools:
             page = await self._ensure_browser()
             
             for i in range(steps):
-                await page.evaluate(f"window.scrollBy(0, {distance})")
-                await asyncio.sleep(0.3)
+                await scroll_step(page, distance, relative=True)
+            # 等待滚动触发的懒加载内容
+            await wait_for_stable_height(page, self.wait_config.scroll_quiet, self.wait_config.scroll_cap)
             
             return {
                 "success": True,
@@ -738,7 +645,7 @@ class BrowserTools:
 
 
 async def get_web_data(url: str):
-    """使用示例"""
+    """使用示例（与其他提取共用当前事件循环的浏览器池）"""
     extractor = SmartWebExtractor()
     result = await extractor.extract(url)
     print("提取的网页内容:")
@@ -750,4 +657,12 @@ async def get_web_data(url: str):
 
 
 if __name__ == "__main__":
-    asyncio.run(get_web_data("https://bigmodel.cn/pricing"))
+    from tools.browser_pool import close_browser_pool
+
+    async def main():
+        try:
+            await get_web_data("https://bigmodel.cn/pricing")
+        finally:
+            await close_browser_pool()
+
+    asyncio.run(main())
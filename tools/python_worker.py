@@ -0,0 +1,123 @@
+"""
+Python 常驻工作进程
+由 PythonWorkerPool 在 code_venv 解释器中启动，只依赖标准库。
+
+协议：标准输入/输出上每行一个 JSON
+    请求: {"id": 1, "code": "...", "session": "", "stdout_path": "...", "stderr_path": "..."}
+    响应: {"id": 1, "returncode": 0}
+启动完成后先输出 {"ready": true}。
+执行代码时文件描述符 1/2 重定向到请求中给出的临时文件，
+因此 C 扩展和子进程的输出也会被捕获；协议使用复制出来的描述符，不会被用户代码干扰。
+"""
+
+import io
+import json
+import os
+import sys
+import traceback
+
+
+def _apply_memory_limit(limit_mb: int):
+    """限制进程虚拟内存（仅 POSIX）"""
+    if limit_mb <= 0:
+        return
+    try:
+        import resource
+        limit = limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except Exception:
+        pass
+
+
+def _preload(modules):
+    """预先导入常用模块，失败时忽略"""
+    for name in modules:
+        try:
+            __import__(name)
+        except Exception:
+            pass
+
+
+def _new_namespace() -> dict:
+    """与 python -c 一致的全新命名空间"""
+    return {"__name__": "__main__", "__builtins__": __builtins__}
+
+
+def _run(code: str, namespace: dict, stdout_path: str, stderr_path: str) -> int:
+    """在重定向的输出下执行代码，返回退出码"""
+    out_fd = os.open(stdout_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    err_fd = os.open(stderr_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    saved_out, saved_err = os.dup(1), os.dup(2)
+    os.dup2(out_fd, 1)
+    os.dup2(err_fd, 2)
+    os.close(out_fd)
+    os.close(err_fd)
+    sys.stdout = io.TextIOWrapper(os.fdopen(os.dup(1), "wb"), encoding="utf-8", errors="replace", line_buffering=True)
+    sys.stderr = io.TextIOWrapper(os.fdopen(os.dup(2), "wb"), encoding="utf-8", errors="replace", line_buffering=True)
+    cwd = os.getcwd()
+    returncode = 0
+    try:
+        exec(compile(code, "<string>", "exec"), namespace)
+    except SystemExit as e:
+        if e.code is None:
+            returncode = 0
+        elif isinstance(e.code, int):
+            returncode = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            returncode = 1
+    except BaseException as e:
+        # 去掉工作进程自身的栈帧，与 python -c 的输出一致
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        returncode = 1
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.close()
+            except Exception:
+                pass
+        sys.stdout, sys.stderr = sys.__stdout__, sys.__stderr__
+        os.dup2(saved_out, 1)
+        os.dup2(saved_err, 2)
+        os.close(saved_out)
+        os.close(saved_err)
+        try:
+            os.chdir(cwd)
+        except Exception:
+            pass
+    return returncode
+
+
+def main():
+    memory_limit_mb = int(os.environ.get("SHITBOT_WORKER_MEMORY_MB", "0") or 0)
+    preload = [m for m in os.environ.get("SHITBOT_WORKER_PRELOAD", "").split(",") if m]
+
+    # 协议通道使用复制出来的描述符，原来的 0/1/2 留给用户代码
+    proto_in = io.TextIOWrapper(os.fdopen(os.dup(0), "rb"), encoding="utf-8")
+    proto_out = io.TextIOWrapper(os.fdopen(os.dup(1), "wb"), encoding="utf-8", line_buffering=True)
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+    sys.stdin = io.StringIO("")
+    sys.argv = ["-c"]
+
+    _apply_memory_limit(memory_limit_mb)
+    _preload(preload)
+
+    proto_out.write(json.dumps({"ready": True}) + "\n")
+    namespace = _new_namespace()
+
+    for line in proto_in:
+        line = line.strip()
+        if not line:
+            continue
+        request = json.loads(line)
+        # 会话进程持续使用同一个命名空间，普通进程每次重新创建
+        if not request.get("session"):
+            namespace = _new_namespace()
+        returncode = _run(request["code"], namespace, request["stdout_path"], request["stderr_path"])
+        proto_out.write(json.dumps({"id": request["id"], "returncode": returncode}) + "\n")
+
+
+if __name__ == "__main__":
+    main()
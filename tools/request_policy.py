@@ -0,0 +1,227 @@
+"""
+浏览器请求拦截策略
+SmartWebExtractor 过去只按扩展名拦截图片、样式和字体（没有扩展名的 CDN 地址照样加载），BrowserTools 什么都不拦截。
+这里按 Playwright 的 request.resource_type 和请求主机决定是否拦截：
+- 资源类型：image、media、font、stylesheet 等，读取正文和操作页面各有默认的拦截列表
+- 跟踪和广告主机：本地列表（TRACKER_HOSTS 加上配置中的 extra_hosts），按域名后缀匹配
+- 页面文档（document）始终放行，直接访问列表中的网站不受影响
+拦截的请求数和按类型估算的字节数记录在全局统计中。
+"""
+
+import threading
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, FrozenSet, Iterable, Optional, Union
+from urllib.parse import urlsplit
+
+
+# Playwright 的资源类型
+RESOURCE_TYPES = frozenset({
+    "document", "stylesheet", "image", "media", "font", "script", "texttrack",
+    "xhr", "fetch", "eventsource", "websocket", "manifest", "other"
+})
+
+# 常见的跟踪、统计和广告主机，子域名同样拦截
+TRACKER_HOSTS = frozenset({
+    "google-analytics.com", "googletagmanager.com", "googletagservices.com",
+    "doubleclick.net", "googlesyndication.com", "googleadservices.com", "adservice.google.com",
+    "connect.facebook.net", "analytics.twitter.com", "ads-twitter.com", "bat.bing.com", "clarity.ms",
+    "scorecardresearch.com", "quantserve.com", "hotjar.com", "segment.io", "cdn.segment.com",
+    "mixpanel.com", "amplitude.com", "fullstory.com", "newrelic.com", "nr-data.net",
+    "criteo.com", "criteo.net", "taboola.com", "outbrain.com", "adnxs.com", "rubiconproject.com",
+    "pubmatic.com", "openx.net", "amazon-adsystem.com", "moatads.com", "adsrvr.org",
+    "hm.baidu.com", "cpro.baidu.com", "pos.baidu.com", "cnzz.com", "umeng.com",
+    "growingio.com", "sensorsdata.cn", "tanx.com", "mmstat.com", "miaozhen.com", "admaster.com.cn",
+})
+
+# 被拦截请求的估算大小（字节），实际大小在拦截后无法得知，按常见网页中各类资源的典型大小估算
+ESTIMATED_BYTES = {
+    "image": 40 * 1024,
+    "media": 500 * 1024,
+    "font": 30 * 1024,
+    "stylesheet": 20 * 1024,
+    "tracker": 20 * 1024,
+}
+_DEFAULT_ESTIMATE = 10 * 1024
+
+
+def _host_matches(host: str, hosts: Iterable[str]) -> bool:
+    """host 是 hosts 中的某个域名或其子域名"""
+    hosts = hosts if isinstance(hosts, (set, frozenset)) else set(hosts)
+    parts = host.lower().rstrip(".").split(".")
+    return any(".".join(parts[i:]) in hosts for i in range(len(parts) - 1))
+
+
+@dataclass(frozen=True)
+class RequestPolicy:
+    """
+    请求拦截策略（不可变，可作为共享上下文的 key），默认不拦截任何请求
+    """
+    block_types: FrozenSet[str] = frozenset()   # 拦截的资源类型
+    block_trackers: bool = False                # 是否拦截跟踪和广告主机
+    extra_hosts: FrozenSet[str] = frozenset()   # 额外拦截的主机
+
+    @classmethod
+    def create(cls,
+               block_types: Iterable[str] = (),
+               block_trackers: bool = True,
+               extra_hosts: Iterable[str] = ()) -> "RequestPolicy":
+        """
+        创建策略，忽略未知的资源类型
+
+        Args:
+            block_types: 拦截的资源类型
+            block_trackers: 是否拦截跟踪和广告主机
+            extra_hosts: 额外拦截的主机
+
+        Returns:
+            RequestPolicy: 策略
+        """
+        return cls(
+            block_types=frozenset(t for t in block_types if t in RESOURCE_TYPES and t != "document"),
+            block_trackers=block_trackers,
+            extra_hosts=frozenset(h.lower().strip() for h in extra_hosts if h.strip())
+        )
+
+    @property
+    def key(self) -> str:
+        """策略的简短标识，用于区分浏览器池中的共享上下文"""
+        parts = sorted(self.block_types)
+        if self.block_trackers:
+            parts.append("trackers")
+        if self.extra_hosts:
+            parts.append(f"hosts{len(self.extra_hosts)}")
+        return "+".join(parts) or "none"
+
+    @property
+    def blocks_anything(self) -> bool:
+        return bool(self.block_types or self.block_trackers or self.extra_hosts)
+
+    def allowing(self, resource_types: Iterable[str] = (), trackers: bool = False) -> "RequestPolicy":
+        """
+        返回放行部分资源的新策略（如截图任务需要加载图片和样式）
+
+        Args:
+            resource_types: 需要加载的资源类型
+            trackers: 是否放行跟踪和广告主机
+
+        Returns:
+            RequestPolicy: 新策略
+        """
+        return replace(self,
+                       block_types=self.block_types - frozenset(resource_types),
+                       block_trackers=self.block_trackers and not trackers)
+
+    def block_reason(self, resource_type: str, url: str) -> Optional[str]:
+        """
+        判断请求是否拦截
+
+        Args:
+            resource_type: request.resource_type
+            url: 请求地址
+
+        Returns:
+            Optional[str]: 拦截原因（资源类型或 tracker），放行时返回 None
+        """
+        if resource_type == "document":
+            return None
+        if resource_type in self.block_types:
+            return resource_type
+        if self.block_trackers or self.extra_hosts:
+            host = urlsplit(url).hostname or ""
+            if host and ((self.block_trackers and _host_matches(host, TRACKER_HOSTS))
+                         or (self.extra_hosts and _host_matches(host, self.extra_hosts))):
+                return "tracker"
+        return None
+
+
+class BlockStats:
+    """
+    拦截统计（线程安全），主线程和子智能体线程的浏览器共用
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.estimated_bytes = 0
+        self.by_reason: Dict[str, int] = {}
+
+    def record(self, reason: str):
+        """记录一次拦截"""
+        with self._lock:
+            self.requests += 1
+            self.estimated_bytes += ESTIMATED_BYTES.get(reason, _DEFAULT_ESTIMATE)
+            self.by_reason[reason] = self.by_reason.get(reason, 0) + 1
+
+    def stats(self) -> Dict[str, Union[int, Dict[str, int]]]:
+        """
+        Returns:
+            dict: blocked_requests, blocked_bytes（估算）, by_reason
+        """
+        with self._lock:
+            return {
+                "blocked_requests": self.requests,
+                "blocked_bytes": self.estimated_bytes,
+                "by_reason": dict(self.by_reason)
+            }
+
+
+# 全局拦截统计（单例模式）
+_global_block_stats = BlockStats()
+
+
+def get_block_stats() -> BlockStats:
+    """
+    获取全局拦截统计
+
+    Returns:
+        BlockStats: 全局拦截统计
+    """
+    return _global_block_stats
+
+
+PolicySource = Union[RequestPolicy, Callable[[], RequestPolicy]]
+
+
+async def install_policy(context, policy: PolicySource, stats: Optional[BlockStats] = None):
+    """
+    在浏览器上下文上安装拦截规则
+
+    Args:
+        context: playwright.async_api.BrowserContext
+        policy: 拦截策略，或返回当前策略的函数（每个请求时调用，修改策略后不必重建上下文）
+        stats: 拦截统计，默认使用全局统计
+    """
+    current = policy if callable(policy) else (lambda: policy)
+    stats = stats or get_block_stats()
+
+    async def handle(route):
+        request = route.request
+        reason = current().block_reason(request.resource_type, request.url)
+        if reason is None:
+            await route.continue_()
+            return
+        stats.record(reason)
+        await route.abort("blockedbyclient")
+
+    await context.route("**/*", handle)
+
+
+def policy_from_config(target: str = "extract") -> RequestPolicy:
+    """
+    按 config.yaml 中的 request_block 配置创建策略
+
+    Args:
+        target: extract（读取网页正文）或 browser（BrowserTools 操作页面）
+
+    Returns:
+        RequestPolicy: 策略，未启用时不拦截任何请求
+    """
+    from config.config import load_config, RequestBlockConfig
+    try:
+        config = load_config().request_block
+    except Exception:
+        config = RequestBlockConfig()
+    if not config.enabled:
+        return RequestPolicy()
+    types = config.extract_types if target == "extract" else config.browser_types
+    return RequestPolicy.create(types, config.block_trackers, config.extra_hosts)
@@ -0,0 +1,287 @@
+"""
+网络搜索结果缓存
+智能体经常在几轮之后以几乎相同的查询再次搜索，每日定时任务也会反复问同样的问题。
+搜索结果按 (搜索服务, 规范化后的查询, 结果数) 缓存：
+- 内存层：进程内 TTL + LRU，命中时不读磁盘
+- 磁盘层：.shitbot/cache/search 下每条结果一个 JSON 文件，跨进程、跨重启共享，
+  超过容量上限时按最近使用时间淘汰
+查询规范化包括全角/半角统一（NFKC）、大小写和空白。
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import unicodedata
+from typing import Callable, Dict, Optional
+
+from src.ttl_cache import TTLCache, MISSING
+
+
+_DEFAULT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".shitbot", "cache", "search")
+# 磁盘超过上限后淘汰到上限的这个比例，避免每次写入都扫描目录
+_EVICT_TARGET = 0.9
+
+
+def normalize_query(query: str) -> str:
+    """
+    规范化搜索查询：全角转半角（NFKC）、转小写、合并连续空白
+
+    Args:
+        query: 查询词
+
+    Returns:
+        str: 规范化后的查询词
+    """
+    return " ".join(unicodedata.normalize("NFKC", query).lower().split())
+
+
+class SearchCache:
+    """
+    两级搜索结果缓存（线程安全）
+    """
+
+    def __init__(self,
+                 directory: Optional[str] = _DEFAULT_DIR,
+                 ttl: float = 3600,
+                 disk_ttl: float = 86400,
+                 max_disk_bytes: int = 50 * 1024 * 1024,
+                 memory_entries: int = 256,
+                 enabled: bool = True,
+                 clock: Callable[[], float] = time.time):
+        """
+        Args:
+            directory: 磁盘缓存目录，None 表示只使用内存层
+            ttl: 内存层有效期（秒）
+            disk_ttl: 磁盘层有效期（秒）
+            max_disk_bytes: 磁盘层容量上限（字节）
+            memory_entries: 内存层最多保存的条目数
+            enabled: 是否启用，关闭时 get 总是未命中、set 不保存
+            clock: 时钟函数（墙上时间，磁盘条目跨进程比较），测试时可替换
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.disk_ttl = disk_ttl
+        self.max_disk_bytes = max_disk_bytes
+        self.enabled = enabled
+        self._clock = clock
+        self._memory = TTLCache(max_entries=memory_entries, clock=clock)
+        self._lock = threading.Lock()
+        self._disk_bytes: Optional[int] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.disk_evictions = 0
+
+    @staticmethod
+    def make_key(provider: str, query: str, count: int) -> str:
+        """
+        生成缓存键
+
+        Args:
+            provider: 搜索服务名称
+            query: 查询词
+            count: 结果数
+
+        Returns:
+            str: 缓存键（十六进制摘要，同时用作磁盘文件名）
+        """
+        raw = json.dumps([provider, normalize_query(query), int(count)], ensure_ascii=False)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, provider: str, query: str, count: int) -> Optional[str]:
+        """
+        读取缓存的搜索结果
+
+        Returns:
+            str: 缓存的结果，未命中时返回 None
+        """
+        if not self.enabled:
+            return None
+        key = self.make_key(provider, query, count)
+        value = self._memory.lookup(provider, key)
+        if value is not MISSING:
+            with self._lock:
+                self.memory_hits += 1
+            return value
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        # 提升到内存层，剩余有效期不超过内存层的 ttl
+        remaining = entry["created"] + self.disk_ttl - self._clock()
+        self._memory.set(provider, key, entry["result"], ttl=min(self.ttl, remaining))
+        return entry["result"]
+
+    def set(self, provider: str, query: str, count: int, result: str):
+        """
+        保存搜索结果（只应保存成功的结果）
+
+        Args:
+            provider: 搜索服务名称
+            query: 查询词
+            count: 结果数
+            result: 搜索结果文本
+        """
+        if not self.enabled:
+            return
+        key = self.make_key(provider, query, count)
+        self._memory.set(provider, key, result, ttl=self.ttl)
+        with self._lock:
+            self.writes += 1
+        if self.directory:
+            self._write_disk(key, {
+                "created": self._clock(),
+                "provider": provider,
+                "query": normalize_query(query),
+                "count": count,
+                "result": result
+            })
+
+    def clear(self):
+        """清空内存层和磁盘层"""
+        self._memory.invalidate()
+        if not self.directory or not os.path.isdir(self.directory):
+            return
+        with self._lock:
+            for name in os.listdir(self.directory):
+                if name.endswith(".json"):
+                    try:
+                        os.remove(os.path.join(self.directory, name))
+                    except OSError:
+                        pass
+            self._disk_bytes = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[dict]:
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self._clock() - entry.get("created", 0) >= self.disk_ttl:
+            self._remove_file(path)
+            return None
+        try:
+            # mtime 记录最近使用时间，淘汰时按它排序
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def _write_disk(self, key: str, entry: dict):
+        path = self._path(key)
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                if self._disk_bytes is None:
+                    self._disk_bytes = self._scan_disk_bytes()
+                old_size = os.path.getsize(path) if os.path.exists(path) else 0
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except OSError:
+                return
+            self._disk_bytes += len(data) - old_size
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _scan_disk_bytes(self) -> int:
+        total = 0
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                try:
+                    total += os.path.getsize(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+        return total
+
+    def _evict_disk(self):
+        """按最近使用时间淘汰磁盘条目，直到低于容量上限的 90%"""
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        target = self.max_disk_bytes * _EVICT_TARGET
+        for _, size, path in files:
+            if total <= target:
+                break
+            if self._remove_file(path):
+                total -= size
+                self.disk_evictions += 1
+        self._disk_bytes = total
+
+    @staticmethod
+    def _remove_file(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns:
+            dict: memory_hits, disk_hits, misses, writes, memory_entries, disk_bytes, disk_evictions
+        """
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "memory_entries": self._memory.stats()["entries"],
+                "disk_bytes": self._disk_bytes or 0,
+                "disk_evictions": self.disk_evictions
+            }
+
+
+# 全局搜索缓存（单例模式）
+_global_search_cache: Optional[SearchCache] = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    """
+    获取全局搜索缓存，首次调用时按 config.yaml 中的 search_cache 配置创建
+
+    Returns:
+        SearchCache: 全局搜索缓存
+    """
+    global _global_search_cache
+    if _global_search_cache is None:
+        with _search_cache_lock:
+            if _global_search_cache is None:
+                from config.config import load_config, SearchCacheConfig
+                try:
+                    config = load_config().search_cache
+                except Exception:
+                    config = SearchCacheConfig()
+                _global_search_cache = SearchCache(
+                    directory=_DEFAULT_DIR if config.disk else None,
+                    ttl=config.ttl,
+                    disk_ttl=config.disk_ttl,
+                    max_disk_bytes=int(config.max_disk_mb * 1024 * 1024),
+                    memory_entries=config.memory_entries,
+                    enabled=config.enabled
+                )
+    return _global_search_cache
@@ -0,0 +1,351 @@
+"""
+Shell 命令执行工具
+功能：
+1. run_shell_command - 基于 asyncio 子进程执行命令，不阻塞事件循环，实时回调输出
+2. ShellSession - 可选的常驻 shell 会话，连续命令之间保留 cwd 和环境变量
+两者都只保留输出的开头和结尾部分（head + tail），并支持超时和终止标志取消
+"""
+
+import asyncio
+import codecs
+import os
+import signal
+import subprocess
+import sys
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+IS_WINDOWS = sys.platform == "win32"
+
+
+@dataclass
+class ShellResult:
+    """命令执行结果"""
+    returncode: Optional[int]
+    output: str
+    timed_out: bool = False
+    cancelled: bool = False
+
+
+class OutputBuffer:
+    """
+    输出缓冲区：只保留开头 head_chars 和结尾 tail_chars 个字符，
+    中间部分丢弃并记录丢弃的字符数
+    """
+
+    def __init__(self, head_chars: int = 8000, tail_chars: int = 8000):
+        self.head_chars = head_chars
+        self.tail_chars = tail_chars
+        self._head: list = []
+        self._head_len = 0
+        self._tail: deque = deque()
+        self._tail_len = 0
+        self.dropped = 0
+
+    def append(self, text: str):
+        """追加一段输出"""
+        if self._head_len < self.head_chars:
+            room = self.head_chars - self._head_len
+            self._head.append(text[:room])
+            self._head_len += len(text[:room])
+            text = text[room:]
+        if not text:
+            return
+        self._tail.append(text)
+        self._tail_len += len(text)
+        while self._tail_len - len(self._tail[0]) >= self.tail_chars:
+            removed = self._tail.popleft()
+            self._tail_len -= len(removed)
+            self.dropped += len(removed)
+
+    def render(self) -> str:
+        """拼接保留的输出，中间被丢弃的部分用提示代替"""
+        tail = "".join(self._tail)
+        if len(tail) > self.tail_chars:
+            self.dropped += len(tail) - self.tail_chars
+            tail = tail[-self.tail_chars:]
+            self._tail = deque([tail])
+            self._tail_len = len(tail)
+        head = "".join(self._head)
+        if self.dropped:
+            return f"{head}\n... [省略中间 {self.dropped} 个字符] ...\n{tail}"
+        return head + tail
+
+
+class _LineEmitter:
+    """把分块到达的输出按行回调给 UI"""
+
+    def __init__(self, on_output: Optional[Callable[[str], None]]):
+        self.on_output = on_output
+        self._pending = ""
+
+    def feed(self, text: str):
+        if not self.on_output:
+            return
+        self._pending += text
+        *lines, self._pending = self._pending.split("\n")
+        for line in lines:
+            self._emit(line)
+
+    def flush(self):
+        if self.on_output and self._pending:
+            self._emit(self._pending)
+        self._pending = ""
+
+    def _emit(self, line: str):
+        try:
+            self.on_output(line.rstrip("\r"))
+        except Exception:
+            pass
+
+
+def _kill_process_tree(proc: asyncio.subprocess.Process):
+    """结束子进程及其派生的全部进程"""
+    if proc.returncode is not None:
+        return
+    try:
+        if IS_WINDOWS:
+            subprocess.run(
+                ["taskkill", "/F", "/T", "/PID", str(proc.pid)],
+                capture_output=True
+            )
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except Exception:
+        try:
+            proc.kill()
+        except Exception:
+            pass
+
+
+def _process_group_kwargs() -> dict:
+    """让子进程成为独立进程组，便于超时或取消时整体结束"""
+    if IS_WINDOWS:
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+async def wait_with_stop(task: asyncio.Task,
+                         timeout: Optional[float],
+                         should_stop: Optional[Callable[[], bool]],
+                         poll_interval: float = 0.1) -> str:
+    """
+    等待任务完成，期间轮询终止标志
+
+    Returns:
+        str: "done" / "timeout" / "stopped"
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout if timeout else None
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=poll_interval)
+        if done:
+            return "done"
+        if should_stop and should_stop():
+            return "stopped"
+        if deadline is not None and loop.time() >= deadline:
+            return "timeout"
+
+
+async def run_shell_command(command: str,
+                            timeout: Optional[float] = 60,
+                            on_output: Optional[Callable[[str], None]] = None,
+                            should_stop: Optional[Callable[[], bool]] = None,
+                            head_chars: int = 8000,
+                            tail_chars: int = 8000,
+                            cwd: Optional[str] = None) -> ShellResult:
+    """
+    异步执行单条 shell 命令
+
+    Args:
+        command: 要执行的命令
+        timeout: 超时时间（秒），None 表示不限制
+        on_output: 每输出一行时的回调，用于实时显示
+        should_stop: 返回 True 时终止命令（例如用户按下 Esc）
+        head_chars: 保留输出开头的字符数
+        tail_chars: 保留输出结尾的字符数
+        cwd: 工作目录
+
+    Returns:
+        ShellResult: 执行结果，stdout 与 stderr 合并为一个输出流
+    """
+    proc = await asyncio.create_subprocess_shell(
+        command,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        cwd=cwd,
+        **_process_group_kwargs()
+    )
+    buffer = OutputBuffer(head_chars, tail_chars)
+    emitter = _LineEmitter(on_output)
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+    async def pump():
+        while True:
+            chunk = await proc.stdout.read(4096)
+            if not chunk:
+                break
+            text = decoder.decode(chunk)
+            buffer.append(text)
+            emitter.feed(text)
+        tail = decoder.decode(b"", final=True)
+        buffer.append(tail)
+        emitter.feed(tail)
+        await proc.wait()
+
+    reader = asyncio.create_task(pump())
+    try:
+        state = await wait_with_stop(reader, timeout, should_stop)
+    except asyncio.CancelledError:
+        _kill_process_tree(proc)
+        reader.cancel()
+        raise
+
+    if state != "done":
+        _kill_process_tree(proc)
+        try:
+            await asyncio.wait_for(reader, timeout=5)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            reader.cancel()
+    emitter.flush()
+
+    return ShellResult(
+        returncode=proc.returncode,
+        output=buffer.render(),
+        timed_out=state == "timeout",
+        cancelled=state == "stopped"
+    )
+
+
+class ShellSession:
+    """
+    常驻 shell 会话
+
+    在同一个 bash（Windows 上为 cmd）进程中依次执行命令，cd、export/set 等状态会保留。
+    每条命令后写入一行带随机标记的结束符来分隔输出并取得返回码；
+    命令的标准输入重定向到空设备，避免命令读走后续的结束标记。
+    超时或取消时会结束整个会话进程，下次调用自动重建。
+    """
+
+    def __init__(self, head_chars: int = 8000, tail_chars: int = 8000):
+        self.head_chars = head_chars
+        self.tail_chars = tail_chars
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._decoder = None
+        self._pending = ""
+
+    @property
+    def alive(self) -> bool:
+        """会话进程是否仍在运行"""
+        return self._proc is not None and self._proc.returncode is None
+
+    async def start(self):
+        """启动会话进程"""
+        if IS_WINDOWS:
+            args = ["cmd.exe", "/D", "/Q"]
+        else:
+            shell = "/bin/bash" if os.path.exists("/bin/bash") else "/bin/sh"
+            args = [shell, "--noprofile", "--norc"] if shell.endswith("bash") else [shell]
+        self._proc = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            **_process_group_kwargs()
+        )
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._pending = ""
+
+    async def run(self,
+                  command: str,
+                  timeout: Optional[float] = 60,
+                  on_output: Optional[Callable[[str], None]] = None,
+                  should_stop: Optional[Callable[[], bool]] = None) -> ShellResult:
+        """
+        在会话中执行一条命令
+
+        Args:
+            command: 要执行的命令
+            timeout: 超时时间（秒），None 表示不限制
+            on_output: 每输出一行时的回调
+            should_stop: 返回 True 时终止命令
+
+        Returns:
+            ShellResult: 执行结果
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self.alive:
+                await self.start()
+
+            marker = f"__SHITBOT_DONE_{uuid.uuid4().hex}__"
+            if IS_WINDOWS:
+                script = f"({command}\r\n) < NUL\r\necho.\r\necho {marker} %errorlevel%\r\n"
+            else:
+                script = f"{{ {command}\n}} < /dev/null\nprintf '\\n{marker} %s\\n' \"$?\"\n"
+            self._proc.stdin.write(script.encode("utf-8"))
+            await self._proc.stdin.drain()
+
+            buffer = OutputBuffer(self.head_chars, self.tail_chars)
+            emitter = _LineEmitter(on_output)
+            result = {"returncode": None}
+
+            async def pump():
+                while True:
+                    if "\n" not in self._pending:
+                        chunk = await self._proc.stdout.read(4096)
+                        if not chunk:
+                            return
+                        self._pending += self._decoder.decode(chunk)
+                        continue
+                    line, self._pending = self._pending.split("\n", 1)
+                    if line.rstrip("\r").startswith(marker):
+                        code = line.rstrip("\r")[len(marker):].strip()
+                        result["returncode"] = int(code) if code.lstrip("-").isdigit() else None
+                        return
+                    buffer.append(line + "\n")
+                    emitter.feed(line + "\n")
+
+            reader = asyncio.create_task(pump())
+            try:
+                state = await wait_with_stop(reader, timeout, should_stop)
+            except asyncio.CancelledError:
+                reader.cancel()
+                await self.close()
+                raise
+
+            if state != "done":
+                reader.cancel()
+                await self.close()
+            elif not self.alive and result["returncode"] is None:
+                # 会话进程在命令中退出（例如执行了 exit）
+                result["returncode"] = self._proc.returncode
+            emitter.flush()
+
+            output = buffer.render()
+            # 结束标记前额外输出的空行不属于命令输出
+            if state == "done" and output.endswith("\n"):
+                output = output[:-1]
+            return ShellResult(
+                returncode=result["returncode"],
+                output=output,
+                timed_out=state == "timeout",
+                cancelled=state == "stopped"
+            )
+
+    async def close(self):
+        """结束会话进程"""
+        if self._proc is None:
+            return
+        _kill_process_tree(self._proc)
+        try:
+            await asyncio.wait_for(self._proc.wait(), timeout=5)
+        except Exception:
+            pass
+        self._proc = None
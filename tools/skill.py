@@ -1,5 +1,6 @@
 import os
 import yaml
+from tools.file_cache import get_file_cache
 class Skill:
     def __init__(self) -> None:
         self.file_path = os.path.join(os.path.dirname(__file__), "..",".shitbot", "skills")
@@ -20,8 +21,7 @@ class Skill:
     def get_skill_info(self,path: str):
         if not os.path.exists(path):
             return None,None    
-        with open(path, "r", encoding="utf-8") as f:
-            content = f.read()
+        content = get_file_cache().read_text(path)
         if content.startswith("---"):
             end = content.find("---", 3)
             if end != -1:
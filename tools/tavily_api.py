@@ -1,23 +1,87 @@
-from tavily import TavilyClient 
+from tavily import TavilyClient
 from config.config import load_config
+from tools.http_client import request
 
 
+TAVILY_API_URL = "https://api.tavily.com"
 
 
 class TavilySearch:
     def __init__(self):
         self.config = load_config()
-        self.tavily_client = TavilyClient(api_key=self.config.tavily.key)   
-        
-    def search(self, query: str,max_results: int = 3):
-        results = self.tavily_client.search(query=query,max_results=max_results)['results']   
-        # 返回字符串
+        self.api_key = self.config.tavily.key
+        self.base_url = TAVILY_API_URL
+        self.timeout = 30.0
+        self.tavily_client = TavilyClient(api_key=self.api_key)
+
+    @staticmethod
+    def _parse_results(data: dict) -> list:
+        return [
+            {
+                "title": result.get("title", ""),
+                "url": result.get("url", ""),
+                "content": result.get("content", ""),
+                "score": result.get("score")
+            }
+            for result in data.get("results", [])
+        ]
+
+    @staticmethod
+    def format_results(results: list) -> str:
+        """把结构化结果格式化为字符串"""
         results_str = ""
         for result in results:
             results_str += f"标题: {result['title']}\n"
             results_str += f"内容: {result['content']}\n"
             results_str += f"来源: {result['url']}\n\n"
         return results_str
+
+    def search_results(self, query: str, max_results: int = 3) -> list:
+        """
+        搜索并返回结构化结果（同步，会阻塞调用线程）
+
+        Returns:
+            list: 结果列表，每条包含 title、url、content、score
+        """
+        return self._parse_results(self.tavily_client.search(query=query, max_results=max_results))
+
+    def search(self, query: str,max_results: int = 3):
+        # 返回字符串
+        return self.format_results(self.search_results(query, max_results=max_results))
+
+    async def asearch_results(self, query: str, max_results: int = 3) -> list:
+        """
+        异步搜索并返回结构化结果
+        通过共享的 HTTP 客户端直接调用 Tavily API，不阻塞事件循环，
+        与其他出站请求共用连接池、超时和重试策略，可以并发调用
+
+        Returns:
+            list: 结果列表，每条包含 title、url、content、score
+
+        Raises:
+            RuntimeError: API 返回错误
+        """
+        response = await request(
+            "POST",
+            f"{self.base_url}/search",
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            json={"query": query, "max_results": max_results},
+            timeout=self.timeout
+        )
+        if response.status_code != 200:
+            detail = ""
+            try:
+                detail = response.json().get("detail", {}).get("error", "")
+            except Exception:
+                pass
+            raise RuntimeError(f"Tavily API 请求失败: HTTP {response.status_code} {detail}".strip())
+        return self._parse_results(response.json())
+
+    async def asearch(self, query: str, max_results: int = 3) -> str:
+        """异步搜索，返回与 search 相同格式的字符串"""
+        return self.format_results(await self.asearch_results(query, max_results=max_results))
+
+
 if __name__ == "__main__":
     tavily_search = TavilySearch()
-    print(tavily_search.search("tavily是什么"))
\ No newline at end of file
+    print(tavily_search.search("tavily是什么"))
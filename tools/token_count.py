@@ -0,0 +1,82 @@
+"""
+Token 计数
+优先使用 tiktoken（cl100k_base）计数；tiktoken 未安装或编码文件无法下载（离线）时退回按字符估算。
+不同模型的分词器不同，这里的结果用于预算和比较，不要求与计费完全一致。
+"""
+
+import threading
+from tools.dir_tree import estimate_tokens
+
+
+_encoding = None
+_encoding_failed = False
+_encoding_lock = threading.Lock()
+
+
+def get_encoding():
+    """
+    获取 tiktoken 编码器，首次调用时加载，加载失败后不再重试
+
+    Returns:
+        tiktoken.Encoding: 编码器，不可用时返回 None
+    """
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        with _encoding_lock:
+            if _encoding is None and not _encoding_failed:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception:
+                    _encoding_failed = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """
+    计算文本的 token 数
+
+    Args:
+        text: 文本
+
+    Returns:
+        int: token 数
+    """
+    if not text:
+        return 0
+    encoding = get_encoding()
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    把文本截断到不超过 max_tokens 个 token
+
+    Args:
+        text: 文本
+        max_tokens: token 上限
+
+    Returns:
+        str: 截断后的文本（未超出时原样返回）
+    """
+    if max_tokens <= 0 or not text:
+        return ""
+    encoding = get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return encoding.decode(tokens[:max_tokens])
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    # 按字符估算时二分查找最长的前缀
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle]) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low]
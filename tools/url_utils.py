@@ -0,0 +1,52 @@
+"""
+URL 工具
+规范化 URL，用于合并不同搜索服务返回的同一页面、作为抓取和提取结果的缓存键
+"""
+
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+# 不影响页面内容的跟踪参数
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "mc_cid", "mc_eid",
+    "spm", "from", "ref", "ref_src", "share_source", "share_medium", "utm",
+})
+_DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+
+def canonical_url(url: str) -> str:
+    """
+    规范化 URL：统一协议为 https、主机名小写并去掉 www.、去掉默认端口、
+    片段（#...）、跟踪参数（utm_* 等）和路径末尾的斜杠，查询参数按名称排序
+
+    Args:
+        url: 原始 URL
+
+    Returns:
+        str: 规范化后的 URL，无法解析时返回去掉首尾空白的原值
+    """
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https") or not parts.hostname:
+        return url
+
+    host = parts.hostname.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port is not None and str(port) != _DEFAULT_PORTS[scheme]:
+        host = f"{host}:{port}"
+
+    path = parts.path.rstrip("/")
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit(("https", host, path, urlencode(query), ""))
@@ -5,9 +5,12 @@
 
 import sys
 import os
+import atexit
+import threading
 import subprocess
 from pathlib import Path
 from typing import Optional
+from tools.worker_pool import PythonWorkerPool, WorkerError
 class VenvManager:
     """
     虚拟环境管理器
@@ -17,18 +20,26 @@ class VenvManager:
     2. 如果不存在则自动创建
     3. 获取虚拟环境的 Python 解释器路径
     4. 激活虚拟环境
+    5. 通过常驻工作进程池运行 Python 代码
     """
     
-    def __init__(self, venv_name: str = "code_venv"):
+    def __init__(self, venv_name: str = "code_venv", runner_config=None):
         """
         初始化虚拟环境管理器
         
         Args:
             venv_name: 虚拟环境文件夹名称，默认为 "venv"
+            runner_config: 代码执行配置（CodeRunnerConfig），为 None 时使用默认值
         """
         self.venv_name = venv_name
         self.base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         self.venv_path = os.path.join(self.base_dir, venv_name)
+        if runner_config is None:
+            from config.config import CodeRunnerConfig
+            runner_config = CodeRunnerConfig()
+        self.runner_config = runner_config
+        self.worker_pool: Optional[PythonWorkerPool] = None
+        self._pool_lock = threading.Lock()
         self.init_or_create()
         
     def check_venv_exists(self) -> bool:
@@ -161,12 +172,16 @@ class VenvManager:
             print(f"✗ 安装包时发生错误: {str(e)}")
             return False
     
-    def run_python(self, script: str) -> tuple:
+    def run_python(self, script: str, session_id: str = "", should_stop=None) -> tuple:
         """
         在虚拟环境中运行 Python 脚本
         
+        优先使用常驻工作进程池，进程池不可用时退回到启动新的解释器
+        
         Args:
             script: Python 代码字符串
+            session_id: 会话ID，非空时在同一个进程中执行并保留变量（仅进程池模式）
+            should_stop: 返回 True 时结束执行（仅进程池模式）
             
         Returns:
             tuple: (returncode, stdout, stderr)
@@ -175,18 +190,77 @@ class VenvManager:
         if not python_path:
             return (1, "", "虚拟环境不存在")
         
+        timeout = self.runner_config.timeout or None
+        pool = self.get_worker_pool()
+        if pool:
+            try:
+                return pool.run(script, timeout=timeout, session_id=session_id, should_stop=should_stop)
+            except WorkerError:
+                pass
+        
         try:
             result = subprocess.run(
                 [python_path, "-c", script],
                 capture_output=True,
                 text=True,
                 encoding='utf-8',
-                errors='replace'
+                errors='replace',
+                timeout=timeout
             )
             return (result.returncode, result.stdout, result.stderr)
+        except subprocess.TimeoutExpired as e:
+            stderr = e.stderr.decode('utf-8', errors='replace') if isinstance(e.stderr, bytes) else (e.stderr or "")
+            stdout = e.stdout.decode('utf-8', errors='replace') if isinstance(e.stdout, bytes) else (e.stdout or "")
+            return (1, stdout, stderr + f"执行超时（超过{timeout}秒），已终止进程")
         except Exception as e:
             return (1, "", str(e))
     
+    def get_worker_pool(self) -> Optional[PythonWorkerPool]:
+        """
+        获取工作进程池，首次调用时创建并预先启动工作进程
+        
+        Returns:
+            PythonWorkerPool: 进程池，关闭了进程池或虚拟环境不存在时返回 None
+        """
+        if not self.runner_config.use_worker_pool:
+            return None
+        if self.worker_pool is not None:
+            return self.worker_pool
+        python_path = self.get_python_path()
+        if not python_path:
+            return None
+        with self._pool_lock:
+            if self.worker_pool is None:
+                config = self.runner_config
+                try:
+                    self.worker_pool = PythonWorkerPool(
+                        python_path,
+                        size=config.pool_size,
+                        max_runs=config.max_runs,
+                        max_rss_mb=config.max_rss_mb,
+                        memory_limit_mb=config.memory_limit_mb,
+                        max_sessions=config.max_sessions,
+                        preload=config.preload
+                    )
+                except Exception:
+                    return None
+                atexit.register(self.worker_pool.shutdown)
+        return self.worker_pool
+    
+    def close_session(self, session_id: str) -> bool:
+        """
+        关闭代码执行会话，释放其进程和变量
+        
+        Args:
+            session_id: 会话ID
+            
+        Returns:
+            bool: 会话存在并已关闭返回 True
+        """
+        if self.worker_pool is None:
+            return False
+        return self.worker_pool.close_session(session_id)
+    
     def init_or_create(self) -> bool:
         """
         初始化或创建虚拟环境
@@ -221,18 +295,19 @@ class VenvManager:
 _global_venv_manager = None
 
 
-def get_venv_manager(venv_name: str = "code_venv") -> VenvManager:
+def get_venv_manager(venv_name: str = "code_venv", runner_config=None) -> VenvManager:
     """
     获取全局虚拟环境管理器实例（单例模式）
     
     Args:
         venv_name: 虚拟环境文件夹名称
+        runner_config: 代码执行配置，仅在首次创建时生效
         
     Returns:
         VenvManager: 全局虚拟环境管理器实例
     """
     global _global_venv_manager
     if _global_venv_manager is None:
-        _global_venv_manager = VenvManager(venv_name)
+        _global_venv_manager = VenvManager(venv_name, runner_config)
     return _global_venv_manager
 
@@ -0,0 +1,211 @@
+"""
+多搜索服务并发检索
+同时向博查、Tavily 等搜索服务发出查询，在截止时间内收集结果：
+- 按规范化 URL 合并去重，保留最长的摘要并记录来源
+- 用倒数排名融合（RRF）排序：每个服务中的排名 r 贡献 1 / (k + r)，多个服务都返回的页面排在前面
+- 结果已经足够时，只再等待一小段宽限时间就返回，不等慢的服务
+一个服务失败或超时不影响其他服务的结果。
+批量搜索（search_web_batch）时每个服务限制并发数，结果按查询分组，跨查询重复的网页只列出一次。
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from tools.url_utils import canonical_url
+
+
+# 搜索服务：(查询词, 结果数) -> 结果列表，每条结果至少包含 title、url、content
+SearchProvider = Callable[[str, int], Awaitable[List[dict]]]
+
+# RRF 的平滑常数
+RRF_K = 60
+
+
+@dataclass
+class FanoutResult:
+    """并发检索结果"""
+    query: str
+    results: List[dict]                                      # 融合排序后的结果
+    completed: List[str] = field(default_factory=list)       # 按时返回的服务
+    failed: Dict[str, str] = field(default_factory=dict)     # 服务 -> 错误信息
+    timed_out: List[str] = field(default_factory=list)       # 截止时仍未返回的服务
+    elapsed: float = 0.0
+
+
+def fuse_results(ranked_lists: Dict[str, List[dict]], k: int = RRF_K) -> List[dict]:
+    """
+    合并多个服务的结果：按规范化 URL 去重，按 RRF 得分排序
+
+    Args:
+        ranked_lists: 服务名 -> 按相关度排序的结果列表
+        k: RRF 平滑常数
+
+    Returns:
+        List[dict]: 合并后的结果，每条增加 score（融合得分）和 providers（返回该页面的服务）
+    """
+    merged: Dict[str, dict] = {}
+    for provider, results in ranked_lists.items():
+        seen = set()
+        for rank, item in enumerate(results, 1):
+            url = item.get("url") or ""
+            if not url:
+                continue
+            key = canonical_url(url)
+            if key in seen:
+                continue
+            seen.add(key)
+            entry = merged.get(key)
+            if entry is None:
+                entry = merged[key] = dict(item, score=0.0, providers=[])
+            elif len(item.get("content") or "") > len(entry.get("content") or ""):
+                entry["content"] = item["content"]
+            if not entry.get("title") and item.get("title"):
+                entry["title"] = item["title"]
+            entry["score"] += 1.0 / (k + rank)
+            entry["providers"].append(provider)
+    return sorted(merged.values(), key=lambda entry: -entry["score"])
+
+
+async def fan_out_search(query: str,
+                         count: int,
+                         providers: Dict[str, SearchProvider],
+                         deadline: float = 8.0,
+                         grace: float = 0.5) -> FanoutResult:
+    """
+    并发查询多个搜索服务
+
+    Args:
+        query: 查询词
+        count: 需要的结果数
+        providers: 服务名 -> 搜索函数
+        deadline: 最长等待时间（秒），到时未返回的服务被取消
+        grace: 合并结果已达到 count 条后，再等待其他服务的时间（秒）
+
+    Returns:
+        FanoutResult: 融合排序后的前 count 条结果和各服务的完成情况
+    """
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    tasks = {asyncio.ensure_future(search(query, count)): name for name, search in providers.items()}
+    ranked_lists: Dict[str, List[dict]] = {}
+    outcome = FanoutResult(query=query, results=[])
+    stop_at = loop.time() + deadline
+    enough_at: Optional[float] = None
+
+    pending = set(tasks)
+    try:
+        while pending:
+            wait_until = stop_at if enough_at is None else min(stop_at, enough_at + grace)
+            timeout = wait_until - loop.time()
+            if timeout <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = tasks[task]
+                try:
+                    ranked_lists[name] = task.result() or []
+                    outcome.completed.append(name)
+                except Exception as e:
+                    outcome.failed[name] = str(e) or type(e).__name__
+            if enough_at is None and done and len(fuse_results(ranked_lists)) >= count:
+                enough_at = loop.time()
+    finally:
+        for task in pending:
+            task.cancel()
+            outcome.timed_out.append(tasks[task])
+
+    outcome.results = fuse_results(ranked_lists)[:count]
+    outcome.elapsed = time.perf_counter() - start
+    return outcome
+
+
+def format_fanout_results(outcome: FanoutResult, max_content_length: int = 200) -> str:
+    """
+    格式化并发检索结果为字符串
+
+    Args:
+        outcome: 并发检索结果
+        max_content_length: 每条摘要的最大长度
+
+    Returns:
+        str: 格式化后的字符串
+    """
+    lines = [f"搜索关键词: {outcome.query}"]
+    lines.append(f"找到 {len(outcome.results)} 条结果 (耗时 {outcome.elapsed:.2f}秒, 来源: {', '.join(outcome.completed) or '无'})")
+    if outcome.failed:
+        lines.append("失败: " + ", ".join(f"{name}({error})" for name, error in outcome.failed.items()))
+    if outcome.timed_out:
+        lines.append("未在时限内返回: " + ", ".join(outcome.timed_out))
+    lines.append("-" * 60)
+
+    for i, result in enumerate(outcome.results, 1):
+        lines.append(f"\n[{i}] {result.get('title', '')}")
+        lines.append(f"    URL: {result['url']}")
+        content = (result.get("content") or "")[:max_content_length]
+        if content:
+            lines.append(f"    摘要: {content}")
+    return "\n".join(lines)
+
+
+def limit_concurrency(search: SearchProvider, semaphore: asyncio.Semaphore) -> SearchProvider:
+    """
+    限制搜索服务的并发数
+
+    Args:
+        search: 搜索函数
+        semaphore: 该服务共用的信号量
+
+    Returns:
+        SearchProvider: 持有信号量时才发出请求的搜索函数
+    """
+    async def limited(query: str, count: int) -> List[dict]:
+        async with semaphore:
+            return await search(query, count)
+    return limited
+
+
+def format_batch_results(queries: List[str],
+                         outcomes: List[object],
+                         elapsed: float,
+                         max_content_length: int = 150) -> str:
+    """
+    按查询分组格式化批量搜索结果，同一网页只在第一次出现时列出
+
+    Args:
+        queries: 查询词列表
+        outcomes: 与 queries 对应的结果列表，或执行失败时的异常
+        elapsed: 总耗时（秒）
+        max_content_length: 每条摘要的最大长度
+
+    Returns:
+        str: 格式化后的字符串
+    """
+    lines = [f"批量搜索 {len(queries)} 个查询 (耗时 {elapsed:.2f}秒)"]
+    seen: Dict[str, str] = {}
+    for i, (query, outcome) in enumerate(zip(queries, outcomes), 1):
+        lines.append(f"\n== 查询 {i}: {query} ==")
+        if isinstance(outcome, BaseException):
+            lines.append(f"✗ 搜索失败: {str(outcome) or type(outcome).__name__}")
+            continue
+        duplicates = []
+        number = 0
+        for result in outcome:
+            url = result.get("url") or ""
+            key = canonical_url(url)
+            if key in seen:
+                duplicates.append(seen[key])
+                continue
+            number += 1
+            seen[key] = f"{i}.{number}"
+            lines.append(f"[{i}.{number}] {result.get('title', '')}")
+            lines.append(f"    URL: {url}")
+            content = (result.get("content") or "")[:max_content_length]
+            if content:
+                lines.append(f"    摘要: {content}")
+        if duplicates:
+            lines.append(f"另有 {len(duplicates)} 条与前面的结果重复: {', '.join(duplicates)}")
+        elif not number:
+            lines.append("没有结果")
+    return "\n".join(lines)
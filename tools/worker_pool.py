@@ -0,0 +1,402 @@
+"""
+Python 工作进程池
+功能：在 code_venv 中预先启动若干常驻解释器（tools/python_worker.py），
+run_code / run_code_file 复用这些进程执行代码，省去每次启动解释器和重复导入模块的开销
+
+1. 普通调用从空闲进程中取一个执行，每次使用全新的命名空间
+2. 传入 session_id 时固定使用同一个进程并保留命名空间（变量、导入）
+3. 每次调用有超时限制，超时或用户终止（should_stop）后结束该进程并自动补充新进程
+4. 执行次数达到上限或内存占用超过阈值后自动回收重建
+"""
+
+import json
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+# 传入 should_stop 时轮询终止标志的间隔（秒）
+STOP_POLL_INTERVAL = 0.1
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "python_worker.py")
+
+
+class WorkerError(Exception):
+    """工作进程启动失败或异常退出"""
+    pass
+
+
+def _append_line(text: str, line: str) -> str:
+    """在输出末尾追加一行提示"""
+    if text and not text.endswith("\n"):
+        text += "\n"
+    return text + line
+
+
+class _Worker:
+    """单个工作进程"""
+
+    def __init__(self, python_path: str, env: dict, start_timeout: float):
+        self.proc = subprocess.Popen(
+            [python_path, "-u", WORKER_SCRIPT],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            encoding="utf-8",
+            errors="replace"
+        )
+        self.runs = 0
+        self.next_id = 0
+        self.start_timeout = start_timeout
+        self.ready = False
+        self._replies: "queue.Queue[Optional[dict]]" = queue.Queue()
+        fd, self.stdout_path = tempfile.mkstemp(prefix="shitbot_out_", suffix=".txt")
+        os.close(fd)
+        fd, self.stderr_path = tempfile.mkstemp(prefix="shitbot_err_", suffix=".txt")
+        os.close(fd)
+        threading.Thread(target=self._read_loop, daemon=True).start()
+
+    def _read_loop(self):
+        """后台线程读取工作进程的响应"""
+        try:
+            for line in self.proc.stdout:
+                line = line.strip()
+                if line:
+                    try:
+                        self._replies.put(json.loads(line))
+                    except ValueError:
+                        pass
+        except Exception:
+            pass
+        self._replies.put(None)
+
+    @property
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def wait_ready(self):
+        """等待工作进程启动完成"""
+        if self.ready:
+            return
+        try:
+            reply = self._replies.get(timeout=self.start_timeout)
+        except queue.Empty:
+            reply = None
+        if not reply or not reply.get("ready"):
+            self.kill()
+            raise WorkerError("Python 工作进程启动失败")
+        self.ready = True
+
+    def run(self, code: str, session: str, timeout: Optional[float],
+            should_stop: Optional[Callable[[], bool]] = None) -> Tuple[int, str, str, str]:
+        """
+        执行代码
+
+        Returns:
+            tuple: (returncode, stdout, stderr, state)，state 为 "done" / "timeout" / "stopped"
+        """
+        self.wait_ready()
+        self.next_id += 1
+        request = {
+            "id": self.next_id,
+            "code": code,
+            "session": session,
+            "stdout_path": self.stdout_path,
+            "stderr_path": self.stderr_path
+        }
+        try:
+            self.proc.stdin.write(json.dumps(request) + "\n")
+            self.proc.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError):
+            raise WorkerError("Python 工作进程已退出")
+
+        state = "done"
+        reply = None
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            wait = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if should_stop is not None:
+                wait = STOP_POLL_INTERVAL if wait is None else min(wait, STOP_POLL_INTERVAL)
+            try:
+                reply = self._replies.get(timeout=wait)
+                break
+            except queue.Empty:
+                if should_stop is not None and should_stop():
+                    state = "stopped"
+                elif deadline is not None and time.monotonic() >= deadline:
+                    state = "timeout"
+                else:
+                    continue
+                self.kill()
+                break
+        self.runs += 1
+
+        stdout = self._read_output(self.stdout_path)
+        stderr = self._read_output(self.stderr_path)
+        if state == "timeout":
+            return (1, stdout, _append_line(stderr, f"执行超时（超过{timeout}秒），已终止进程"), state)
+        if state == "stopped":
+            return (1, stdout, _append_line(stderr, "已被用户终止，已结束进程"), state)
+        if reply is None:
+            # 进程在执行中退出（例如 os._exit 或内存超限）
+            self.proc.wait()
+            return (self.proc.returncode or 1, stdout, _append_line(stderr, "工作进程异常退出"), state)
+        return (reply.get("returncode", 1), stdout, stderr, state)
+
+    @staticmethod
+    def _read_output(path: str) -> str:
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                return f.read()
+        except OSError:
+            return ""
+
+    def rss_mb(self) -> float:
+        """当前内存占用（MB），无法获取时返回 0"""
+        if psutil is None or not self.alive:
+            return 0
+        try:
+            return psutil.Process(self.proc.pid).memory_info().rss / (1024 * 1024)
+        except Exception:
+            return 0
+
+    def kill(self):
+        """结束进程"""
+        if self.alive:
+            try:
+                self.proc.kill()
+                self.proc.wait(timeout=5)
+            except Exception:
+                pass
+        for stream in (self.proc.stdin, self.proc.stdout):
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+    def cleanup(self):
+        """结束进程并删除输出临时文件"""
+        self.kill()
+        for path in (self.stdout_path, self.stderr_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class PythonWorkerPool:
+    """
+    Python 工作进程池（线程安全）
+    """
+
+    def __init__(self,
+                 python_path: str,
+                 size: int = 2,
+                 max_runs: int = 50,
+                 max_rss_mb: int = 512,
+                 memory_limit_mb: int = 0,
+                 max_sessions: int = 4,
+                 preload: Optional[List[str]] = None,
+                 start_timeout: float = 30):
+        """
+        初始化进程池并预先启动工作进程
+
+        Args:
+            python_path: 运行工作进程的 Python 解释器
+            size: 常驻的普通工作进程数
+            max_runs: 单个进程执行多少次后回收重建
+            max_rss_mb: 进程内存占用超过该值（MB）后回收重建，0 表示不检查
+            memory_limit_mb: 单个进程的虚拟内存上限（MB，仅 POSIX），0 表示不限制
+            max_sessions: 最多同时保留的会话进程数，超出时关闭最久未使用的会话
+            preload: 工作进程启动时预先导入的模块
+            start_timeout: 等待工作进程启动的最长时间（秒）
+        """
+        self.python_path = python_path
+        self.size = max(1, size)
+        self.max_runs = max_runs
+        self.max_rss_mb = max_rss_mb
+        self.max_sessions = max(1, max_sessions)
+        self.start_timeout = start_timeout
+        self.env = dict(os.environ)
+        self.env["PYTHONIOENCODING"] = "utf-8"
+        self.env["SHITBOT_WORKER_MEMORY_MB"] = str(memory_limit_mb)
+        self.env["SHITBOT_WORKER_PRELOAD"] = ",".join(preload or [])
+
+        self._lock = threading.Lock()
+        self._idle: List[_Worker] = []
+        self._busy = 0
+        self._sessions: "OrderedDict[str, Tuple[_Worker, threading.Lock]]" = OrderedDict()
+        self._known_sessions = set()
+        self._closed = False
+        self.runs = 0
+        self.recycled = 0
+        self.timeouts = 0
+
+        for _ in range(self.size):
+            self._idle.append(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self.python_path, self.env, self.start_timeout)
+
+    def run(self, code: str, timeout: Optional[float] = None, session_id: str = "",
+            should_stop: Optional[Callable[[], bool]] = None) -> Tuple[int, str, str]:
+        """
+        在工作进程中执行代码
+
+        Args:
+            code: Python 代码
+            timeout: 超时时间（秒），None 表示不限制
+            session_id: 会话ID，非空时固定使用同一个进程并保留命名空间
+            should_stop: 返回 True 时结束执行（例如用户按下 Esc），进程会被结束并重建
+
+        Returns:
+            tuple: (returncode, stdout, stderr)
+
+        Raises:
+            WorkerError: 工作进程无法启动
+        """
+        if self._closed:
+            raise WorkerError("进程池已关闭")
+        if session_id:
+            return self._run_session(code, timeout, session_id, should_stop)
+
+        worker = self._acquire()
+        recycle = True
+        try:
+            returncode, stdout, stderr, state = worker.run(code, "", timeout, should_stop)
+            recycle = state != "done" or self._should_recycle(worker)
+            if state == "timeout":
+                with self._lock:
+                    self.timeouts += 1
+            return (returncode, stdout, stderr)
+        finally:
+            self._release(worker, recycle)
+
+    def _run_session(self, code: str, timeout: Optional[float], session_id: str,
+                     should_stop: Optional[Callable[[], bool]] = None) -> Tuple[int, str, str]:
+        """在会话进程中执行代码，会话进程只在超时或崩溃时重建"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry and not entry[0].alive:
+                entry[0].cleanup()
+                entry = None
+            reset = entry is None and session_id in self._known_sessions
+            if entry is None:
+                entry = (self._spawn(), threading.Lock())
+                self._sessions[session_id] = entry
+                while len(self._sessions) > self.max_sessions:
+                    _, (old_worker, _) = self._sessions.popitem(last=False)
+                    old_worker.cleanup()
+            self._sessions.move_to_end(session_id)
+            self._known_sessions.add(session_id)
+
+        worker, session_lock = entry
+        with session_lock:
+            returncode, stdout, stderr, state = worker.run(code, session_id, timeout, should_stop)
+        with self._lock:
+            self.runs += 1
+            if state == "timeout":
+                self.timeouts += 1
+        if reset:
+            stderr = f"注意：会话 {session_id} 的进程已重建，之前定义的变量已丢失\n" + stderr
+        return (returncode, stdout, stderr)
+
+    def _acquire(self) -> _Worker:
+        """取出一个空闲进程，全部忙碌时临时启动新进程"""
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.alive:
+                    self._busy += 1
+                    return worker
+                worker.cleanup()
+            self._busy += 1
+        return self._spawn()
+
+    def _release(self, worker: _Worker, recycle: bool):
+        """归还进程；需要回收时结束它并补充新进程"""
+        spawn = False
+        with self._lock:
+            self.runs += 1
+            self._busy -= 1
+            if recycle or not worker.alive or self._closed:
+                self.recycled += 1 if recycle else 0
+                spawn = not self._closed
+            elif len(self._idle) < self.size:
+                self._idle.append(worker)
+                return
+        worker.cleanup()
+        if spawn:
+            try:
+                replacement = self._spawn()
+            except Exception:
+                return
+            with self._lock:
+                if len(self._idle) < self.size and not self._closed:
+                    self._idle.append(replacement)
+                    return
+            replacement.cleanup()
+
+    def _should_recycle(self, worker: _Worker) -> bool:
+        if not worker.alive:
+            return True
+        if self.max_runs and worker.runs >= self.max_runs:
+            return True
+        if self.max_rss_mb and worker.rss_mb() > self.max_rss_mb:
+            return True
+        return False
+
+    def close_session(self, session_id: str) -> bool:
+        """
+        关闭会话进程
+
+        Args:
+            session_id: 会话ID
+
+        Returns:
+            bool: 会话存在并已关闭返回 True
+        """
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+        if entry:
+            entry[0].cleanup()
+            return True
+        return False
+
+    def stats(self) -> dict:
+        """
+        获取进程池统计信息
+
+        Returns:
+            dict: 空闲进程数、会话数、执行次数、回收次数和超时次数
+        """
+        with self._lock:
+            return {
+                "idle": len(self._idle),
+                "busy": self._busy,
+                "sessions": len(self._sessions),
+                "runs": self.runs,
+                "recycled": self.recycled,
+                "timeouts": self.timeouts
+            }
+
+    def shutdown(self):
+        """结束全部工作进程"""
+        with self._lock:
+            self._closed = True
+            workers = list(self._idle) + [w for w, _ in self._sessions.values()]
+            self._idle.clear()
+            self._sessions.clear()
+        for worker in workers:
+            worker.cleanup()